@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
 import time
 import uuid
 from datetime import datetime
@@ -31,8 +32,8 @@ Your Analysis Framework:
 3. **Fibonacci Analysis**: Calculate key retracement/extension levels if price shows clear swings.
 4. **Momentum Assessment**: Check RSI for divergences or overbought/oversold. Note exact RSI values.
 5. **Volume Context**: Compare recent volume to average. Flag any unusual spikes.
-6. **Moving Averages**: Note key MA levels (9-week, 20-week) and price position relative to them.
-7. **Market Correlation**: Compare to KSE-100 and sector - is this stock-specific or market-wide?
+6. **Moving Averages**: Note key MA levels (9-week, 20-week) and price position relative to them. Pass timeframe="weekly" to the data, indicator, level and chart tools for weekly bars.
+7. **Market Correlation**: Compare to KSE-100 and sector - is this stock-specific or market-wide? Check market breadth to see whether the broad market confirms the index move.
 
 Critical Requirements:
 - EVERY analysis must include SPECIFIC PRICE LEVELS: "immediate support at 305-300, followed by 280-275", "resistance at 336"
@@ -201,9 +202,14 @@ async def run_analyst_agent(
                     
                     # Generate chart data with indicators for frontend
                     try:
-                        chart_data = generate_chart_data(ticker, chart_config.get("period", "6M"))
+                        chart_data = generate_chart_data(
+                            ticker,
+                            chart_config.get("period", "6M"),
+                            layout=os.getenv("CHART_DATA_FORMAT", "rows"),
+                        )
                         chart_config["data"] = chart_data
-                        print(f"[DEBUG] Generated {len(chart_data)} chart data points")
+                        points = len(chart_data.get("date", [])) if isinstance(chart_data, dict) else len(chart_data)
+                        print(f"[DEBUG] Generated {points} chart data points")
                     except Exception as e:
                         print(f"[ERROR] Failed to generate chart data: {e}")
                         chart_config["data"] = []
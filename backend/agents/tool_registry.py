@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import inspect
 from typing import Any, Callable
 
 from tools import (
+    backtest_tools,
+    breadth_tools,
     chart_tools,
     comparison_tools,
+    correlation_tools,
     data_tools,
     indicator_tools,
     level_tools,
+    pattern_index,
     pattern_tools,
     volume_tools,
 )
@@ -16,29 +21,58 @@ from tools import (
 TOOL_DEFINITIONS: list[dict] = [
     {
         "name": "load_stock_data",
-        "description": "Load stock OHLCV data and compute summary stats.",
+        "description": "Load stock OHLCV data (daily, weekly or monthly bars) and compute summary stats.",
         "input_schema": {
             "type": "object",
             "properties": {
                 "ticker": {"type": "string"},
                 "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
             },
             "required": ["ticker"],
         },
     },
     {
         "name": "calculate_indicator",
-        "description": "Calculate a technical indicator using pandas-ta.",
+        "description": "Calculate a technical indicator (RSI, SMA, EMA, MACD, BOLLINGER, ATR, VWAP, STOCHASTIC, OBV, ADX, WILLIAMS_R, CCI).",
         "input_schema": {
             "type": "object",
             "properties": {
                 "ticker": {"type": "string"},
                 "indicator": {"type": "string"},
                 "params": {"type": "object"},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
             },
             "required": ["ticker", "indicator"],
         },
     },
+    {
+        "name": "calculate_indicators",
+        "description": (
+            "Calculate several technical indicators in one call (e.g. RSI, SMA 9/50, MACD, "
+            "BOLLINGER, ADX). Prefer this over repeated calculate_indicator calls."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "indicators": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "indicator": {"type": "string"},
+                            "params": {"type": "object"},
+                        },
+                        "required": ["indicator"],
+                    },
+                },
+                "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
+            },
+            "required": ["ticker", "indicators"],
+        },
+    },
     {
         "name": "detect_patterns",
         "description": "Detect candlestick and chart patterns.",
@@ -51,26 +85,83 @@ TOOL_DEFINITIONS: list[dict] = [
             "required": ["ticker"],
         },
     },
+    {
+        "name": "find_candlestick_patterns",
+        "description": "List past candlestick pattern occurrences (newest first) with counts per pattern.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "patterns": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(pattern_tools.CANDLESTICK_PATTERNS)},
+                },
+                "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "limit": {"type": "integer"},
+            },
+            "required": ["ticker"],
+        },
+    },
+    {
+        "name": "find_chart_patterns",
+        "description": "List past bars where a triangle, channel or flag window ended, with fit-quality confidence.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "pattern": {"type": "string", "enum": list(pattern_tools.CHART_PATTERNS)},
+                "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "limit": {"type": "integer"},
+            },
+            "required": ["ticker"],
+        },
+    },
+    {
+        "name": "backtest_patterns",
+        "description": "Historical performance of candlestick and double top/bottom patterns: forward returns, hit rates, drawdowns and (with target_pct/stop_pct) target-before-stop outcomes.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "pattern": {"type": "string"},
+                "horizons": {"type": "array", "items": {"type": "integer"}},
+                "target_pct": {"type": "number"},
+                "stop_pct": {"type": "number"},
+            },
+            "required": [],
+        },
+    },
     {
         "name": "find_support_resistance",
-        "description": "Find key support and resistance levels.",
+        "description": (
+            "Find key support and resistance levels from pivots, Fibonacci, or the volume profile "
+            "(point of control, 70% value area and high-volume nodes)."
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
                 "ticker": {"type": "string"},
-                "method": {"type": "string", "enum": ["pivot", "fibonacci", "both"]},
+                "method": {"type": "string", "enum": ["pivot", "fibonacci", "both", "volume_profile"]},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
             },
             "required": ["ticker"],
         },
     },
     {
         "name": "compare_with_index",
-        "description": "Compare a stock with KSE-100 index performance.",
+        "description": (
+            "Compare a stock with KSE-100 index performance, or with a synthetic equal-weight "
+            "(SECTOR_<NAME>) or volume-weight (SECTOR_<NAME>_VW) sector index."
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
                 "ticker": {"type": "string"},
                 "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "index": {
+                    "type": "string",
+                    "description": "Benchmark: KSE100 (default) or a sector index such as SECTOR_ENERGY / SECTOR_ENERGY_VW.",
+                },
             },
             "required": ["ticker"],
         },
@@ -84,6 +175,60 @@ TOOL_DEFINITIONS: list[dict] = [
             "required": ["ticker"],
         },
     },
+    {
+        "name": "relative_strength",
+        "description": (
+            "Relative strength of a stock vs KSE-100 (price ratio rebased to 100) with rolling beta and "
+            "correlation; says whether outperformance is accelerating or fading."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "window": {"type": "integer", "description": "Bars in each rolling beta/correlation window."},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
+                "index": {
+                    "type": "string",
+                    "description": "Benchmark: KSE100 (default) or a sector index such as SECTOR_ENERGY / SECTOR_ENERGY_VW.",
+                },
+            },
+            "required": ["ticker"],
+        },
+    },
+    {
+        "name": "analyze_correlations",
+        "description": (
+            "Beta and correlation of a stock against KSE-100, its average correlation with sector peers, "
+            "and its most and least correlated names across the universe (diversification candidates)."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticker": {"type": "string"},
+                "period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]},
+                "window": {
+                    "type": "integer",
+                    "minimum": 20,
+                    "description": "Use only the trailing N daily returns (at least 20).",
+                },
+                "limit": {"type": "integer"},
+            },
+            "required": ["ticker"],
+        },
+    },
+    {
+        "name": "market_breadth",
+        "description": (
+            "Market breadth across all tickers: advancers vs decliners, A/D line trend, new highs vs "
+            "new lows and the share of stocks above SMA50/SMA200. Use for market-wide context."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {"period": {"type": "string", "enum": ["1M", "3M", "6M", "1Y"]}},
+            "required": [],
+        },
+    },
     {
         "name": "analyze_volume",
         "description": "Analyze volume trends and unusual activity.",
@@ -96,9 +241,30 @@ TOOL_DEFINITIONS: list[dict] = [
             "required": ["ticker"],
         },
     },
+    {
+        "name": "scan_unusual_volume",
+        "description": (
+            "Find tickers trading unusually heavy volume on their latest bar (volume z-score vs the prior "
+            "20 bars), with up/down-volume ratio and OBV slope to tell accumulation from distribution."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "tickers": {"type": "array", "items": {"type": "string"}},
+                "min_zscore": {"type": "number"},
+                "limit": {"type": "integer"},
+            },
+            "required": [],
+        },
+    },
     {
         "name": "generate_chart",
-        "description": "Generate a candlestick chart with overlays and annotations.",
+        "description": (
+            "Generate a candlestick chart with overlays (SMA_50, EMA_20, BOLLINGER, VWAP, RSI, "
+            "SUPPORT_RESISTANCE, VOLUME_PROFILE, RELATIVE_STRENGTH, ROLLING_BETA_60, ROLLING_CORRELATION_60, "
+            "INDEX, SECTOR_INDEX, SECTOR_INDEX_VW) "
+            "and annotations."
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
@@ -107,6 +273,11 @@ TOOL_DEFINITIONS: list[dict] = [
                 "overlays": {"type": "array", "items": {"type": "string"}},
                 "annotations": {"type": "array", "items": {"type": "string"}},
                 "style": {"type": "string", "enum": ["dark", "light"]},
+                "timeframe": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
+                "index": {
+                    "type": "string",
+                    "description": "Benchmark: KSE100 (default) or a sector index such as SECTOR_ENERGY / SECTOR_ENERGY_VW.",
+                },
             },
             "required": ["ticker"],
         },
@@ -117,11 +288,19 @@ TOOL_DEFINITIONS: list[dict] = [
 TOOL_DISPATCH: dict[str, Callable[..., Any]] = {
     "load_stock_data": data_tools.load_stock_data,
     "calculate_indicator": indicator_tools.calculate_indicator,
-    "detect_patterns": pattern_tools.detect_patterns,
+    "calculate_indicators": indicator_tools.calculate_indicators,
+    "detect_patterns": pattern_index.detect_patterns,
+    "find_candlestick_patterns": pattern_index.find_candlestick_patterns,
+    "find_chart_patterns": pattern_tools.find_chart_patterns,
+    "backtest_patterns": backtest_tools.backtest_patterns,
     "find_support_resistance": level_tools.find_support_resistance,
     "compare_with_index": comparison_tools.compare_with_index,
     "compare_with_sector": comparison_tools.compare_with_sector,
+    "relative_strength": comparison_tools.relative_strength,
+    "analyze_correlations": correlation_tools.analyze_correlations,
+    "market_breadth": breadth_tools.market_breadth,
     "analyze_volume": volume_tools.analyze_volume,
+    "scan_unusual_volume": volume_tools.scan_unusual_volume,
     "generate_chart": chart_tools.generate_chart,
 }
 
@@ -130,4 +309,6 @@ async def dispatch(tool_name: str, tool_input: dict) -> dict:
     if tool_name not in TOOL_DISPATCH:
         raise ValueError(f"Unknown tool: {tool_name}")
     handler = TOOL_DISPATCH[tool_name]
-    return handler(**tool_input)
+    result = handler(**tool_input)
+    # Tools backed by the pattern index read SQLite and are coroutines.
+    return await result if inspect.isawaitable(result) else result
@@ -60,6 +60,39 @@ async def init_db() -> None:
             );
             """
         )
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pattern_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                pattern TEXT NOT NULL COLLATE NOCASE,
+                pattern_type TEXT NOT NULL,
+                implication TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                start_date TEXT,
+                confirmed_date TEXT,
+                UNIQUE (ticker, date, pattern)
+            );
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_pattern_events_pattern ON pattern_events (pattern, date)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_pattern_events_ticker ON pattern_events (ticker, date)")
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pattern_sync (
+                ticker TEXT PRIMARY KEY,
+                synced_through TEXT NOT NULL,
+                data_version TEXT NOT NULL
+            );
+            """
+        )
+        async with db.execute("PRAGMA table_info(pattern_events)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "confirmed_date" not in columns:
+            # Events indexed before confirmed_date was stored are rebuilt on the next sync.
+            await db.execute("ALTER TABLE pattern_events ADD COLUMN confirmed_date TEXT")
+            await db.execute("DELETE FROM pattern_sync")
         await db.commit()
 
 
@@ -166,6 +199,36 @@ async def get_report_pdf_path(report_id: str) -> Optional[str]:
     return row[0]
 
 
+async def get_report_signals(ticker: Optional[str] = None) -> list[dict]:
+    """Signal, target and stop of each stored report, for backtesting."""
+    query = "SELECT id, ticker, signal, generated_at, analysis_json FROM reports"
+    params: list = []
+    if ticker:
+        query += " WHERE ticker = ?"
+        params.append(ticker)
+    query += " ORDER BY generated_at"
+
+    async with aiosqlite.connect(_db_path()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+
+    signals = []
+    for row in rows:
+        key_levels = json.loads(row["analysis_json"]).get("key_levels") or {}
+        signals.append(
+            {
+                "id": row["id"],
+                "ticker": row["ticker"],
+                "signal": row["signal"],
+                "generated_at": row["generated_at"],
+                "target": key_levels.get("target"),
+                "stop_loss": key_levels.get("stop_loss"),
+            }
+        )
+    return signals
+
+
 async def save_agent_step(report_id: str, step: AgentStep, step_number: int) -> None:
     db_path = _db_path()
     async with aiosqlite.connect(db_path) as db:
@@ -188,3 +251,119 @@ async def save_agent_step(report_id: str, step: AgentStep, step_number: int) ->
             ),
         )
         await db.commit()
+
+
+async def get_pattern_sync_states() -> dict[str, tuple[str, str]]:
+    async with aiosqlite.connect(_db_path()) as db:
+        async with db.execute("SELECT ticker, synced_through, data_version FROM pattern_sync") as cursor:
+            rows = await cursor.fetchall()
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
+async def save_pattern_events(
+    ticker: str, events: list[dict], synced_through: str, data_version: str, replace: bool = False
+) -> None:
+    """Insert a ticker's new events and move its high-water mark, in one transaction.
+
+    Events already stored are ignored, so overlapping batches are safe. With
+    replace=True the ticker's existing events are dropped first (full rebuild).
+    """
+    async with aiosqlite.connect(_db_path()) as db:
+        if replace:
+            await db.execute("DELETE FROM pattern_events WHERE ticker = ?", (ticker,))
+        await db.executemany(
+            """
+            INSERT OR IGNORE INTO pattern_events (
+                ticker, date, pattern, pattern_type, implication, confidence, start_date, confirmed_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    ticker,
+                    event["date"],
+                    event["pattern"],
+                    event["pattern_type"],
+                    event["implication"],
+                    event["confidence"],
+                    event.get("start_date"),
+                    event.get("confirmed_date", event["date"]),
+                )
+                for event in events
+            ],
+        )
+        await db.execute(
+            "INSERT OR REPLACE INTO pattern_sync (ticker, synced_through, data_version) VALUES (?, ?, ?)",
+            (ticker, synced_through, data_version),
+        )
+        await db.commit()
+
+
+async def query_pattern_events(
+    tickers: Optional[list[str]] = None,
+    pattern: Optional[str] = None,
+    implication: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Optional[int] = 100,
+    pattern_type: Optional[str] = None,
+) -> list[dict]:
+    """Stored events, newest first; limit=None returns every match."""
+    query = (
+        "SELECT ticker, date, pattern, pattern_type, implication, confidence, start_date, confirmed_date "
+        "FROM pattern_events WHERE 1 = 1"
+    )
+    params: list = []
+    if tickers is not None:
+        query += f" AND ticker IN ({', '.join('?' for _ in tickers)})"
+        params.extend(tickers)
+    if pattern:
+        query += " AND pattern = ?"
+        params.append(pattern)
+    if pattern_type:
+        query += " AND pattern_type = ?"
+        params.append(pattern_type)
+    if implication:
+        query += " AND implication = ?"
+        params.append(implication.upper())
+    if since:
+        query += " AND date >= ?"
+        params.append(since)
+    query += " ORDER BY date DESC, ticker"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    async with aiosqlite.connect(_db_path()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+    return [dict(row) for row in rows]
+
+
+async def latest_pattern_events(
+    tickers: Optional[list[str]] = None, pattern: Optional[str] = None
+) -> list[dict]:
+    """The most recent event per ticker (optionally of a single pattern)."""
+    inner = "SELECT ticker, MAX(date) AS date FROM pattern_events WHERE 1 = 1"
+    params: list = []
+    if tickers is not None:
+        inner += f" AND ticker IN ({', '.join('?' for _ in tickers)})"
+        params.extend(tickers)
+    if pattern:
+        inner += " AND pattern = ?"
+        params.append(pattern)
+    inner += " GROUP BY ticker"
+    query = (
+        "SELECT e.ticker, e.date, e.pattern, e.pattern_type, e.implication, e.confidence, e.start_date, "
+        "e.confirmed_date "
+        f"FROM pattern_events e JOIN ({inner}) latest ON e.ticker = latest.ticker AND e.date = latest.date"
+    )
+    if pattern:
+        query += " WHERE e.pattern = ?"
+        params.append(pattern)
+    query += " ORDER BY e.date DESC, e.ticker, e.pattern"
+
+    async with aiosqlite.connect(_db_path()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+    return [dict(row) for row in rows]
@@ -12,8 +12,26 @@ from dotenv import load_dotenv
 
 from agents.analyst_agent import run_analyst_agent
 from database import get_report, get_report_pdf_path, get_reports, init_db
-from models import ErrorDetail, ErrorResponse, HealthResponse, ReportDetail, ReportListResponse, StockListResponse, StockSummary
-from tools.data_tools import load_config, load_dataframe, load_stock_data
+from models import (
+    ErrorDetail,
+    ErrorResponse,
+    HealthResponse,
+    ReportDetail,
+    ReportListResponse,
+    ScreenerResponse,
+    StockListResponse,
+    StockSummary,
+)
+from tools.backtest_tools import backtest_patterns, backtest_reports
+from tools.breadth_tools import breadth_cache_stats
+from tools.correlation_tools import MIN_OVERLAP, analyze_correlations, correlation_cache_stats, correlation_matrix
+from tools.data_tools import frame_cache_stats, get_registry, load_dataframe, load_stock_data, ticker_info
+from tools.indicator_tools import indicator_cache_stats
+from tools.level_tools import profile_cache_stats
+from tools.pattern_index import find_pattern_events, latest_patterns
+from tools.screener_tools import run_screen, screener_cache_stats
+from tools.sector_index import sector_index_cache_stats
+from tools.volume_tools import UNUSUAL_ZSCORE, scan_unusual_volume, volume_cache_stats
 
 
 load_dotenv()
@@ -54,9 +72,7 @@ def _error_response(code: str, message: str, status_code: int = 400) -> JSONResp
 
 @app.get("/api/v1/analyze/{ticker}")
 async def analyze_stock(ticker: str) -> EventSourceResponse:
-    try:
-        load_dataframe(ticker, "6M")
-    except FileNotFoundError:
+    if not get_registry().has_data(ticker):
         raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found")
 
     async def event_generator() -> AsyncGenerator[dict, None]:
@@ -118,16 +134,17 @@ async def get_report_pdf(report_id: str):
 
 @app.get("/api/v1/stocks", response_model=StockListResponse)
 async def list_stocks() -> StockListResponse:
-    config = load_config()
     stocks = []
-    for ticker, meta in config["stocks"].items():
+    for info in get_registry().configured():
+        if not info.has_data:
+            continue
         try:
-            data = load_stock_data(ticker, "1M")
+            data = load_stock_data(info.ticker, "1M")
             stocks.append(
                 {
-                    "ticker": ticker,
-                    "name": meta["name"],
-                    "sector": meta["sector"],
+                    "ticker": info.ticker,
+                    "name": info.name,
+                    "sector": info.sector,
                     "current_price": data["current_price"],
                     "change_percent": data["change_percent"],
                     "last_updated": data["last_5_days"][-1]["date"] if data["last_5_days"] else "",
@@ -140,8 +157,8 @@ async def list_stocks() -> StockListResponse:
 
 @app.get("/api/v1/stocks/{ticker}/summary", response_model=StockSummary)
 async def get_stock_summary(ticker: str) -> StockSummary:
-    meta = load_config()["stocks"].get(ticker)
-    if not meta:
+    info = ticker_info(ticker)
+    if not info or not info.in_config:
         raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found")
 
     df = load_dataframe(ticker, "6M")
@@ -149,8 +166,8 @@ async def get_stock_summary(ticker: str) -> StockSummary:
 
     return StockSummary(
         ticker=ticker,
-        name=meta["name"],
-        sector=meta["sector"],
+        name=info.name,
+        sector=info.sector,
         current_price=data["current_price"],
         change_percent=data["change_percent"],
         period_high=float(df["High"].max()),
@@ -161,15 +178,130 @@ async def get_stock_summary(ticker: str) -> StockSummary:
     )
 
 
+@app.get("/api/v1/backtest/patterns")
+async def get_pattern_backtest(
+    ticker: Optional[str] = None,
+    pattern: Optional[str] = None,
+    target_pct: Optional[float] = None,
+    stop_pct: Optional[float] = None,
+) -> dict:
+    if ticker and not get_registry().has_data(ticker):
+        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found")
+    return await backtest_patterns(ticker=ticker, pattern=pattern, target_pct=target_pct, stop_pct=stop_pct)
+
+
+@app.get("/api/v1/backtest/reports")
+async def get_report_backtest(ticker: Optional[str] = None) -> dict:
+    return await backtest_reports(ticker=ticker)
+
+
+@app.get("/api/v1/screener", response_model=ScreenerResponse)
+async def screen_stocks(
+    filter: str,
+    period: str = "1Y",
+    tickers: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "desc",
+    limit: int = 50,
+):
+    universe = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    try:
+        return run_screen(
+            filter,
+            tickers=universe,
+            period=period,
+            sort_by=sort,
+            descending=order.lower() != "asc",
+            limit=min(max(limit, 1), 500),
+        )
+    except ValueError as exc:
+        return _error_response("INVALID_FILTER", str(exc))
+
+
+@app.get("/api/v1/volume/unusual")
+async def get_unusual_volume(
+    min_z: float = UNUSUAL_ZSCORE, tickers: Optional[str] = None, limit: int = 20
+) -> dict:
+    universe = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    return scan_unusual_volume(universe, min_zscore=min_z, limit=min(max(limit, 1), 500))
+
+
+@app.get("/api/v1/correlations")
+async def get_correlation_matrix(
+    tickers: Optional[str] = None, period: str = "1Y", window: Optional[int] = None
+) -> dict:
+    if window is not None and window < MIN_OVERLAP:
+        return _error_response("INVALID_WINDOW", f"window must be at least {MIN_OVERLAP} returns")
+    universe = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    try:
+        return correlation_matrix(universe, period=period, window=window)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        return _error_response("INSUFFICIENT_DATA", str(exc))
+
+
+@app.get("/api/v1/correlations/{ticker}")
+async def get_ticker_correlations(ticker: str, period: str = "1Y", window: Optional[int] = None) -> dict:
+    if window is not None and window < MIN_OVERLAP:
+        return _error_response("INVALID_WINDOW", f"window must be at least {MIN_OVERLAP} returns")
+    try:
+        return analyze_correlations(ticker, period=period, window=window)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found")
+    except ValueError as exc:
+        return _error_response("INSUFFICIENT_DATA", str(exc))
+
+
+@app.get("/api/v1/patterns")
+async def list_pattern_events(
+    pattern: Optional[str] = None,
+    ticker: Optional[str] = None,
+    sector: Optional[str] = None,
+    implication: Optional[str] = None,
+    period: str = "1Y",
+    limit: int = 100,
+) -> dict:
+    tickers = [t.strip() for t in ticker.split(",") if t.strip()] if ticker else None
+    events = await find_pattern_events(
+        pattern=pattern,
+        tickers=tickers,
+        sector=sector,
+        implication=implication,
+        period=period,
+        limit=min(max(limit, 1), 1000),
+    )
+    return {"events": events, "total": len(events)}
+
+
+@app.get("/api/v1/patterns/latest")
+async def list_latest_patterns(
+    pattern: Optional[str] = None, ticker: Optional[str] = None, sector: Optional[str] = None
+) -> dict:
+    tickers = [t.strip() for t in ticker.split(",") if t.strip()] if ticker else None
+    events = await latest_patterns(pattern=pattern, tickers=tickers, sector=sector)
+    return {"events": events, "total": len(events)}
+
+
 @app.get("/api/v1/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
-    config = load_config()
+    registry = get_registry()
     return HealthResponse(
         status="ok",
         llm_provider=os.getenv("MODEL_PRIMARY", "claude-sonnet-4-20250514"),
         llm_fallback=os.getenv("MODEL_FALLBACK", "gpt-4o"),
-        stocks_available=len(config["stocks"]),
+        stocks_available=len(registry.configured()),
         version="1.0.0",
+        caches={
+            "frames": frame_cache_stats(),
+            "indicators": indicator_cache_stats(),
+            "screener": screener_cache_stats(),
+            "volume_profiles": profile_cache_stats(),
+            "volume_signals": volume_cache_stats(),
+            "correlations": correlation_cache_stats(),
+            "sector_indices": sector_index_cache_stats(),
+            "breadth": breadth_cache_stats(),
+        },
     )
 
 
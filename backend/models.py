@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
 from pydantic import BaseModel
 
@@ -75,6 +75,21 @@ class ChartDataPoint(BaseModel):
     lower_bb: Optional[float] = None
 
 
+class ChartDataColumns(BaseModel):
+    date: list[str]
+    open: list[float]
+    high: list[float]
+    low: list[float]
+    close: list[float]
+    volume: list[int]
+    sma_9: list[Optional[float]] = []
+    sma_50: list[Optional[float]] = []
+    sma_200: list[Optional[float]] = []
+    rsi: list[Optional[float]] = []
+    upper_bb: list[Optional[float]] = []
+    lower_bb: list[Optional[float]] = []
+
+
 class ChartConfig(BaseModel):
     ticker: str
     period: str
@@ -83,7 +98,7 @@ class ChartConfig(BaseModel):
     fibonacci: Optional[dict] = None
     channels: Optional[list[dict]] = None
     style: Literal["dark", "light"] = "dark"
-    data: Optional[list[ChartDataPoint]] = []
+    data: Optional[Union[list[ChartDataPoint], ChartDataColumns]] = []
 
 
 class AgentResult(BaseModel):
@@ -141,12 +156,31 @@ class StockSummary(BaseModel):
     indicators_snapshot: dict
 
 
+class ScreenerMatch(BaseModel):
+    ticker: str
+    name: str
+    sector: str
+    date: str
+    values: dict[str, Optional[float]]
+
+
+class ScreenerResponse(BaseModel):
+    filter: str
+    period: str
+    variables: list[str]
+    universe_size: int
+    match_count: int
+    matches: list[ScreenerMatch]
+    elapsed_ms: float
+
+
 class HealthResponse(BaseModel):
     status: str
     llm_provider: str
     llm_fallback: str
     stocks_available: int
     version: str
+    caches: Optional[dict] = None
 
 
 class ErrorDetail(BaseModel):
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend imports its packages (tools, agents, utils) from the backend
+# directory, as main.py does when run from there.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
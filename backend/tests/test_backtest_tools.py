@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.backtest_tools import evaluate_events
+
+DATES = pd.bdate_range("2024-01-01", periods=8)
+START = DATES[0].strftime("%Y-%m-%d")
+
+# ticker -> (high, low, close) per bar; every path enters at a close of 100 on bar 0.
+PATHS = {
+    # Target (105) reached on bar 2, stop (97) never.
+    "TARGET": (
+        [100, 103, 106, 104, 102, 101, 101, 101],
+        [100, 99, 101, 100, 98, 99, 99, 99],
+        [100, 102, 104, 103, 101, 100, 100, 100],
+    ),
+    # Bar 1 touches both the target and the stop.
+    "BOTH": (
+        [100, 106, 104, 104, 104, 104, 104, 104],
+        [100, 96, 99, 99, 99, 99, 99, 99],
+        [100, 101, 101, 101, 101, 101, 101, 101],
+    ),
+    # Stop on bar 2, target only afterwards.
+    "STOP": (
+        [100, 101, 102, 110, 110, 110, 110, 110],
+        [100, 98, 96.9, 100, 100, 100, 100, 100],
+        [100, 100, 98, 108, 108, 108, 108, 108],
+    ),
+    # Nothing for five bars, then the target on bar 6.
+    "LATE": (
+        [100, 102, 102, 102, 102, 102, 110, 102],
+        [100, 99, 99, 99, 99, 99, 100, 99],
+        [100, 101, 101, 101, 101, 101, 108, 101],
+    ),
+}
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for ticker, (high, low, close) in PATHS.items():
+        pd.DataFrame(
+            {
+                "Date": DATES.strftime("%Y-%m-%d"),
+                "Close": close,
+                "Open": close,
+                "High": high,
+                "Low": low,
+                "Volume": 1000.0,
+            }
+        ).to_csv(tmp_path / f"{ticker}.csv", index=False)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _evaluate(events: list[dict], **kwargs) -> pd.DataFrame:
+    return evaluate_events(events, horizons=(1, 5), target_pct=0.05, stop_pct=0.03, **kwargs).set_index("ticker")
+
+
+def test_target_before_stop() -> None:
+    result = _evaluate([{"ticker": "TARGET", "date": START, "direction": "BULLISH"}]).loc["TARGET"]
+    assert result["entry_price"] == 100
+    assert result["target"] == pytest.approx(105)
+    assert result["stop"] == pytest.approx(97)
+    assert result["outcome"] == "target"
+    assert result["bars_to_outcome"] == 2
+    assert result["return_1"] == pytest.approx(0.02)
+
+
+def test_bar_touching_target_and_stop_counts_as_stop() -> None:
+    result = _evaluate([{"ticker": "BOTH", "date": START, "direction": "BULLISH"}]).loc["BOTH"]
+    assert result["outcome"] == "stop"
+    assert result["bars_to_outcome"] == 1
+
+
+def test_stop_before_later_target() -> None:
+    result = _evaluate([{"ticker": "STOP", "date": START, "direction": "BULLISH"}]).loc["STOP"]
+    assert result["outcome"] == "stop"
+    assert result["bars_to_outcome"] == 2
+
+
+def test_short_levels_and_returns_are_mirrored() -> None:
+    result = _evaluate([{"ticker": "TARGET", "date": START, "direction": "BEARISH"}]).loc["TARGET"]
+    assert result["target"] == pytest.approx(95)
+    assert result["stop"] == pytest.approx(103)
+    assert result["outcome"] == "stop"
+    assert result["bars_to_outcome"] == 1
+    assert result["return_1"] == pytest.approx(-0.02)
+
+
+def test_outcome_is_only_checked_within_the_horizon() -> None:
+    event = [{"ticker": "LATE", "date": START, "direction": "BULLISH"}]
+    assert _evaluate(event, max_horizon=5).loc["LATE", "outcome"] == "open"
+    within = _evaluate(event, max_horizon=6).loc["LATE"]
+    assert within["outcome"] == "target"
+    assert within["bars_to_outcome"] == 6
+
+
+def test_events_without_enough_forward_bars() -> None:
+    last = DATES[-2].strftime("%Y-%m-%d")
+    result = _evaluate([{"ticker": "TARGET", "date": last, "direction": "BULLISH"}]).loc["TARGET"]
+    assert result["bars_available"] == 1
+    assert result["return_1"] == pytest.approx(0.0)
+    assert np.isnan(result["return_5"])
+    assert result["outcome"] == "open"
+
+
+def test_unknown_ticker_and_neutral_direction_are_not_evaluated() -> None:
+    results = _evaluate(
+        [
+            {"ticker": "MISSING", "date": START, "direction": "BULLISH"},
+            {"ticker": "TARGET", "date": START, "direction": "NEUTRAL"},
+        ]
+    )
+    assert results["entry_price"].isna().all()
+    assert (results["outcome"] == "n/a").all()
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from tools.breadth_tools import breadth_series
+
+DATES = pd.bdate_range("2024-01-01", periods=80)
+
+
+def test_a_missed_session_keeps_the_ticker_in_the_sma_denominator() -> None:
+    rising = np.linspace(100, 180, len(DATES))
+    close = pd.DataFrame({"UP": rising, "GAP": rising, "FLAT": np.full(len(DATES), 100.0)}, index=DATES)
+    close.iloc[60, 1] = np.nan
+
+    breadth = breadth_series(close, close, close)
+
+    assert breadth["issues"].iloc[60] == 2
+    # FLAT sits on its average; UP and GAP are above theirs, including right after GAP's gap.
+    after = breadth["pct_above_sma50"].iloc[61:]
+    np.testing.assert_allclose(after, 200 / 3)
+    assert breadth["pct_above_sma50"].iloc[60] == 50
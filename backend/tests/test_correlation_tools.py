@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from tools.correlation_tools import MIN_OVERLAP, pairwise_beta, pairwise_moments
+
+ROWS = 120
+
+
+def _returns_with_gaps() -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    market = rng.normal(0, 0.01, ROWS)
+    returns = pd.DataFrame(
+        {
+            "INDEX": market,
+            "HIGHBETA": 1.6 * market + rng.normal(0, 0.008, ROWS),
+            "LOWBETA": 0.4 * market + rng.normal(0, 0.01, ROWS),
+            "GAPPY": 1.0 * market + rng.normal(0, 0.01, ROWS),
+            "LATE": rng.normal(0, 0.02, ROWS),
+            "SPARSE": rng.normal(0, 0.02, ROWS),
+        }
+    )
+    # Missed sessions, a late listing and a ticker with too little overlap.
+    returns.loc[rng.choice(ROWS, 30, replace=False), "GAPPY"] = np.nan
+    returns.loc[rng.choice(ROWS, 10, replace=False), "INDEX"] = np.nan
+    returns.loc[: ROWS - 40, "LATE"] = np.nan
+    returns.loc[MIN_OVERLAP - 5 :, "SPARSE"] = np.nan
+    return returns
+
+
+def test_moments_match_pandas_pairwise_statistics() -> None:
+    returns = _returns_with_gaps()
+    observations, covariance, correlation, _ = pairwise_moments(returns.to_numpy())
+
+    valid = returns.notna().astype(int)
+    np.testing.assert_array_equal(observations, (valid.T @ valid).to_numpy())
+    np.testing.assert_allclose(covariance, returns.cov(min_periods=MIN_OVERLAP).to_numpy(), rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(correlation, returns.corr(min_periods=MIN_OVERLAP).to_numpy(), rtol=1e-9, atol=1e-12)
+    # SPARSE shares fewer than MIN_OVERLAP rows with everything, itself included.
+    assert np.isnan(correlation[:, returns.columns.get_loc("SPARSE")]).all()
+
+
+def test_beta_is_covariance_over_index_variance_on_the_pairs_rows() -> None:
+    returns = _returns_with_gaps()
+    _, covariance, _, pair_variance = pairwise_moments(returns.to_numpy())
+    beta = pairwise_beta(covariance, pair_variance, returns.columns.get_loc("INDEX"))
+
+    for i, ticker in enumerate(returns.columns):
+        rows = returns[ticker].notna() & returns["INDEX"].notna()
+        stock, index = returns.loc[rows, ticker], returns.loc[rows, "INDEX"]
+        if rows.sum() < MIN_OVERLAP:
+            assert np.isnan(beta[i])
+            continue
+        expected = stock.cov(index) / index.var()
+        np.testing.assert_allclose(beta[i], expected, rtol=1e-9, err_msg=ticker)
+    assert beta[returns.columns.get_loc("HIGHBETA")] > 1 > beta[returns.columns.get_loc("LOWBETA")]
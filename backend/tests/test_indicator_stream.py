@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import ta_kernels as kernels
+from tools.data_tools import load_window
+from tools.indicator_stream import STREAM_STATES, _EWM, make_state
+from tools.indicator_tools import indicator_values, indicator_warmup
+
+TICKER = "STREAMTEST"
+BARS = 400
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.012, BARS)))
+    frame = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2024-01-01", periods=BARS).strftime("%Y-%m-%d"),
+            "Close": close.round(2),
+            "Open": (close * (1 + rng.normal(0, 0.004, BARS))).round(2),
+            "High": (close * (1 + rng.uniform(0.005, 0.02, BARS))).round(2),
+            "Low": (close * (1 - rng.uniform(0.005, 0.02, BARS))).round(2),
+            "Volume": rng.integers(100_000, 1_000_000, BARS).astype(float),
+        }
+    )
+    frame.to_csv(tmp_path / f"{TICKER}.csv", index=False)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("indicator", list(STREAM_STATES))
+def test_stream_matches_batch_recomputation(data_dir: Path, indicator: str) -> None:
+    """Seeded from history and stepped bar by bar, a state reproduces indicator_values."""
+    batch = indicator_values(TICKER, indicator, period="1Y")
+    expected = batch.to_numpy(dtype="float64").reshape(len(batch), -1)
+    history, offset = load_window(TICKER, "1Y", indicator_warmup(indicator))
+    split = offset + len(batch) // 2
+
+    state = make_state(indicator)
+    seeded = np.atleast_1d(np.asarray(state.seed(history.iloc[:split]), dtype="float64"))
+    np.testing.assert_allclose(seeded, expected[split - offset - 1], rtol=1e-9, atol=1e-9)
+
+    columns = ["Open", "High", "Low", "Close", "Volume"]
+    for row, values in enumerate(history[columns].to_numpy(dtype="float64")[split:], start=split - offset):
+        streamed = np.atleast_1d(np.asarray(state.update(dict(zip(columns, values))), dtype="float64"))
+        np.testing.assert_allclose(streamed, expected[row], rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("adjust", [True, False])
+def test_ewm_forward_fills_gaps_like_the_batch_kernel(adjust: bool) -> None:
+    values = 100 + np.cumsum(np.random.default_rng(5).normal(0, 1, 80))
+    values[:3] = np.nan
+    values[[20, 21, 50]] = np.nan
+    expected = kernels.ewma(values, 0.1, min_periods=5, adjust=adjust)
+
+    ewm = _EWM(0.1, min_periods=5, adjust=adjust)
+    streamed = np.array([ewm.push(value) for value in values])
+
+    np.testing.assert_allclose(streamed, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_stochastic_carries_a_flat_range_through_like_the_batch_kernel() -> None:
+    rng = np.random.default_rng(9)
+    close = 100 + np.cumsum(rng.normal(0, 1, 90))
+    high, low = close + rng.uniform(0.2, 1.0, 90), close - rng.uniform(0.2, 1.0, 90)
+    # Twenty untraded sessions: the 14-bar range is zero for several bars in a row.
+    high[30:50] = low[30:50] = close[30:50] = close[29]
+    expected_k, expected_d = kernels.stoch(high, low, close)
+
+    state = make_state("STOCHASTIC")
+    streamed = np.array(
+        [state.update({"Open": c, "High": h, "Low": l, "Close": c, "Volume": 0.0}) for h, l, c in zip(high, low, close)]
+    )
+
+    assert np.isnan(expected_k[43:52]).all()
+    np.testing.assert_allclose(streamed[:, 0], expected_k, rtol=1e-9, atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(streamed[:, 1], expected_d, rtol=1e-9, atol=1e-9, equal_nan=True)
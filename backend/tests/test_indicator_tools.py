@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import indicator_tools
+from tools.indicator_tools import (
+    SETTLE_TOLERANCE,
+    calculate_indicators,
+    clear_indicator_cache,
+    indicator_values,
+    indicator_warmup,
+)
+
+TICKER = "BATCHTEST"
+BARS = 500
+SPECS = [
+    ("SMA", {}),
+    ("BOLLINGER", {}),
+    ("EMA", {}),
+    ("MACD", {}),
+    ("ATR", {}),
+    ("ADX", {}),
+    ("SMA", {"period": 200}),
+]
+BATCH = [{"indicator": name, "params": params} for name, params in SPECS]
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    rng = np.random.default_rng(17)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.012, BARS)))
+    pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2023-01-02", periods=BARS).strftime("%Y-%m-%d"),
+            "Close": close.round(2),
+            "Open": close.round(2),
+            "High": (close * (1 + rng.uniform(0.005, 0.02, BARS))).round(2),
+            "Low": (close * (1 - rng.uniform(0.005, 0.02, BARS))).round(2),
+            "Volume": rng.integers(100_000, 1_000_000, BARS).astype(float),
+        }
+    ).to_csv(tmp_path / f"{TICKER}.csv", index=False)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    clear_indicator_cache()
+    return tmp_path
+
+
+def test_a_batch_loads_one_window_with_the_largest_warmup(monkeypatch: pytest.MonkeyPatch) -> None:
+    warmups: list[int] = []
+    load_context = indicator_tools._load_context
+
+    def counting(ticker: str, period: str, warmup: int, timeframe: str = "daily"):
+        warmups.append(warmup)
+        return load_context(ticker, period, warmup, timeframe)
+
+    monkeypatch.setattr(indicator_tools, "_load_context", counting)
+    result = calculate_indicators(TICKER, BATCH, period="6M")
+
+    assert not any("error" in r for r in result["results"])
+    assert warmups == [max(indicator_warmup(name, params) for name, params in SPECS)]
+    calculate_indicators(TICKER, BATCH, period="6M")
+    assert len(warmups) == 1  # the second batch is served from the cache
+
+
+def test_batch_results_match_single_calls_within_settle_tolerance() -> None:
+    calculate_indicators(TICKER, BATCH, period="6M")
+    batched = [indicator_values(TICKER, name, params, "6M").to_numpy() for name, params in SPECS]
+
+    clear_indicator_cache()
+    for (name, params), values in zip(SPECS, batched):
+        single = indicator_values(TICKER, name, params, "6M").to_numpy()
+        assert single.shape == values.shape
+        np.testing.assert_allclose(single, values, rtol=10 * SETTLE_TOLERANCE, err_msg=name)
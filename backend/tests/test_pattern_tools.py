@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from tools.pattern_tools import (
+    CANDLE_AVERAGE_BARS,
+    CANDLESTICK_PATTERNS,
+    SIGNAL_STRENGTH,
+    candlestick_signals,
+    extrema_masks,
+    zigzag,
+)
+
+BARS = 30
+HAMMER = CANDLESTICK_PATTERNS.index("hammer")
+ENGULFING = CANDLESTICK_PATTERNS.index("engulfing")
+
+
+def _candles() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Plain bullish bars: a body of 1 in a range of 2, none of which form a pattern.
+    open_ = np.full(BARS, 100.0)
+    close = np.full(BARS, 101.0)
+    high = np.full(BARS, 101.5)
+    low = np.full(BARS, 99.5)
+    return open_, high, low, close
+
+
+def _hammer(candles: tuple, bar: int) -> None:
+    open_, high, low, close = candles
+    open_[bar], high[bar], low[bar], close[bar] = 100.0, 100.55, 98.0, 100.5
+
+
+def _bullish_engulfing(candles: tuple, bar: int) -> None:
+    open_, high, low, close = candles
+    open_[bar - 1], high[bar - 1], low[bar - 1], close[bar - 1] = 101.0, 101.5, 99.5, 100.0
+    open_[bar], high[bar], low[bar], close[bar] = 99.8, 101.5, 99.5, 101.2
+
+
+def test_known_patterns_signal_once_the_averages_exist() -> None:
+    candles = _candles()
+    _hammer(candles, 15)
+    _bullish_engulfing(candles, 22)
+    signals = candlestick_signals(*candles)
+
+    assert signals.shape == (BARS, len(CANDLESTICK_PATTERNS))
+    assert np.flatnonzero(signals[:, HAMMER]).tolist() == [15]
+    assert np.flatnonzero(signals[:, ENGULFING]).tolist() == [22]
+    assert signals[22, ENGULFING] == SIGNAL_STRENGTH
+
+
+def test_nothing_signals_before_the_averages_exist() -> None:
+    candles = _candles()
+    # Shapes that signal later in a history, placed inside the averaging window.
+    _hammer(candles, 3)
+    _bullish_engulfing(candles, 7)
+    signals = candlestick_signals(*candles)
+
+    assert not signals[: CANDLE_AVERAGE_BARS + 1].any()
+
+
+def test_a_panel_matches_its_columns() -> None:
+    candles = _candles()
+    _hammer(candles, 15)
+    flipped = tuple(v[::-1].copy() for v in candles)
+    panel = candlestick_signals(*(np.column_stack(pair) for pair in zip(candles, flipped)))
+
+    np.testing.assert_array_equal(panel[:, 0], candlestick_signals(*candles))
+    np.testing.assert_array_equal(panel[:, 1], candlestick_signals(*flipped))
+
+
+def test_extrema_masks_skip_the_edges() -> None:
+    values = np.array([5.0, 1.0, 3.0, 2.0, 6.0, 4.0])
+    is_high, is_low = extrema_masks(values, order=1)
+
+    assert np.flatnonzero(is_high).tolist() == [2, 4]
+    assert np.flatnonzero(is_low).tolist() == [1, 3]
+    assert not extrema_masks(values, order=3)[0].any()
+
+
+def test_extrema_masks_run_per_column() -> None:
+    rng = np.random.default_rng(3)
+    panel = rng.normal(size=(40, 3)).cumsum(axis=0)
+    is_high, is_low = extrema_masks(panel, order=2)
+    for column in range(panel.shape[1]):
+        high, low = extrema_masks(panel[:, column], order=2)
+        np.testing.assert_array_equal(is_high[:, column], high)
+        np.testing.assert_array_equal(is_low[:, column], low)
+
+
+def test_zigzag_keeps_only_reversals_past_the_threshold() -> None:
+    # 110 -> 107 is under 5%, so that dip is dropped and the two highs collapse to 111.
+    prices = np.interp(np.arange(48), [0, 10, 15, 20, 30, 40, 47], [100, 110, 107, 111, 100, 120, 118])
+
+    assert zigzag(prices, prices, order=3, threshold=0.05) == [
+        (20, pytest.approx(111.0), 1),
+        (30, pytest.approx(100.0), -1),
+        (40, pytest.approx(120.0), 1),
+    ]
+    assert [kind for _, _, kind in zigzag(prices, prices, order=3, threshold=0.02)] == [1, -1, 1, -1, 1]
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import ta_kernels as kernels
+from tools.screener_tools import filter_variables, parse_filter, run_screen
+
+BARS = 320
+UNIVERSE = ["SCRUP", "SCRDOWN", "SCRWALK"]
+
+
+def _closes() -> dict[str, np.ndarray]:
+    walk = 100 * np.exp(np.cumsum(np.random.default_rng(21).normal(0, 0.015, BARS)))
+    return {
+        "SCRUP": np.linspace(100, 200, BARS),
+        "SCRDOWN": np.linspace(200, 100, BARS),
+        "SCRWALK": walk,
+    }
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    stocks = {ticker: {"name": ticker.title(), "sector": "Testing"} for ticker in UNIVERSE}
+    config = {"stocks": stocks, "sectors": {"Testing": UNIVERSE}, "index": {"ticker": "KSE100"}}
+    (tmp_path / "config.json").write_text(json.dumps(config))
+    dates = pd.bdate_range("2023-01-02", periods=BARS).strftime("%Y-%m-%d")
+    for ticker, close in _closes().items():
+        pd.DataFrame(
+            {
+                "Date": dates,
+                "Close": close,
+                "Open": close,
+                "High": close * 1.01,
+                "Low": close * 0.99,
+                "Volume": np.full(BARS, 500_000.0),
+            }
+        ).to_csv(tmp_path / f"{ticker}.csv", index=False)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "abs(RSI) < 30",  # Call
+        "close.real > 1",  # Attribute
+        "close[0] > 1",  # Subscript
+        "close ** 2 > 1",  # Pow
+        "close // 2 > 1",
+        "RSI < 30 if close else 1",
+        "__import__ < 1",  # disallowed names
+        "FOO > 1",
+        "SMA0 > 1",
+        "close > 'a'",  # non-numeric constants
+        "close > None",
+        "close > True",
+        "close >",
+    ],
+)
+def test_parse_filter_rejects_anything_outside_the_whitelist(expression: str) -> None:
+    with pytest.raises(ValueError):
+        parse_filter(expression)
+
+
+def test_parse_filter_accepts_comparisons_arithmetic_and_boolean_logic() -> None:
+    parse_filter("RSI < 30 and not close > SMA200 or -CHANGE_PCT5 >= 2.5")
+    parse_filter("(high - low) / close * 100 > 1 and 20 < RSI_14 <= 80")
+
+
+def test_variables_are_canonical_with_indicator_default_lengths() -> None:
+    assert filter_variables("rsi < 30 and close > sma and SMA_200 > sma200") == ["RSI14", "CLOSE", "SMA50", "SMA200"]
+    assert filter_variables("BB_LOWER > EMA and CCI > 0 and MACD > 0") == ["BB_LOWER20", "EMA20", "CCI20", "MACD"]
+
+
+def test_screen_returns_the_expected_matches() -> None:
+    closes = _closes()
+    above = [t for t in UNIVERSE if closes[t][-1] > kernels.sma(closes[t], 50)[-1]]
+    assert "SCRUP" in above and "SCRDOWN" not in above
+
+    result = run_screen("close > SMA50", tickers=UNIVERSE)
+    assert result["universe_size"] == len(UNIVERSE)
+    assert sorted(m["ticker"] for m in result["matches"]) == sorted(above)
+
+    oversold = run_screen("RSI < 30", tickers=UNIVERSE)
+    assert [m["ticker"] for m in oversold["matches"]] == ["SCRDOWN"]
+    assert oversold["matches"][0]["date"] == pd.bdate_range("2023-01-02", periods=BARS)[-1].strftime("%Y-%m-%d")
+
+
+def test_screen_sorts_by_a_variable() -> None:
+    result = run_screen("close > 0", tickers=UNIVERSE, sort_by="RSI", descending=True)
+    rsi = [m["values"]["RSI14"] for m in result["matches"]]
+
+    assert len(rsi) == len(UNIVERSE)
+    assert rsi == sorted(rsi, reverse=True)
+    assert result["matches"][0]["ticker"] == "SCRUP"
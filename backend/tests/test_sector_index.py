@@ -0,0 +1,90 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import sector_index
+from tools.sector_index import load_sector_index
+
+BARS = 60
+MEMBERS = ("SECA", "SECB", "SECC")
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    config = {"stocks": {}, "sectors": {"Testing": list(MEMBERS)}, "index": {"ticker": "KSE100"}}
+    (tmp_path / "config.json").write_text(json.dumps(config))
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _bars(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, BARS)))
+    return pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2024-01-01", periods=BARS).strftime("%Y-%m-%d"),
+            "Close": close.round(2),
+            "Open": close.round(2),
+            "High": (close * 1.01).round(2),
+            "Low": (close * 0.99).round(2),
+            "Volume": rng.integers(100_000, 1_000_000, BARS).astype(float),
+        }
+    )
+
+
+def _write(data_dir: Path, frames: dict[str, pd.DataFrame], revision: int) -> None:
+    for ticker, frame in frames.items():
+        path = data_dir / f"{ticker}.csv"
+        frame.to_csv(path, index=False)
+        os.utime(path, ns=(revision * 10**9, revision * 10**9))
+
+
+def _assert_matches_full_rebuild(ticker: str) -> None:
+    incremental = load_sector_index(ticker)
+    sector_index._SECTOR_INDEX_CACHE.clear()
+    pd.testing.assert_frame_equal(incremental, load_sector_index(ticker), rtol=1e-12)
+
+
+@pytest.fixture
+def full() -> dict[str, pd.DataFrame]:
+    frames = {ticker: _bars(seed) for seed, ticker in enumerate(MEMBERS)}
+    # SECB misses a session and SECC starts late, so the union dates are ragged.
+    frames["SECB"] = frames["SECB"].drop(index=30).reset_index(drop=True)
+    frames["SECC"] = frames["SECC"].iloc[5:].reset_index(drop=True)
+    return frames
+
+
+@pytest.mark.parametrize("ticker", ["SECTOR_TESTING", "SECTOR_TESTING_VW"])
+def test_constituents_gaining_bars_match_a_full_rebuild(data_dir: Path, full: dict, ticker: str) -> None:
+    # Constituents stop on different dates, as they update independently.
+    _write(data_dir, {"SECA": full["SECA"].iloc[:-4], "SECB": full["SECB"].iloc[:-2], "SECC": full["SECC"]}, 1)
+    load_sector_index(ticker)
+    _write(data_dir, full, 2)
+    _assert_matches_full_rebuild(ticker)
+
+
+@pytest.mark.parametrize("ticker", ["SECTOR_TESTING", "SECTOR_TESTING_VW"])
+def test_a_revised_last_bar_is_reflected(data_dir: Path, full: dict, ticker: str) -> None:
+    _write(data_dir, full, 1)
+    before = float(load_sector_index(ticker)["Close"].iloc[-1])
+    revised = dict(full, SECA=full["SECA"].copy())
+    revised["SECA"].loc[revised["SECA"].index[-1], "Close"] *= 1.2
+    _write(data_dir, revised, 2)
+    _assert_matches_full_rebuild(ticker)
+    assert float(load_sector_index(ticker)["Close"].iloc[-1]) > before
+
+
+@pytest.mark.parametrize("ticker", ["SECTOR_TESTING", "SECTOR_TESTING_VW"])
+def test_a_revised_last_bar_alongside_new_bars_is_reflected(data_dir: Path, full: dict, ticker: str) -> None:
+    stale = {"SECA": full["SECA"].iloc[:-3], "SECB": full["SECB"], "SECC": full["SECC"]}
+    _write(data_dir, stale, 1)
+    load_sector_index(ticker)
+    # SECA's last cached bar is the earliest, so its date is where the recompute anchors.
+    revised = dict(full, SECA=full["SECA"].copy())
+    revised["SECA"].loc[revised["SECA"].index[-4], "Close"] *= 0.9
+    _write(data_dir, revised, 2)
+    _assert_matches_full_rebuild(ticker)
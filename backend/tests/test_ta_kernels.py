@@ -0,0 +1,153 @@
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import ta_kernels as kernels
+
+# pandas-ta 0.4.71b0 (pinned in requirements.txt) needs Python 3.12+.
+ta = pytest.importorskip("pandas_ta")
+
+BARS = 600
+
+
+def _bars(seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, BARS)))
+    return pd.DataFrame(
+        {
+            "High": close * (1 + rng.uniform(0, 0.02, BARS)),
+            "Low": close * (1 - rng.uniform(0, 0.02, BARS)),
+            "Close": close,
+            "Volume": rng.uniform(1e5, 1e6, BARS),
+        },
+        index=pd.date_range("2020-01-01", periods=BARS, freq="B", name="Date"),
+    )
+
+
+def _tp(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    return ta.hlc3(high, low, close, talib=False)
+
+
+def _column(frame: pd.DataFrame, prefix: str) -> pd.Series:
+    return frame[next(name for name in frame.columns if name.startswith(prefix))]
+
+
+# name -> (kernel over high, low, close, volume arrays; pandas_ta over the same Series)
+CASES: dict[str, tuple[Callable[..., Any], Callable[..., pd.Series]]] = {
+    "RSI": (lambda h, l, c, v: kernels.rsi(c, 14), lambda h, l, c, v: ta.rsi(c, length=14, talib=False)),
+    "SMA": (lambda h, l, c, v: kernels.sma(c, 50), lambda h, l, c, v: ta.sma(c, length=50, talib=False)),
+    "EMA": (lambda h, l, c, v: kernels.ema(c, 20), lambda h, l, c, v: ta.ema(c, length=20, talib=False)),
+    "MACD": (
+        lambda h, l, c, v: kernels.macd(c, 12, 26, 9)[0],
+        lambda h, l, c, v: _column(ta.macd(c, 12, 26, 9, talib=False), "MACD_"),
+    ),
+    "MACD_HIST": (
+        lambda h, l, c, v: kernels.macd(c, 12, 26, 9)[1],
+        lambda h, l, c, v: _column(ta.macd(c, 12, 26, 9, talib=False), "MACDh"),
+    ),
+    "MACD_SIGNAL": (
+        lambda h, l, c, v: kernels.macd(c, 12, 26, 9)[2],
+        lambda h, l, c, v: _column(ta.macd(c, 12, 26, 9, talib=False), "MACDs"),
+    ),
+    "BOLLINGER_LOWER": (
+        lambda h, l, c, v: kernels.bbands(c, 20, 2.0)[0],
+        lambda h, l, c, v: _column(ta.bbands(c, length=20, std=2, talib=False), "BBL"),
+    ),
+    "BOLLINGER_UPPER": (
+        lambda h, l, c, v: kernels.bbands(c, 20, 2.0)[2],
+        lambda h, l, c, v: _column(ta.bbands(c, length=20, std=2, talib=False), "BBU"),
+    ),
+    "ATR": (
+        lambda h, l, c, v: kernels.atr(h, l, c, 14),
+        lambda h, l, c, v: ta.atr(h, l, c, length=14, talib=False),
+    ),
+    "VWAP": (lambda h, l, c, v: kernels.vwap(h, l, c, v), lambda h, l, c, v: ta.vwap(h, l, c, v)),
+    "STOCHASTIC_K": (
+        lambda h, l, c, v: kernels.stoch(h, l, c, 14, 3, 3)[0],
+        lambda h, l, c, v: _column(ta.stoch(h, l, c, k=14, d=3, smooth_k=3, talib=False), "STOCHk"),
+    ),
+    "STOCHASTIC_D": (
+        lambda h, l, c, v: kernels.stoch(h, l, c, 14, 3, 3)[1],
+        lambda h, l, c, v: _column(ta.stoch(h, l, c, k=14, d=3, smooth_k=3, talib=False), "STOCHd"),
+    ),
+    "OBV": (lambda h, l, c, v: kernels.obv(c, v), lambda h, l, c, v: ta.obv(c, v, talib=False)),
+    "ADX": (
+        lambda h, l, c, v: kernels.adx(h, l, c, 14)[0],
+        lambda h, l, c, v: _column(ta.adx(h, l, c, length=14, talib=False), "ADX_"),
+    ),
+    "PLUS_DI": (
+        lambda h, l, c, v: kernels.adx(h, l, c, 14)[1],
+        lambda h, l, c, v: _column(ta.adx(h, l, c, length=14, talib=False), "DMP"),
+    ),
+    "MINUS_DI": (
+        lambda h, l, c, v: kernels.adx(h, l, c, 14)[2],
+        lambda h, l, c, v: _column(ta.adx(h, l, c, length=14, talib=False), "DMN"),
+    ),
+    "WILLIAMS_R": (
+        lambda h, l, c, v: kernels.willr(h, l, c, 14),
+        lambda h, l, c, v: ta.willr(h, l, c, length=14, talib=False),
+    ),
+    # pandas_ta's own CCI has a precedence slip (see kernels.cci and the test
+    # below), so the reference is the published formula over its SMA and MAD.
+    "CCI": (
+        lambda h, l, c, v: kernels.cci(h, l, c, 20),
+        lambda h, l, c, v: (_tp(h, l, c) - ta.sma(_tp(h, l, c), 20)) / (0.015 * ta.mad(_tp(h, l, c), 20)),
+    ),
+}
+
+FIELDS = ("High", "Low", "Close", "Volume")
+
+
+def _assert_parity(ours: np.ndarray, theirs: pd.Series) -> None:
+    theirs = np.asarray(theirs, dtype="float64")
+    assert ours.shape == theirs.shape
+    both = ~np.isnan(ours) & ~np.isnan(theirs)
+    # Warmup conventions may differ by a bar or two; past them both must report.
+    assert both.sum() >= np.count_nonzero(~np.isnan(theirs)) - 2
+    assert both.sum() > len(ours) // 2
+    np.testing.assert_allclose(ours[both], theirs[both], rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_kernel_matches_pandas_ta(name: str) -> None:
+    kernel, reference = CASES[name]
+    bars = _bars()
+    ours = kernel(*(bars[field].to_numpy() for field in FIELDS))
+    _assert_parity(ours, reference(*(bars[field] for field in FIELDS)))
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_kernel_over_traded_bars_of_a_gapped_panel(name: str) -> None:
+    """Each column of a union-date panel, with its gaps and late start, matches pandas_ta on its own bars."""
+    kernel, reference = CASES[name]
+    first, second = _bars(7), _bars(11)
+    second.iloc[:40] = np.nan
+    second.iloc[[150, 151, 300, 420]] = np.nan
+    first.iloc[[90, 500]] = np.nan
+    panel = [np.column_stack([first[field], second[field]]) for field in FIELDS]
+
+    ours = kernels.on_traded_bars(kernel, *panel)
+
+    for column, bars in enumerate((first, second)):
+        traded = bars.dropna()
+        expected = reference(*(traded[field] for field in FIELDS)).reindex(bars.index)
+        assert np.isnan(ours[~bars["Close"].notna().to_numpy(), column]).all()
+        _assert_parity(ours[:, column], expected)
+
+
+def test_reference_is_the_pinned_pandas_ta() -> None:
+    requirements = Path(__file__).resolve().parents[1] / "requirements.txt"
+    pinned = next(line for line in requirements.read_text().splitlines() if line.startswith("pandas-ta=="))
+    assert ta.version == pinned.split("==")[1]
+
+
+def test_pandas_ta_cci_deviation_is_the_documented_one() -> None:
+    """pandas_ta computes tp - sma / (c * mad); kernels.cci keeps (tp - sma) / (c * mad) on purpose."""
+    bars = _bars()
+    high, low, close = bars["High"], bars["Low"], bars["Close"]
+    tp = _tp(high, low, close)
+    mean, mad = ta.sma(tp, 20), ta.mad(tp, 20)
+    np.testing.assert_allclose(ta.cci(high, low, close, length=20, talib=False), tp - mean / (0.015 * mad), rtol=1e-9)
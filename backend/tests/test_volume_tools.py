@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.data_tools import load_full_dataframe
+from tools.volume_tools import volume_signal_frame, volume_signals
+
+BARS = 120
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _bars() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, BARS)))
+    return pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2024-01-01", periods=BARS).strftime("%Y-%m-%d"),
+            "Close": close.round(2),
+            "Open": close.round(2),
+            "High": (close * 1.01).round(2),
+            "Low": (close * 0.99).round(2),
+            "Volume": rng.integers(100_000, 1_000_000, BARS).astype(float),
+        }
+    )
+
+
+def _write(data_dir: Path, ticker: str, frame: pd.DataFrame, revision: int) -> None:
+    path = data_dir / f"{ticker}.csv"
+    frame.to_csv(path, index=False)
+    # A distinct mtime per rewrite, so the data version changes even within one clock tick.
+    os.utime(path, ns=(revision * 10**9, revision * 10**9))
+
+
+def _assert_matches_full_recompute(ticker: str) -> None:
+    df = load_full_dataframe(ticker)
+    expected = volume_signals(df["Close"], df["Volume"])
+    pd.testing.assert_frame_equal(volume_signal_frame(ticker), expected, rtol=1e-9)
+
+
+def test_appended_bars_match_a_full_recompute(data_dir: Path) -> None:
+    bars = _bars()
+    _write(data_dir, "VOLAPPEND", bars.iloc[:-5], 1)
+    volume_signal_frame("VOLAPPEND")
+    _write(data_dir, "VOLAPPEND", bars, 2)
+    _assert_matches_full_recompute("VOLAPPEND")
+
+
+def test_a_revised_last_bar_is_not_served_stale(data_dir: Path) -> None:
+    bars = _bars()
+    _write(data_dir, "VOLREVISE", bars, 1)
+    before = volume_signal_frame("VOLREVISE")["volume_zscore"].iloc[-1]
+    bars.loc[BARS - 1, "Volume"] *= 10
+    _write(data_dir, "VOLREVISE", bars, 2)
+    _assert_matches_full_recompute("VOLREVISE")
+    assert volume_signal_frame("VOLREVISE")["volume_zscore"].iloc[-1] > before
+
+
+def test_a_revised_last_bar_with_new_bars_is_recomputed(data_dir: Path) -> None:
+    bars = _bars()
+    _write(data_dir, "VOLBOTH", bars.iloc[:-3], 1)
+    volume_signal_frame("VOLBOTH")
+    bars.loc[BARS - 4, "Volume"] *= 10
+    _write(data_dir, "VOLBOTH", bars, 2)
+    _assert_matches_full_recompute("VOLBOTH")
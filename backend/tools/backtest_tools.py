@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from tools.data_tools import get_registry, load_full_dataframe
+
+# Backtests take an event stream -- one row per (ticker, date, direction) with
+# optional target/stop levels -- and evaluate every event at once. All tickers'
+# bars are laid end to end in flat arrays; each event becomes an entry offset,
+# and its forward window is a gathered (events x horizon) block, so there is
+# no per-event Python loop.
+
+DEFAULT_HORIZONS = (1, 5, 10, 20)
+DIRECTIONS = {"BULLISH": 1, "BEARISH": -1, "NEUTRAL": 0, "BUY": 1, "SELL": -1, "LONG": 1, "SHORT": -1}
+
+
+def _direction(value: Any) -> int:
+    if isinstance(value, str):
+        return DIRECTIONS.get(value.upper(), 0)
+    return int(np.sign(value)) if value == value else 0
+
+
+def _market_arrays(tickers: Iterable[str]) -> tuple[dict[str, np.ndarray], dict[str, tuple[int, pd.DatetimeIndex]]]:
+    """Concatenate each ticker's full history; returns the flat arrays and per-ticker (offset, dates)."""
+    fields: dict[str, list[np.ndarray]] = {"High": [], "Low": [], "Close": []}
+    layout: dict[str, tuple[int, pd.DatetimeIndex]] = {}
+    offset = 0
+    for ticker in tickers:
+        try:
+            df = load_full_dataframe(ticker)
+        except FileNotFoundError:
+            continue
+        layout[ticker] = (offset, df.index)
+        for field, parts in fields.items():
+            parts.append(df[field].to_numpy(dtype="float64"))
+        offset += len(df)
+    arrays = {field: np.concatenate(parts) if parts else np.empty(0) for field, parts in fields.items()}
+    return arrays, layout
+
+
+def evaluate_events(
+    events: pd.DataFrame | list[dict],
+    horizons: Iterable[int] = DEFAULT_HORIZONS,
+    max_horizon: int | None = None,
+    target_pct: float | None = None,
+    stop_pct: float | None = None,
+) -> pd.DataFrame:
+    """Evaluate each event from the close of its bar; returns one row per event.
+
+    events needs ticker, date and direction (+1/-1 or BULLISH/BEARISH/...);
+    optional entry, target and stop columns give absolute levels. Without
+    levels, target_pct/stop_pct derive them from the entry price. Returns are
+    signed by direction, so a positive return always means the call was right.
+    The target-before-stop check runs over max_horizon bars (default: the
+    longest horizon); a bar touching both counts as the stop, conservatively.
+    """
+    frame = pd.DataFrame(events).copy()
+    horizons = sorted({int(h) for h in horizons if int(h) > 0})
+    window = int(max_horizon or max(horizons, default=20))
+    if frame.empty:
+        return frame
+
+    frame["ticker"] = frame["ticker"].astype(str).str.upper()
+    frame["direction"] = frame["direction"].map(_direction)
+    frame["date"] = pd.to_datetime(frame["date"])
+    arrays, layout = _market_arrays(frame["ticker"].unique())
+    closes, highs, lows = arrays["Close"], arrays["High"], arrays["Low"]
+
+    # Entry is the last bar on or before the event date, so a report written
+    # after the close is entered on the bar it analysed.
+    entry = np.full(len(frame), -1, dtype=np.int64)
+    end = np.full(len(frame), -1, dtype=np.int64)
+    for ticker, rows in frame.groupby("ticker").indices.items():
+        if ticker not in layout:
+            continue
+        offset, dates = layout[ticker]
+        position = dates.searchsorted(frame["date"].to_numpy()[rows], side="right") - 1
+        entry[rows] = np.where(position >= 0, offset + position, -1)
+        end[rows] = offset + len(dates) - 1
+
+    valid = (entry >= 0) & (frame["direction"].to_numpy() != 0)
+    safe_entry = np.where(valid, entry, 0)
+    entry_price = closes[safe_entry] if len(closes) else np.zeros(len(frame))
+    if "entry" in frame:
+        entry_price = np.where(frame["entry"].notna(), frame["entry"].to_numpy(dtype="float64"), entry_price)
+    entry_price = np.where(valid, entry_price, np.nan)
+    direction = frame["direction"].to_numpy(dtype="float64")
+
+    steps = np.arange(1, window + 1)
+    forward = safe_entry[:, None] + steps[None, :]
+    in_range = valid[:, None] & (forward <= end[:, None])
+    forward = np.where(in_range, forward, 0)
+    fwd_close = np.where(in_range, closes[forward], np.nan) if len(closes) else np.full(forward.shape, np.nan)
+    fwd_high = np.where(in_range, highs[forward], np.nan) if len(highs) else np.full(forward.shape, np.nan)
+    fwd_low = np.where(in_range, lows[forward], np.nan) if len(lows) else np.full(forward.shape, np.nan)
+
+    result = frame.assign(entry_price=entry_price)
+    entry_dates = np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for ticker, rows in frame.groupby("ticker").indices.items():
+        if ticker in layout:
+            offset, dates = layout[ticker]
+            ok = valid[rows]
+            entry_dates[rows[ok]] = dates.values[entry[rows[ok]] - offset]
+    result["entry_date"] = entry_dates
+    result["bars_available"] = in_range.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for h in horizons:
+            column = fwd_close[:, h - 1] if h <= window else np.full(len(frame), np.nan)
+            result[f"return_{h}"] = direction * (column / entry_price - 1.0)
+
+        max_high = np.fmax.reduce(fwd_high, axis=1) if window else np.full(len(frame), np.nan)
+        min_low = np.fmin.reduce(fwd_low, axis=1) if window else np.full(len(frame), np.nan)
+        result["max_favourable"] = np.where(direction > 0, max_high / entry_price - 1.0, 1.0 - min_low / entry_price)
+        result["max_adverse"] = np.where(direction > 0, min_low / entry_price - 1.0, 1.0 - max_high / entry_price)
+
+        # Drawdown from the running best close along the path (in the trade's favour).
+        signed_path = direction[:, None] * (fwd_close / entry_price[:, None] - 1.0)
+        running_peak = np.fmax.accumulate(np.fmax(signed_path, 0.0), axis=1)
+        result["max_drawdown"] = np.fmin.reduce(signed_path - running_peak, axis=1)
+
+    target = frame["target"].to_numpy(dtype="float64") if "target" in frame else np.full(len(frame), np.nan)
+    stop = frame["stop"].to_numpy(dtype="float64") if "stop" in frame else np.full(len(frame), np.nan)
+    if target_pct is not None:
+        target = np.where(np.isnan(target), entry_price * (1.0 + direction * target_pct), target)
+    if stop_pct is not None:
+        stop = np.where(np.isnan(stop), entry_price * (1.0 - direction * stop_pct), stop)
+
+    with np.errstate(invalid="ignore"):
+        hit_target = np.where(direction[:, None] > 0, fwd_high >= target[:, None], fwd_low <= target[:, None])
+        hit_stop = np.where(direction[:, None] > 0, fwd_low <= stop[:, None], fwd_high >= stop[:, None])
+    hit_target &= in_range
+    hit_stop &= in_range
+    first_target = np.where(hit_target.any(axis=1), hit_target.argmax(axis=1), window)
+    first_stop = np.where(hit_stop.any(axis=1), hit_stop.argmax(axis=1), window)
+    has_levels = ~np.isnan(target) | ~np.isnan(stop)
+    outcome = np.select(
+        [~valid | ~has_levels, first_stop <= first_target, first_target < window],
+        ["n/a", "stop", "target"],
+        default="open",
+    )
+    outcome = np.where((outcome == "stop") & (first_stop == window), "open", outcome)
+    result["target"] = target
+    result["stop"] = stop
+    result["outcome"] = outcome
+    result["bars_to_outcome"] = np.where(
+        outcome == "target", first_target + 1, np.where(outcome == "stop", first_stop + 1, np.nan)
+    )
+    return result
+
+
+def _round(value: Any, digits: int = 4) -> float | None:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def summarize_backtest(results: pd.DataFrame, horizons: Iterable[int] = DEFAULT_HORIZONS) -> dict[str, Any]:
+    """Aggregate per-event results into hit rates, mean/median returns and outcome counts."""
+    horizons = sorted({int(h) for h in horizons if int(h) > 0})
+    evaluated = results[results["entry_price"].notna()] if not results.empty else results
+    summary: dict[str, Any] = {"events": int(len(results)), "evaluated": int(len(evaluated)), "horizons": {}}
+    for h in horizons:
+        column = evaluated.get(f"return_{h}", pd.Series(dtype="float64")).dropna()
+        summary["horizons"][str(h)] = {
+            "count": int(len(column)),
+            "hit_rate": _round((column > 0).mean()) if len(column) else None,
+            "mean_return_pct": _round(column.mean() * 100, 2) if len(column) else None,
+            "median_return_pct": _round(column.median() * 100, 2) if len(column) else None,
+        }
+    if not evaluated.empty:
+        summary["mean_max_adverse_pct"] = _round(evaluated["max_adverse"].mean() * 100, 2)
+        summary["worst_drawdown_pct"] = _round(evaluated["max_drawdown"].min() * 100, 2)
+        outcomes = evaluated["outcome"].value_counts().to_dict()
+        decided = outcomes.get("target", 0) + outcomes.get("stop", 0)
+        summary["outcomes"] = {key: int(value) for key, value in outcomes.items()}
+        summary["target_before_stop_rate"] = _round(outcomes.get("target", 0) / decided) if decided else None
+    return summary
+
+
+def backtest_events(
+    events: pd.DataFrame | list[dict],
+    horizons: Iterable[int] = DEFAULT_HORIZONS,
+    group_by: str | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    results = evaluate_events(events, horizons, **kwargs)
+    summary = summarize_backtest(results, horizons)
+    if group_by and not results.empty and group_by in results:
+        summary["groups"] = {
+            str(key): summarize_backtest(group, horizons) for key, group in results.groupby(group_by, sort=True)
+        }
+    return summary
+
+
+async def backtest_patterns(
+    ticker: str | None = None,
+    pattern: str | None = None,
+    horizons: list[int] | None = None,
+    target_pct: float | None = None,
+    stop_pct: float | None = None,
+) -> dict[str, Any]:
+    """How did each pattern perform historically? Covers one ticker, or every ticker with data.
+
+    Events are read from the pattern_events index, synced first so only bars
+    added since the last sync are scanned.
+    """
+    from database import query_pattern_events
+    from tools.pattern_index import sync_pattern_index
+
+    tickers = [ticker.upper()] if ticker else get_registry().tickers_with_data()
+    wanted = pattern.replace("_", " ").title() if pattern else None
+    await sync_pattern_index(tickers)
+    stored = await query_pattern_events(tickers=tickers, pattern=wanted, limit=None)
+    # Enter when a pattern is confirmed, not on the bar it is dated to, so swing
+    # patterns are not credited with the move that confirmed them.
+    events = [{**event, "date": event["confirmed_date"], "direction": event["implication"]} for event in stored]
+    horizons = horizons or list(DEFAULT_HORIZONS)
+    summary = backtest_events(
+        events, horizons, group_by="pattern", target_pct=target_pct, stop_pct=stop_pct
+    )
+    summary.update({"tickers": tickers, "pattern": wanted or "all"})
+    return summary
+
+
+def report_signal_events(reports: list[dict]) -> list[dict]:
+    """Turn stored report signals (ticker, generated_at, signal, target, stop_loss) into events."""
+    return [
+        {
+            "ticker": report["ticker"],
+            "date": pd.Timestamp(report["generated_at"]).tz_localize(None).normalize(),
+            "direction": report["signal"],
+            "signal": report["signal"],
+            "target": report.get("target"),
+            "stop": report.get("stop_loss"),
+            "report_id": report.get("id"),
+        }
+        for report in reports
+        if report.get("generated_at")
+    ]
+
+
+async def backtest_reports(ticker: str | None = None, horizons: list[int] | None = None) -> dict[str, Any]:
+    """Score stored report signals against what the market did next, grouped by signal."""
+    from database import get_report_signals
+
+    reports = await get_report_signals(ticker.upper() if ticker else None)
+    horizons = horizons or list(DEFAULT_HORIZONS)
+    summary = backtest_events(report_signal_events(reports), horizons, group_by="signal")
+    summary["reports"] = len(reports)
+    return summary
+
+
+if __name__ == "__main__":
+    import asyncio
+    import json
+    import time
+
+    from database import init_db
+
+    asyncio.run(init_db())
+    started = time.perf_counter()
+    print(json.dumps(asyncio.run(backtest_patterns(target_pct=0.05, stop_pct=0.03)), indent=2))
+    print(f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(7)
+    tickers = get_registry().tickers_with_data()
+    synthetic = pd.DataFrame(
+        {
+            "ticker": rng.choice(tickers, 20_000),
+            "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 330, 20_000), unit="D"),
+            "direction": rng.choice([1, -1], 20_000),
+        }
+    )
+    started = time.perf_counter()
+    backtest_events(synthetic, target_pct=0.05, stop_pct=0.03)
+    print(f"20,000 synthetic events: {(time.perf_counter() - started) * 1000:.1f} ms")
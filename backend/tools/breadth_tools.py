@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from tools import ta_kernels as kernels
+from tools.data_tools import PERIOD_DAYS, data_version, get_registry, load_panel, panel_period_start
+from utils.cache import LRUCache
+
+# Breadth is computed for every date at once from (dates x tickers) panels of
+# the whole universe, index excluded. A ticker that did not trade on a date
+# has NaN there and is simply not counted that day; its moving averages run
+# over its own traded bars, so a missed session does not drop it from the
+# SMA denominators for the next `length` days.
+
+NEW_HIGH_WINDOW = 252
+NEW_HIGH_MIN_BARS = 20
+BREADTH_SMAS = (50, 200)
+TREND_BARS = 20
+# Longest period market_breadth reports; the panel adds enough warmup bars
+# ahead of it for the new-high window and the longest SMA.
+BREADTH_PERIOD = "1Y"
+BREADTH_WARMUP = max(NEW_HIGH_WINDOW, *BREADTH_SMAS)
+
+_BREADTH_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("BREADTH_CACHE_MAX_MB", "8")) * 1024 * 1024),
+    sizeof=lambda frame: int(frame.memory_usage(index=True, deep=False).sum()),
+)
+
+
+def _universe() -> list[str]:
+    registry = get_registry()
+    return [ticker for ticker in registry.tickers_with_data() if ticker != registry.index_ticker]
+
+
+def breadth_series(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame) -> pd.DataFrame:
+    """Per-date breadth of a universe given date-aligned Close/High/Low panels."""
+    prices = close.to_numpy(dtype=np.float64)
+    traded = ~np.isnan(prices)
+    previous = np.full_like(prices, np.nan)
+    previous[1:] = close.ffill().to_numpy(dtype=np.float64)[:-1]
+    change = prices - previous
+
+    # New highs/lows break the range of the prior window, so a ticker needs some
+    # history before it can register one.
+    rolling = {"min_periods": NEW_HIGH_MIN_BARS}
+    prior_high = high.rolling(NEW_HIGH_WINDOW, **rolling).max().shift(1).to_numpy(dtype=np.float64)
+    prior_low = low.rolling(NEW_HIGH_WINDOW, **rolling).min().shift(1).to_numpy(dtype=np.float64)
+
+    advancers = (change > 0).sum(axis=1)
+    decliners = (change < 0).sum(axis=1)
+    columns: dict[str, np.ndarray] = {
+        "issues": traded.sum(axis=1),
+        "advancers": advancers,
+        "decliners": decliners,
+        "unchanged": (change == 0).sum(axis=1),
+        "ad_line": np.cumsum(advancers - decliners),
+        "new_highs": (high.to_numpy(dtype=np.float64) > prior_high).sum(axis=1),
+        "new_lows": (low.to_numpy(dtype=np.float64) < prior_low).sum(axis=1),
+    }
+    with np.errstate(invalid="ignore"):
+        for length in BREADTH_SMAS:
+            average = kernels.on_traded_bars(lambda values: kernels.sma(values, length), prices)
+            eligible = (~np.isnan(average)).sum(axis=1)
+            above = (prices > average).sum(axis=1)
+            columns[f"pct_above_sma{length}"] = np.where(eligible > 0, above / np.maximum(eligible, 1) * 100, np.nan)
+    return pd.DataFrame(columns, index=close.index)
+
+
+def market_breadth_frame() -> pd.DataFrame:
+    """Breadth for every date of the last BREADTH_PERIOD, cached per data version."""
+    tickers = _universe()
+    key = (tuple(tickers), tuple(data_version(ticker) for ticker in tickers))
+    cached = _BREADTH_CACHE.get(key)
+    if cached is not None:
+        return cached
+    if not tickers:
+        raise ValueError("No tickers with data for market breadth")
+
+    panels = load_panel(tickers, BREADTH_PERIOD, fields=("Close", "High", "Low"), warmup=BREADTH_WARMUP)
+    breadth = breadth_series(panels["Close"], panels["High"], panels["Low"])
+    breadth = breadth.iloc[panel_period_start(breadth.index, BREADTH_PERIOD) :]
+    _BREADTH_CACHE.put(key, breadth)
+    return breadth
+
+
+def breadth_cache_stats() -> dict[str, Any]:
+    return _BREADTH_CACHE.stats()
+
+
+def _value(x: float, digits: int = 1) -> float | None:
+    return None if np.isnan(x) else round(float(x), digits)
+
+
+def market_breadth(period: str = "3M") -> dict[str, Any]:
+    breadth = market_breadth_frame()
+    cutoff = breadth.index[-1] - pd.Timedelta(days=PERIOD_DAYS.get(period, 90))
+    window = breadth.iloc[int(breadth.index.searchsorted(cutoff, side="left")) :]
+    latest = window.iloc[-1]
+    lookback = min(TREND_BARS, len(window) - 1)
+    then = window.iloc[-1 - lookback]
+    recent = window.iloc[-lookback:] if lookback > 0 else window.iloc[-1:]
+
+    ad_change = int(latest["ad_line"] - then["ad_line"])
+    highs, lows = int(recent["new_highs"].sum()), int(recent["new_lows"].sum())
+    sma50_now, sma50_then = float(latest["pct_above_sma50"]), float(then["pct_above_sma50"])
+    if ad_change > 0 and highs >= lows:
+        trend = "broadening"
+    elif ad_change < 0 and lows >= highs:
+        trend = "narrowing"
+    else:
+        trend = "mixed"
+
+    summary = (
+        f"Breadth {trend}: {int(latest['advancers'])} advancers vs {int(latest['decliners'])} decliners "
+        f"on {breadth.index[-1]:%Y-%m-%d}; A/D line {ad_change:+d} over {lookback} bars, "
+        f"{highs} new highs vs {lows} new lows."
+    )
+    if not np.isnan(sma50_now):
+        summary += f" {sma50_now:.0f}% of stocks above SMA50"
+        summary += f" (from {sma50_then:.0f}%)." if not np.isnan(sma50_then) else "."
+
+    return {
+        "period": period,
+        "date": breadth.index[-1].strftime("%Y-%m-%d"),
+        "universe_size": int(latest["issues"]),
+        "advancers": int(latest["advancers"]),
+        "decliners": int(latest["decliners"]),
+        "unchanged": int(latest["unchanged"]),
+        "ad_line_change": ad_change,
+        "new_highs": highs,
+        "new_lows": lows,
+        "pct_above_sma50": _value(sma50_now),
+        "pct_above_sma50_prior": _value(sma50_then),
+        "pct_above_sma200": _value(float(latest["pct_above_sma200"])),
+        "trend_bars": lookback,
+        "breadth_trend": trend,
+        "summary": summary,
+    }
+
+
+if __name__ == "__main__":
+    print(market_breadth_frame().tail(5))
+    print(market_breadth("3M"))
@@ -6,11 +6,18 @@ from pathlib import Path
 from typing import Any
 
 import mplfinance as mpf
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 
-from tools.data_tools import load_dataframe
-from tools.level_tools import find_support_resistance
+from tools.comparison_tools import INDEX_TICKER, RS_WINDOW, relative_strength_series
+from tools.data_tools import load_dataframe, load_resampled, normalize_timeframe, ticker_info
+from tools.indicator_tools import indicator_values
+from tools.level_tools import find_support_resistance, volume_profile
+from tools.sector_index import sector_index_ticker
+
+# Comparison overlays (optionally suffixed with a window, e.g. ROLLING_BETA_20)
+# -> panel label; each maps to a column of relative_strength_series.
+COMPARISON_OVERLAYS = {"relative_strength": "RS", "rolling_beta": "Beta", "rolling_correlation": "Corr"}
 
 
 def _output_dir() -> Path:
@@ -48,45 +55,80 @@ def generate_chart(
     fibonacci: dict | None = None,
     channels: list[dict] | None = None,
     style: str = "dark",
+    timeframe: str = "daily",
+    index: str = INDEX_TICKER,
     **kwargs  # Ignore any extra arguments from AI
 ) -> dict[str, Any]:
     overlays = overlays or []
     annotations = annotations or []
 
-    df = load_dataframe(ticker, period)
+    timeframe = normalize_timeframe(timeframe)
+    df = load_dataframe(ticker, period, timeframe)
     addplots: list[Any] = []
     hlines = []
     vlines = []
+    # Panels 0 and 1 are price and volume (shared with RSI); each comparison
+    # overlay gets the next free panel below them.
+    extra_panels: dict[str, int] = {}
 
     # Process overlays (moving averages, indicators)
     for overlay in overlays:
         upper = overlay.upper()
         if upper.startswith("SMA_"):
             length = int(upper.split("_")[1])
-            sma = ta.sma(df["Close"], length=length)
-            if sma is not None and not sma.empty:
+            sma = indicator_values(ticker, "SMA", {"period": length}, period, timeframe).to_numpy()
+            if not np.isnan(sma).all():
                 addplots.append(mpf.make_addplot(sma, color="#F7A21B", width=1.5))
         elif upper.startswith("EMA_"):
             length = int(upper.split("_")[1])
-            ema = ta.ema(df["Close"], length=length)
-            if ema is not None and not ema.empty:
+            ema = indicator_values(ticker, "EMA", {"period": length}, period, timeframe).to_numpy()
+            if not np.isnan(ema).all():
                 addplots.append(mpf.make_addplot(ema, color="#E040FB", width=1.5))
         elif upper == "BOLLINGER":
-            bands = ta.bbands(df["Close"])
-            if bands is not None and not bands.empty:
-                addplots.append(mpf.make_addplot(bands.iloc[:, 0], color="#78909C", alpha=0.5))
-                addplots.append(mpf.make_addplot(bands.iloc[:, 2], color="#78909C", alpha=0.5))
+            bands = indicator_values(ticker, "BOLLINGER", {"period": 20, "std": 2}, period, timeframe)
+            lower_band, upper_band = bands["BBL"].to_numpy(), bands["BBU"].to_numpy()
+            if not np.isnan(lower_band).all():
+                addplots.append(mpf.make_addplot(lower_band, color="#78909C", alpha=0.5))
+                addplots.append(mpf.make_addplot(upper_band, color="#78909C", alpha=0.5))
         elif upper == "VWAP":
-            vwap = ta.vwap(df["High"], df["Low"], df["Close"], df["Volume"])
-            if vwap is not None and not vwap.empty:
-                addplots.append(mpf.make_addplot(vwap, color="#FF9800", width=1.5))
+            vwap = indicator_values(ticker, "VWAP", {}, period, timeframe).to_numpy()
+            addplots.append(mpf.make_addplot(vwap, color="#FF9800", width=1.5))
         elif upper == "SUPPORT_RESISTANCE":
-            levels = find_support_resistance(ticker, "both")
+            levels = find_support_resistance(ticker, "both", timeframe)
             hlines.extend(levels.get("key_support", []))
             hlines.extend(levels.get("key_resistance", []))
+        elif upper == "VOLUME_PROFILE":
+            profile = volume_profile(ticker, period)
+            hlines.extend([profile["poc"], profile["value_area_high"], profile["value_area_low"]])
+            hlines.extend(profile["high_volume_nodes"])
+        elif upper.startswith(("RELATIVE_STRENGTH", "ROLLING_BETA", "ROLLING_CORRELATION")):
+            name, _, suffix = upper.rpartition("_") if upper[-1].isdigit() else (upper, "", "")
+            column = name.lower()
+            window = int(suffix) if suffix else RS_WINDOW
+            if column not in COMPARISON_OVERLAYS or window < 2:
+                continue
+            series = relative_strength_series(ticker, period, window, timeframe, index)
+            values = series[column].reindex(df.index).to_numpy()
+            if not np.isnan(values).all():
+                panel = extra_panels.setdefault(upper, 2 + len(extra_panels))
+                label = COMPARISON_OVERLAYS[column]
+                addplots.append(mpf.make_addplot(values, panel=panel, color="#29B6F6", ylabel=label, secondary_y=False))
+        elif upper in ("INDEX", "SECTOR_INDEX", "SECTOR_INDEX_VW"):
+            benchmark = index
+            if upper != "INDEX":
+                info = ticker_info(ticker)
+                weighting = "volume" if upper.endswith("_VW") else "equal"
+                benchmark = sector_index_ticker(info.sector, weighting) if info and info.sector else ""
+            if benchmark:
+                # Rebased onto the stock's first close so both share the price axis.
+                closes = load_resampled(benchmark, timeframe)["Close"].reindex(df.index).ffill().to_numpy()
+                first = closes[~np.isnan(closes)][:1]
+                if first.size:
+                    rebased = closes / first[0] * float(df["Close"].iloc[0])
+                    addplots.append(mpf.make_addplot(rebased, color="#B0BEC5", width=1.0, linestyle="-."))
         elif upper == "RSI":
-            rsi = ta.rsi(df["Close"], length=14)
-            if rsi is not None and not rsi.empty:
+            rsi = indicator_values(ticker, "RSI", {"period": 14}, period, timeframe).to_numpy()
+            if not np.isnan(rsi).all():
                 addplots.append(mpf.make_addplot(rsi, panel=1, color="#F7A21B", ylabel="RSI", secondary_y=False))
                 # Add overbought/oversold lines
                 addplots.append(mpf.make_addplot([70] * len(df), panel=1, color="#ef5350", linestyle="--", width=0.7, alpha=0.5))
@@ -141,7 +183,7 @@ def generate_chart(
         "volume": True,
         "returnfig": True,
         "figsize": (14, 10),
-        "title": f"{ticker} Technical Analysis",
+        "title": f"{ticker} Technical Analysis" + ("" if timeframe == "daily" else f" ({timeframe.title()})"),
     }
     
     # Only add these if they have content
@@ -193,6 +235,7 @@ def generate_chart(
             "chart_path": str(chart_path),
             "dimensions": {"width": 1400, "height": 1000},
             "dpi": 150,
+            "timeframe": timeframe,
             "overlays_applied": overlays,
             "annotations_applied": annotations,
         }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+STORE_SUFFIX = ".mlc"
+MAGIC = b"MLCOL001"
+ALIGNMENT = 64
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_columnar(df: pd.DataFrame, path: Path, float_dtype: str = "float64") -> Path:
+    """Write a Date-indexed OHLCV frame as one contiguous, aligned block per column.
+
+    Layout: 8-byte magic, little-endian uint64 header length, JSON header, then
+    the int64 nanosecond dates followed by each price column.
+    """
+    dates = np.ascontiguousarray(df.index.values.astype("datetime64[ns]").view("<i8"))
+    value_dtype = np.dtype(float_dtype).newbyteorder("<")
+    columns: list[tuple[str, np.ndarray]] = [("Date", dates)]
+    for name in PRICE_COLUMNS:
+        columns.append((name, np.ascontiguousarray(df[name].to_numpy(dtype=value_dtype))))
+
+    data_start = ALIGNMENT
+    while True:
+        meta = []
+        offset = data_start
+        for name, arr in columns:
+            meta.append({"name": name, "dtype": arr.dtype.str, "offset": offset})
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps({"rows": len(dates), "columns": meta}).encode("utf-8")
+        if len(MAGIC) + 8 + len(header) <= data_start:
+            break
+        data_start = _align(len(MAGIC) + 8 + len(header))
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<Q", len(header)))
+        fh.write(header)
+        for entry, (_, arr) in zip(meta, columns):
+            fh.seek(entry["offset"])
+            fh.write(arr.tobytes())
+        fh.truncate(offset)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path: Path) -> dict[str, Any]:
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a columnar market-data file: {path}")
+        (length,) = struct.unpack("<Q", fh.read(8))
+        return json.loads(fh.read(length).decode("utf-8"))
+
+
+def read_columnar(path: Path) -> pd.DataFrame:
+    """Open a columnar file as a Date-indexed frame whose columns are read-only memory maps."""
+    header = read_header(path)
+    rows = int(header["rows"])
+    arrays: dict[str, np.ndarray] = {}
+    for entry in header["columns"]:
+        if rows == 0:
+            arrays[entry["name"]] = np.empty(0, dtype=entry["dtype"])
+            continue
+        arrays[entry["name"]] = np.memmap(
+            path, dtype=np.dtype(entry["dtype"]), mode="r", offset=entry["offset"], shape=(rows,)
+        )
+
+    index = pd.DatetimeIndex(arrays.pop("Date").view("datetime64[ns]"), name="Date")
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def convert_csv(csv_path: Path, out_path: Path | None = None, float_dtype: str = "float64") -> Path:
+    from tools.data_tools import read_csv_frame
+
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path else csv_path.with_suffix(STORE_SUFFIX)
+    return write_columnar(read_csv_frame(csv_path), out_path, float_dtype=float_dtype)
+
+
+def convert_directory(src_dir: Path, dst_dir: Path | None = None, float_dtype: str = "float64") -> list[Path]:
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir) if dst_dir else src_dir
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for csv_path in sorted(src_dir.glob("*.csv")):
+        try:
+            written.append(convert_csv(csv_path, dst_dir / f"{csv_path.stem}{STORE_SUFFIX}", float_dtype))
+        except (KeyError, ValueError) as exc:
+            print(f"[WARNING] Skipping {csv_path.name}: {exc}")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert OHLCV CSV files to the columnar market-data store.")
+    parser.add_argument("src", nargs="?", default=os.getenv("DATA_DIR", "data"), help="CSV file or directory")
+    parser.add_argument("--out", default=None, help="Output file or directory (defaults to alongside the CSVs)")
+    parser.add_argument("--float32", action="store_true", help="Store prices and volume as float32")
+    args = parser.parse_args()
+
+    float_dtype = "float32" if args.float32 else "float64"
+    src = Path(args.src)
+    if src.is_dir():
+        written = convert_directory(src, Path(args.out) if args.out else None, float_dtype)
+    else:
+        written = [convert_csv(src, Path(args.out) if args.out else None, float_dtype)]
+    for path in written:
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
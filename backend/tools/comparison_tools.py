@@ -3,42 +3,68 @@ from __future__ import annotations
 from typing import Any
 
 import numpy as np
+import pandas as pd
 
-from tools.data_tools import load_config, load_dataframe
+from tools import ta_kernels as kernels
+from tools.data_tools import PERIOD_DAYS, load_panel, load_resampled, normalize_timeframe, ticker_info
+from tools.sector_index import is_sector_index, resolve_sector_index, sector_index_ticker
 
 
-def _return_percent(df) -> float:
-    start = float(df["Close"].iloc[0])
-    end = float(df["Close"].iloc[-1])
-    return ((end - start) / start) * 100 if start else 0.0
+INDEX_TICKER = "KSE100"
+RS_WINDOW = 60
+RS_LOOKBACK = 20
 
 
-def compare_with_index(ticker: str, period: str = "3M") -> dict[str, Any]:
-    stock_df = load_dataframe(ticker, period)
-    index_df = load_dataframe("KSE100", period)
+def _period_returns(closes: pd.DataFrame) -> pd.Series:
+    """Percent return per column from its first to its last valid close in the window."""
+    first = closes.bfill().iloc[0]
+    last = closes.ffill().iloc[-1]
+    return ((last - first) / first * 100).where(first != 0, 0.0)
 
-    stock_return = _return_percent(stock_df)
-    index_return = _return_percent(index_df)
-    relative = stock_return - index_return
 
-    stock_returns = stock_df["Close"].pct_change().dropna()
-    index_returns = index_df["Close"].pct_change().dropna()
-    min_len = min(len(stock_returns), len(index_returns))
-    stock_returns = stock_returns[-min_len:]
-    index_returns = index_returns[-min_len:]
+def index_label(index: str) -> str:
+    """Display name for a benchmark: KSE-100, a synthetic sector index, or a plain ticker."""
+    if is_sector_index(index):
+        sector, weighting, _ = resolve_sector_index(index)
+        return f"{sector} sector ({weighting}-weight)"
+    return "KSE-100" if index.upper() == INDEX_TICKER else index.upper()
+
 
-    correlation = float(stock_returns.corr(index_returns)) if min_len > 1 else 0.0
-    beta = float(correlation * (stock_returns.std() / index_returns.std())) if index_returns.std() else 0.0
+def compare_with_index(ticker: str, period: str = "3M", index: str = INDEX_TICKER) -> dict[str, Any]:
+    """Compare with KSE-100, or with any benchmark ticker such as a SECTOR_<NAME>[_VW] index."""
+    index = index.upper()
+    closes = load_panel([ticker, index], period)["Close"]
+    for required in (ticker, index):
+        if required not in closes.columns:
+            raise FileNotFoundError(f"Data file not found: {required}.csv")
+
+    period_returns = _period_returns(closes)
+    stock_return = float(period_returns[ticker])
+    index_return = float(period_returns[index])
+    relative = stock_return - index_return
+    label = index_label(index)
+
+    # Daily returns on dates where both traded, as an (n x 2) matrix.
+    aligned = closes[[ticker, index]].dropna().to_numpy()
+    returns = aligned[1:] / aligned[:-1] - 1
+    correlation = 0.0
+    beta = 0.0
+    if len(returns) > 1:
+        cov = np.cov(returns, rowvar=False)
+        if cov[0, 0] > 0 and cov[1, 1] > 0:
+            correlation = float(cov[0, 1] / np.sqrt(cov[0, 0] * cov[1, 1]))
+        if cov[1, 1] > 0:
+            beta = float(cov[0, 1] / cov[1, 1])
 
     summary = (
         f"{ticker} {'outperformed' if relative >= 0 else 'underperformed'} "
-        f"KSE-100 by {abs(relative):.1f}% over {period}. "
+        f"{label} by {abs(relative):.1f}% over {period}. "
         f"Correlation {correlation:.2f}."
     )
 
     return {
         "ticker": ticker,
-        "index": "KSE-100",
+        "index": label,
         "period": period,
         "stock_return": round(stock_return, 2),
         "index_return": round(index_return, 2),
@@ -49,29 +75,106 @@ def compare_with_index(ticker: str, period: str = "3M") -> dict[str, Any]:
     }
 
 
+def relative_strength_series(
+    ticker: str, period: str = "6M", window: int = RS_WINDOW, timeframe: str = "daily", index: str = INDEX_TICKER
+) -> pd.DataFrame:
+    """Relative strength (stock/index, rebased to 100), rolling beta and rolling correlation over `period`.
+
+    The two histories are aligned on their common dates in full, so the rolling
+    windows are already warm where `period` starts.
+    """
+    timeframe = normalize_timeframe(timeframe)
+    closes = pd.concat(
+        {"stock": load_resampled(ticker, timeframe)["Close"], "index": load_resampled(index, timeframe)["Close"]},
+        axis=1,
+        join="inner",
+    ).dropna()
+    if closes.empty:
+        raise ValueError(f"No overlapping data for {ticker} and {index}")
+
+    prices = closes.to_numpy(dtype=np.float64)
+    returns = np.full_like(prices, np.nan)
+    returns[1:] = prices[1:] / prices[:-1] - 1
+    beta, correlation = kernels.rolling_beta(returns[:, 0], returns[:, 1], window)
+
+    cutoff = closes.index[-1] - pd.Timedelta(days=PERIOD_DAYS.get(period, 180))
+    start = int(closes.index.searchsorted(cutoff, side="left"))
+    ratio = prices[:, 0] / prices[:, 1]
+    series = pd.DataFrame(
+        {"relative_strength": ratio / ratio[start] * 100, "rolling_beta": beta, "rolling_correlation": correlation},
+        index=closes.index,
+    )
+    return series.iloc[start:]
+
+
+def _round_or_none(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _rs_trend(recent: float, prior: float) -> str:
+    if recent == 0 and prior == 0:
+        return "moving in line"
+    if recent >= 0:
+        return "outperformance accelerating" if recent > prior else "outperforming but fading"
+    return "underperformance deepening" if recent < prior else "underperforming but improving"
+
+
+def relative_strength(
+    ticker: str, period: str = "6M", window: int = RS_WINDOW, timeframe: str = "daily", index: str = INDEX_TICKER
+) -> dict[str, Any]:
+    series = relative_strength_series(ticker, period, window, timeframe, index)
+    label = index_label(index)
+    rs = series["relative_strength"].to_numpy()
+    lookback = min(RS_LOOKBACK, (len(rs) - 1) // 2)
+    recent = prior = 0.0
+    if lookback > 0:
+        recent = round(float(rs[-1] / rs[-1 - lookback] - 1) * 100, 2) + 0.0
+        prior = round(float(rs[-1 - lookback] / rs[-1 - 2 * lookback] - 1) * 100, 2) + 0.0
+    trend = _rs_trend(recent, prior)
+
+    latest = series.iloc[-1]
+    beta_then = series["rolling_beta"].iloc[-1 - lookback] if lookback > 0 else np.nan
+
+    summary = (
+        f"{ticker} relative strength vs {label} at {rs[-1]:.1f} (100 = {series.index[0]:%Y-%m-%d}), "
+        f"{recent:+.1f}% over the last {lookback} bars vs {prior:+.1f}% before: {trend}."
+    )
+    if not np.isnan(latest["rolling_beta"]):
+        summary += f" {window}-bar beta {latest['rolling_beta']:.2f}, correlation {latest['rolling_correlation']:.2f}."
+
+    return {
+        "ticker": ticker,
+        "index": label,
+        "period": period,
+        "timeframe": normalize_timeframe(timeframe),
+        "window": window,
+        "relative_strength": _round_or_none(rs[-1]),
+        "rs_change_recent": recent,
+        "rs_change_prior": prior,
+        "rs_trend": trend,
+        "rolling_beta": _round_or_none(latest["rolling_beta"]),
+        "rolling_beta_prior": _round_or_none(beta_then),
+        "rolling_correlation": _round_or_none(latest["rolling_correlation"]),
+        "summary": summary,
+    }
+
+
 def compare_with_sector(ticker: str) -> dict[str, Any]:
-    config = load_config()
-    stock_meta = config["stocks"].get(ticker)
-    if not stock_meta:
+    info = ticker_info(ticker)
+    if not info or not info.in_config:
         raise ValueError(f"Ticker not found in config: {ticker}")
 
-    sector = stock_meta["sector"]
-    peers = list({*stock_meta.get("peers", []), ticker})
-
-    rankings = []
-    for peer in peers:
-        try:
-            df = load_dataframe(peer, "1M")
-            ret = _return_percent(df)
-            rankings.append({"ticker": peer, "return": round(ret, 2)})
-        except Exception:
-            continue
+    sector = info.sector
+    peers = sorted({*info.peers, ticker})
 
-    rankings = sorted(rankings, key=lambda r: r["return"], reverse=True)
-    for idx, row in enumerate(rankings, start=1):
-        row["rank"] = idx
+    closes = load_panel(peers, "1M")["Close"]
+    period_returns = _period_returns(closes).dropna().round(2).sort_values(ascending=False, kind="stable")
+    rankings = [
+        {"ticker": peer, "return": float(ret), "rank": idx}
+        for idx, (peer, ret) in enumerate(period_returns.items(), start=1)
+    ]
 
-    sector_avg = float(np.mean([r["return"] for r in rankings])) if rankings else 0.0
+    sector_avg = float(period_returns.mean()) if rankings else 0.0
     stock_row = next((r for r in rankings if r["ticker"] == ticker), None)
     stock_return = stock_row["return"] if stock_row else 0.0
     relative = stock_return - sector_avg
@@ -81,6 +184,16 @@ def compare_with_sector(ticker: str) -> dict[str, Any]:
         f"with {stock_return:.1f}% return vs sector avg {sector_avg:.1f}%."
     )
 
+    # The sector index covers every configured constituent with data, not just
+    # the listed peers.
+    index_ticker = sector_index_ticker(sector)
+    try:
+        index_closes = load_panel([index_ticker], "1M")["Close"]
+        sector_index_return = round(float(_period_returns(index_closes)[index_ticker]), 2)
+        summary += f" {sector} equal-weight index {sector_index_return:+.1f}%."
+    except (FileNotFoundError, KeyError):
+        index_ticker, sector_index_return = None, None
+
     return {
         "ticker": ticker,
         "sector": sector,
@@ -88,6 +201,9 @@ def compare_with_sector(ticker: str) -> dict[str, Any]:
         "rankings": rankings,
         "sector_avg_return": round(sector_avg, 2),
         "relative_to_sector": round(relative, 2),
+        "sector_index": index_ticker,
+        "sector_index_return": sector_index_return,
+        "peers_without_data": [peer for peer in peers if peer not in closes.columns],
         "summary": summary,
     }
 
@@ -95,3 +211,5 @@ def compare_with_sector(ticker: str) -> dict[str, Any]:
 if __name__ == "__main__":
     print(compare_with_index("OGDC", "3M"))
     print(compare_with_sector("OGDC"))
+    print(relative_strength("TRG", "6M"))
+    print(compare_with_index("PSO", "3M", sector_index_ticker("Energy", "volume")))
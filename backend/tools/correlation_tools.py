@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from tools.data_tools import data_version, get_registry, load_panel
+from utils.cache import LRUCache
+
+# Pairwise statistics for the whole universe come from one daily-return matrix
+# per data version. Tickers that did not trade on a date leave NaN there, so
+# every moment is accumulated over the rows where both tickers of a pair have
+# a return: with M the 0/1 validity mask and X the returns with NaN zeroed,
+# X.T @ M, (X*X).T @ M, X.T @ X and M.T @ M give all pairwise sums at once.
+
+MIN_OVERLAP = 20
+
+
+@dataclass(frozen=True)
+class ReturnStats:
+    tickers: tuple[str, ...]
+    index_ticker: str
+    start: str
+    end: str
+    observations: np.ndarray
+    covariance: np.ndarray
+    correlation: np.ndarray
+    beta: np.ndarray
+
+    def position(self, ticker: str) -> int:
+        try:
+            return self.tickers.index(ticker.upper())
+        except ValueError:
+            raise FileNotFoundError(f"Data file not found: {ticker}.csv") from None
+
+    def nbytes(self) -> int:
+        return int(self.observations.nbytes + self.covariance.nbytes + self.correlation.nbytes + self.beta.nbytes)
+
+
+def pairwise_moments(
+    returns: np.ndarray, min_overlap: int = MIN_OVERLAP
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """NaN-aware (observations, covariance, correlation, pair variance) for the columns of `returns`.
+
+    pair_variance[i, j] is the variance of column i over the rows where column
+    j is also valid, so correlation and beta use the same rows as covariance.
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype(np.float64)
+    x = np.where(valid, returns, 0.0)
+
+    n = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        enough = n >= max(min_overlap, 2)
+        covariance = np.where(enough, (sum_xy - sum_x * sum_x.T / n) / (n - 1), np.nan)
+        pair_variance = np.where(enough, (sum_xx - sum_x**2 / n) / (n - 1), np.nan)
+        scale = np.sqrt(pair_variance * pair_variance.T)
+        correlation = np.where(scale > 0, covariance / scale, np.nan)
+    return n.astype(np.int64), covariance, np.clip(correlation, -1.0, 1.0), pair_variance
+
+
+def pairwise_beta(covariance: np.ndarray, pair_variance: np.ndarray, k: int) -> np.ndarray:
+    """Beta of every column against column k, each over the rows that pair shares."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(pair_variance[k] > 0, covariance[:, k] / pair_variance[k], np.nan)
+
+
+_CORRELATION_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("CORRELATION_CACHE_MAX_MB", "32")) * 1024 * 1024),
+    sizeof=lambda stats: stats.nbytes(),
+)
+
+
+def return_stats(period: str = "1Y", window: int | None = None) -> ReturnStats:
+    """Covariance, correlation and beta against the index for every ticker with data.
+
+    `window` keeps only the trailing number of daily returns inside `period`;
+    it must leave at least MIN_OVERLAP returns for a pair to be reported.
+    Results are cached per data version, period and window, so repeated peer
+    and beta lookups are indexing into these matrices.
+    """
+    if window is not None and window < MIN_OVERLAP:
+        raise ValueError(f"window must be at least {MIN_OVERLAP} returns")
+    registry = get_registry()
+    tickers = registry.tickers_with_data()
+    versions = tuple(data_version(ticker) for ticker in tickers)
+    key = (tuple(tickers), versions, period, window)
+    cached = _CORRELATION_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    closes = load_panel(tickers, period)["Close"]
+    columns = tuple(closes.columns)
+    prices = closes.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices[1:] / prices[:-1] - 1
+    dates = closes.index[1:]
+    if window is not None:
+        returns, dates = returns[-window:], dates[-window:]
+    if len(dates) == 0:
+        raise ValueError(f"Not enough data for return statistics over {period}")
+
+    observations, covariance, correlation, pair_variance = pairwise_moments(returns)
+    index_ticker = registry.index_ticker
+    if index_ticker in columns:
+        beta = pairwise_beta(covariance, pair_variance, columns.index(index_ticker))
+    else:
+        beta = np.full(len(columns), np.nan)
+
+    for array in (observations, covariance, correlation, beta):
+        array.setflags(write=False)
+    stats = ReturnStats(
+        tickers=columns,
+        index_ticker=index_ticker,
+        start=dates[0].strftime("%Y-%m-%d"),
+        end=dates[-1].strftime("%Y-%m-%d"),
+        observations=observations,
+        covariance=covariance,
+        correlation=correlation,
+        beta=beta,
+    )
+    _CORRELATION_CACHE.put(key, stats)
+    return stats
+
+
+def correlation_cache_stats() -> dict[str, Any]:
+    return _CORRELATION_CACHE.stats()
+
+
+def _value(x: float, digits: int = 2) -> float | None:
+    return None if np.isnan(x) else round(float(x), digits)
+
+
+def correlation_matrix(
+    tickers: list[str] | None = None, period: str = "1Y", window: int | None = None
+) -> dict[str, Any]:
+    stats = return_stats(period, window)
+    selected = [stats.position(t) for t in tickers] if tickers else list(range(len(stats.tickers)))
+    block = stats.correlation[np.ix_(selected, selected)]
+    return {
+        "period": period,
+        "window": window,
+        "start": stats.start,
+        "end": stats.end,
+        "index": stats.index_ticker,
+        "tickers": [stats.tickers[i] for i in selected],
+        "correlation": np.where(np.isnan(block), None, np.round(block, 4)).tolist(),
+        "beta": {stats.tickers[i]: _value(stats.beta[i], 4) for i in selected},
+    }
+
+
+def analyze_correlations(
+    ticker: str, period: str = "1Y", window: int | None = None, limit: int = 5
+) -> dict[str, Any]:
+    """Beta and index correlation for a ticker, plus its most and least correlated names."""
+    stats = return_stats(period, window)
+    i = stats.position(ticker)
+    ticker = stats.tickers[i]
+    row = stats.correlation[i]
+    entries = [
+        {"ticker": stats.tickers[j], "correlation": _value(row[j])}
+        for j in np.argsort(-np.nan_to_num(row, nan=-np.inf), kind="stable")
+        if j != i and not np.isnan(row[j]) and stats.tickers[j] != stats.index_ticker
+    ]
+
+    index_correlation = np.nan
+    if stats.index_ticker in stats.tickers:
+        index_correlation = row[stats.tickers.index(stats.index_ticker)]
+    info = get_registry().get(ticker)
+    sector_peers = set(info.peers) if info else set()
+    in_sector = [e["correlation"] for e in entries if e["ticker"] in sector_peers]
+    sector_correlation = float(np.mean(in_sector)) if in_sector else np.nan
+
+    beta = stats.beta[i]
+    parts = [f"{ticker} beta {beta:.2f} vs {stats.index_ticker}" if not np.isnan(beta) else f"{ticker} beta n/a"]
+    if not np.isnan(index_correlation):
+        parts.append(f"correlation {index_correlation:.2f}")
+    if not np.isnan(sector_correlation):
+        parts.append(f"average peer correlation {sector_correlation:.2f}")
+    summary = ", ".join(parts) + f" ({stats.start} to {stats.end})."
+    if entries:
+        summary += f" Best diversifier: {entries[-1]['ticker']} ({entries[-1]['correlation']:.2f})."
+
+    return {
+        "ticker": ticker,
+        "period": period,
+        "window": window,
+        "observations": int(stats.observations[i, i]),
+        "beta": _value(beta),
+        "index_correlation": _value(index_correlation),
+        "peer_correlation": _value(sector_correlation),
+        "most_correlated": entries[:limit],
+        "least_correlated": entries[::-1][:limit],
+        "summary": summary,
+    }
+
+
+if __name__ == "__main__":
+    print(analyze_correlations("OGDC"))
+    print(correlation_matrix(window=60))
+    print(correlation_cache_stats())
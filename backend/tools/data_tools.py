@@ -2,12 +2,22 @@ from __future__ import annotations
 
 import json
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from tools.columnar_store import STORE_SUFFIX, read_columnar
+from utils.cache import LRUCache
+
 PERIOD_DAYS = {"1M": 30, "3M": 90, "6M": 180, "1Y": 365}
+# Bars are bucketed by calendar period and stamped with the date of their last
+# trading day, so a weekly bar's date is the day of its weekly close.
+TIMEFRAMES = {"daily": None, "weekly": "W-SUN", "monthly": "M"}
+# Tickers with this prefix are synthetic sector indices (see tools.sector_index).
+SECTOR_PREFIX = "SECTOR_"
 
 
 def _data_dir() -> Path:
@@ -27,43 +37,370 @@ def _config_path() -> Path:
     return fallback
 
 
+_CONFIG_CACHE: dict[str, tuple[tuple[str, int, int], dict[str, Any]]] = {}
+
+
 def load_config() -> dict[str, Any]:
+    """Return the parsed config, re-reading it only when the file changes.
+
+    The dict is shared between callers; treat it as read-only.
+    """
     config_path = _config_path()
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
-    return json.loads(config_path.read_text(encoding="utf-8"))
+    stat = config_path.stat()
+    version = (str(config_path), stat.st_mtime_ns, stat.st_size)
+    cached = _CONFIG_CACHE.get("config")
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    _CONFIG_CACHE["config"] = (version, config)
+    return config
 
 
-def load_dataframe(ticker: str, period: str = "6M") -> pd.DataFrame:
-    csv_path = _data_dir() / f"{ticker}.csv"
-    if not csv_path.exists():
-        fallback_path = _fallback_data_dir() / f"{ticker}.csv"
-        if fallback_path.exists():
-            csv_path = fallback_path
-        else:
-            raise FileNotFoundError(f"Data file not found: {csv_path}")
+@dataclass(frozen=True)
+class TickerInfo:
+    ticker: str
+    name: str
+    sector: str
+    peers: tuple[str, ...]
+    has_data: bool
+    in_config: bool
+
+
+class TickerRegistry:
+    """Ticker metadata from config.json joined with the data files actually on disk."""
+
+    def __init__(self, config: dict[str, Any], data_tickers: set[str]) -> None:
+        self.index_ticker: str = config.get("index", {}).get("ticker", "KSE100")
+        self.sectors: dict[str, tuple[str, ...]] = {
+            sector: tuple(members) for sector, members in config.get("sectors", {}).items()
+        }
+        self._tickers: dict[str, TickerInfo] = {}
+        for ticker, meta in config.get("stocks", {}).items():
+            self._tickers[ticker] = TickerInfo(
+                ticker=ticker,
+                name=meta.get("name", ticker),
+                sector=meta.get("sector", ""),
+                peers=tuple(meta.get("peers", [])),
+                has_data=ticker in data_tickers,
+                in_config=True,
+            )
+        index_name = config.get("index", {}).get("name", self.index_ticker)
+        for ticker in data_tickers - self._tickers.keys():
+            sector = next((name for name, members in self.sectors.items() if ticker in members), "")
+            self._tickers[ticker] = TickerInfo(
+                ticker=ticker,
+                name=index_name if ticker == self.index_ticker else ticker,
+                sector=sector,
+                peers=(),
+                has_data=True,
+                in_config=False,
+            )
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._tickers
+
+    def get(self, ticker: str) -> TickerInfo | None:
+        return self._tickers.get(ticker)
+
+    def has_data(self, ticker: str) -> bool:
+        info = self._tickers.get(ticker)
+        return bool(info and info.has_data)
+
+    def configured(self) -> list[TickerInfo]:
+        return [info for info in self._tickers.values() if info.in_config]
+
+    def tickers_with_data(self) -> list[str]:
+        return sorted(ticker for ticker, info in self._tickers.items() if info.has_data)
+
+
+_REGISTRY_CACHE: dict[str, tuple[tuple, TickerRegistry]] = {}
+
+
+def _scan_data_tickers() -> set[str]:
+    tickers: set[str] = set()
+    for directory in (_data_dir(), _fallback_data_dir()):
+        if directory.is_dir():
+            for path in directory.iterdir():
+                if path.suffix in (".csv", STORE_SUFFIX):
+                    tickers.add(path.stem)
+    return tickers
+
+
+def get_registry() -> TickerRegistry:
+    """Return the ticker registry, rebuilding it when config.json or a data directory changes."""
+    config = load_config()
+    dir_versions = tuple(
+        (str(directory), directory.stat().st_mtime_ns if directory.is_dir() else 0)
+        for directory in (_data_dir(), _fallback_data_dir())
+    )
+    version = (_CONFIG_CACHE["config"][0], dir_versions)
+    cached = _REGISTRY_CACHE.get("registry")
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    registry = TickerRegistry(config, _scan_data_tickers())
+    _REGISTRY_CACHE["registry"] = (version, registry)
+    return registry
+
+
+def ticker_info(ticker: str) -> TickerInfo | None:
+    return get_registry().get(ticker)
+
 
-    df = pd.read_csv(csv_path, parse_dates=["Date"])
+def _preferred_file(directory: Path, ticker: str) -> Path | None:
+    """Pick the columnar file for a ticker unless its CSV has been updated since conversion."""
+    csv_path = directory / f"{ticker}.csv"
+    store_path = directory / f"{ticker}{STORE_SUFFIX}"
+    if store_path.exists():
+        if not csv_path.exists() or store_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return store_path
+    if csv_path.exists():
+        return csv_path
+    return None
+
+
+def _resolve_data_path(ticker: str) -> Path:
+    for directory in (_data_dir(), _fallback_data_dir()):
+        path = _preferred_file(directory, ticker)
+        if path is not None:
+            return path
+    raise FileNotFoundError(f"Data file not found: {_data_dir() / f'{ticker}.csv'}")
+
+
+def data_version(ticker: str) -> tuple[str, int, int]:
+    """Identify the current contents of a ticker's data file as (path, mtime_ns, size)."""
+    if ticker.upper().startswith(SECTOR_PREFIX):
+        from tools.sector_index import sector_index_version
+
+        return sector_index_version(ticker)
+    path = _resolve_data_path(ticker)
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def _frame_nbytes(entry: tuple[tuple, pd.DataFrame]) -> int:
+    return int(entry[1].memory_usage(index=True, deep=False).sum())
+
+
+_FRAME_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("FRAME_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    sizeof=_frame_nbytes,
+)
+
+
+def read_csv_frame(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, parse_dates=["Date"])
+    df = df.loc[:, [col for col in df.columns if not str(col).startswith("Unnamed")]]
     df = df.sort_values("Date")
     df = df.set_index("Date")
 
     required = {"Open", "High", "Low", "Close", "Volume"}
     if not required.issubset(df.columns):
         raise ValueError(f"CSV missing required columns. Found: {df.columns.tolist()}")
+    return df
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    if path.suffix == STORE_SUFFIX:
+        return read_columnar(path)
+    return read_csv_frame(path)
+
+
+def load_full_dataframe(ticker: str) -> pd.DataFrame:
+    """Return the full cached history for a ticker, re-reading only when the file changes.
+
+    The frame is shared between callers; copy it before mutating.
+    """
+    if ticker.upper().startswith(SECTOR_PREFIX):
+        from tools.sector_index import load_sector_index
+
+        return load_sector_index(ticker)
+    version = data_version(ticker)
+    cached = _FRAME_CACHE.get(version[0])
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    df = _read_frame(Path(version[0]))
+    _FRAME_CACHE.put(version[0], (version, df))
+    return df
+
+
+def frame_cache_stats() -> dict[str, Any]:
+    return _FRAME_CACHE.stats()
+
+
+def clear_frame_cache() -> None:
+    _FRAME_CACHE.clear()
+
+
+def normalize_timeframe(timeframe: str) -> str:
+    key = (timeframe or "daily").lower()
+    if key not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}. Use one of {', '.join(TIMEFRAMES)}")
+    return key
+
+
+def resample_bars(df: pd.DataFrame, timeframe: str) -> tuple[pd.DataFrame, int]:
+    """Aggregate daily OHLCV into `timeframe` bars; also returns the daily row where the last bar starts.
+
+    Buckets are runs of equal period ordinals in the sorted index, reduced with
+    ufunc.reduceat in one pass per column.
+    """
+    freq = TIMEFRAMES[normalize_timeframe(timeframe)]
+    if freq is None or df.empty:
+        return df, max(len(df) - 1, 0)
+    keys = df.index.to_period(freq).asi8
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+    volume = df["Volume"].to_numpy()
+    bars = pd.DataFrame(
+        {
+            "Open": df["Open"].to_numpy()[starts],
+            "High": np.fmax.reduceat(df["High"].to_numpy(dtype=np.float64), starts),
+            "Low": np.fmin.reduceat(df["Low"].to_numpy(dtype=np.float64), starts),
+            "Close": df["Close"].to_numpy()[ends],
+            "Volume": np.add.reduceat(np.nan_to_num(volume) if volume.dtype.kind == "f" else volume, starts),
+        },
+        index=df.index[ends],
+    )
+    return bars, int(starts[-1])
+
+
+def load_resampled(ticker: str, timeframe: str = "weekly") -> pd.DataFrame:
+    """Return a ticker's full history as `timeframe` bars, cached alongside the daily frames.
+
+    When the daily file only gained bars, the cached series is extended by
+    re-aggregating from the start of its last (possibly partial) bar instead of
+    resampling the whole history. The frame is shared; copy it before mutating.
+    """
+    timeframe = normalize_timeframe(timeframe)
+    daily = load_full_dataframe(ticker)
+    if timeframe == "daily":
+        return daily
+
+    version = data_version(ticker)
+    key = (ticker.upper(), timeframe)
+    cached = _FRAME_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    if cached is not None:
+        _, bars, tail_start, rows, last_date = cached
+        if rows <= len(daily) and daily.index[rows - 1] == last_date:
+            tail, tail_offset = resample_bars(daily.iloc[tail_start:], timeframe)
+            bars = pd.concat([bars.iloc[:-1], tail])
+            tail_start += tail_offset
+        else:
+            bars, tail_start = resample_bars(daily, timeframe)
+    else:
+        bars, tail_start = resample_bars(daily, timeframe)
+
+    if not daily.empty:
+        _FRAME_CACHE.put(key, (version, bars, tail_start, len(daily), daily.index[-1]))
+    return bars
+
+
+def load_window(
+    ticker: str, period: str = "6M", warmup: int = 0, timeframe: str = "daily"
+) -> tuple[pd.DataFrame, int]:
+    """Return the trailing `period` plus up to `warmup` earlier bars, and the row where `period` starts.
+
+    Both bounds come from a binary search on the sorted date index, so only the
+    requested bars are sliced (as a view over the cached frame). `warmup` counts
+    bars of the requested timeframe.
+    """
+    df = load_resampled(ticker, timeframe)
+    if df.empty:
+        raise ValueError(f"No data for {ticker} in period {period}")
 
     period_days = PERIOD_DAYS.get(period, 180)
-    data_end = df.index.max()
-    cutoff = data_end - pd.Timedelta(days=period_days)
-    df = df[df.index >= cutoff]
+    cutoff = df.index[-1] - pd.Timedelta(days=period_days)
+    period_start = int(df.index.searchsorted(cutoff, side="left"))
+    start = max(0, period_start - max(0, int(warmup)))
+    return df.iloc[start:], period_start - start
+
 
+def load_dataframe(ticker: str, period: str = "6M", timeframe: str = "daily") -> pd.DataFrame:
+    """Return the trailing `period` of a ticker's history as a view over the cached frame."""
+    df, _ = load_window(ticker, period, timeframe=timeframe)
     if df.empty:
         raise ValueError(f"No data for {ticker} in period {period}")
 
     return df
 
 
-def load_stock_data(ticker: str, period: str = "6M") -> dict[str, Any]:
-    df = load_dataframe(ticker, period)
+def _panel_nbytes(panel: dict[str, pd.DataFrame]) -> int:
+    return int(sum(frame.memory_usage(index=True, deep=False).sum() for frame in panel.values()))
+
+
+_PANEL_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("PANEL_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    sizeof=_panel_nbytes,
+)
+
+
+def load_panel(
+    tickers: list[str],
+    period: str = "6M",
+    fields: tuple[str, ...] | list[str] = ("Close",),
+    warmup: int = 0,
+) -> dict[str, pd.DataFrame]:
+    """Return one date-aligned (dates x tickers) frame per requested OHLCV field.
+
+    Dates are the union across tickers, so a ticker that did not trade on a
+    date has NaN there. Tickers without a data file are left out. `warmup`
+    adds up to that many of each ticker's own bars ahead of `period`, as
+    load_window does; rows from panel_period_start on are the period itself.
+    Panels are cached until any constituent file changes.
+    """
+    fields = tuple(fields)
+    available: list[str] = []
+    versions: list[tuple[str, int, int]] = []
+    for ticker in dict.fromkeys(tickers):
+        try:
+            versions.append(data_version(ticker))
+        except FileNotFoundError:
+            continue
+        available.append(ticker)
+
+    key = (tuple(available), tuple(versions), period, fields, max(0, int(warmup)))
+    cached = _PANEL_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if not available:
+        return {field: pd.DataFrame(index=pd.DatetimeIndex([], name="Date")) for field in fields}
+
+    frames = {ticker: load_full_dataframe(ticker) for ticker in available}
+    data_end = max((frame.index[-1] for frame in frames.values() if not frame.empty), default=pd.Timestamp.min)
+    cutoff = data_end - pd.Timedelta(days=PERIOD_DAYS.get(period, 180))
+    windows = {
+        ticker: frame.iloc[max(0, int(frame.index.searchsorted(cutoff, side="left")) - max(0, int(warmup))) :]
+        for ticker, frame in frames.items()
+    }
+    panel = {
+        field: pd.concat({ticker: window[field] for ticker, window in windows.items()}, axis=1, sort=True)
+        for field in fields
+    }
+
+    _PANEL_CACHE.put(key, panel)
+    return panel
+
+
+def panel_period_start(dates: pd.DatetimeIndex, period: str = "6M") -> int:
+    """Row of a load_panel index where `period` starts, after any warmup rows."""
+    if len(dates) == 0:
+        return 0
+    return int(dates.searchsorted(dates[-1] - pd.Timedelta(days=PERIOD_DAYS.get(period, 180)), side="left"))
+
+
+_BAR_UNITS = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+
+def load_stock_data(ticker: str, period: str = "6M", timeframe: str = "daily") -> dict[str, Any]:
+    timeframe = normalize_timeframe(timeframe)
+    df = load_dataframe(ticker, period, timeframe)
     current_price = float(df["Close"].iloc[-1])
     start_price = float(df["Close"].iloc[0])
     price_change = current_price - start_price
@@ -90,12 +427,13 @@ def load_stock_data(ticker: str, period: str = "6M") -> dict[str, Any]:
         f"{ticker}: Current PKR {current_price:.2f}, "
         f"{'up' if price_change >= 0 else 'down'} {abs(change_percent):.1f}% over {period}. "
         f"Range: {period_low:.0f}-{period_high:.0f}. "
-        f"Avg volume: {avg_volume / 1_000_000:.1f}M shares/day."
+        f"Avg volume: {avg_volume / 1_000_000:.1f}M shares/{_BAR_UNITS[timeframe]}."
     )
 
     return {
         "ticker": ticker,
         "period": period,
+        "timeframe": timeframe,
         "current_price": round(current_price, 2),
         "price_change": round(price_change, 2),
         "change_percent": round(change_percent, 2),
@@ -108,54 +446,52 @@ def load_stock_data(ticker: str, period: str = "6M") -> dict[str, Any]:
     }
 
 
-def generate_chart_data(ticker: str, period: str = "6M") -> list[dict]:
-    """Generate chart data with OHLCV and technical indicators for frontend."""
+CHART_PRICE_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close"}
+CHART_INDICATORS = ("sma_9", "sma_50", "sma_200", "rsi", "upper_bb", "lower_bb")
+
+
+def _rounded(values: Any) -> list:
+    """Round to 2dp and map NaN to None so warmup bars serialise as null."""
+    array = np.round(np.asarray(values, dtype="float64"), 2)
+    return np.where(np.isnan(array), None, array).tolist()
+
+
+def generate_chart_data(ticker: str, period: str = "6M", layout: str = "rows") -> list[dict] | dict[str, list]:
+    """Generate chart data with OHLCV and technical indicators for frontend.
+
+    layout="rows" returns one dict per bar; layout="columns" returns parallel
+    arrays keyed by field, which is considerably smaller once serialised.
+    """
+    from tools.indicator_tools import indicator_values
+
     try:
-        import pandas_ta as ta
-        
         df = load_dataframe(ticker, period)
-        
-        # Calculate indicators
-        df['sma_9'] = ta.sma(df['Close'], length=9)
-        df['sma_50'] = ta.sma(df['Close'], length=50)
-        df['sma_200'] = ta.sma(df['Close'], length=200)
-        df['rsi'] = ta.rsi(df['Close'], length=14)
-        
-        # Bollinger Bands
-        bb = ta.bbands(df['Close'], length=20, std=2)
-        if bb is not None and not bb.empty:
-            # Find the correct column names (they may vary by pandas_ta version)
-            upper_col = [col for col in bb.columns if 'BBU' in col]
-            lower_col = [col for col in bb.columns if 'BBL' in col]
-            if upper_col:
-                df['upper_bb'] = bb[upper_col[0]]
-            if lower_col:
-                df['lower_bb'] = bb[lower_col[0]]
-        
-        # Convert to list of dicts for frontend
-        chart_data = []
-        for date, row in df.iterrows():
-            data_point = {
-                "date": date.strftime("%Y-%m-%d"),
-                "open": round(float(row['Open']), 2),
-                "high": round(float(row['High']), 2),
-                "low": round(float(row['Low']), 2),
-                "close": round(float(row['Close']), 2),
-                "volume": int(row['Volume']),
-            }
-            
-            # Add indicators (only if not NaN)
-            for indicator in ['sma_9', 'sma_50', 'sma_200', 'rsi', 'upper_bb', 'lower_bb']:
-                if indicator in row and pd.notna(row[indicator]):
-                    data_point[indicator] = round(float(row[indicator]), 2)
-            
-            chart_data.append(data_point)
-        
-        return chart_data
+        bollinger = indicator_values(ticker, "BOLLINGER", {"period": 20, "std": 2}, period)
+        indicators = {
+            "sma_9": indicator_values(ticker, "SMA", {"period": 9}, period),
+            "sma_50": indicator_values(ticker, "SMA", {"period": 50}, period),
+            "sma_200": indicator_values(ticker, "SMA", {"period": 200}, period),
+            "rsi": indicator_values(ticker, "RSI", {"period": 14}, period),
+            "upper_bb": bollinger["BBU"],
+            "lower_bb": bollinger["BBL"],
+        }
+
+        columns: dict[str, list] = {"date": df.index.strftime("%Y-%m-%d").tolist()}
+        for key, source in CHART_PRICE_COLUMNS.items():
+            columns[key] = _rounded(df[source])
+        columns["volume"] = df["Volume"].to_numpy(dtype="float64").astype("int64").tolist()
+        for name in CHART_INDICATORS:
+            columns[name] = _rounded(indicators[name])
+
+        if layout == "columns":
+            return columns
+        keys = list(columns)
+        return [dict(zip(keys, values)) for values in zip(*columns.values())]
     except Exception as e:
         print(f"[ERROR] Failed to generate chart data: {e}")
-        return []
+        return {} if layout == "columns" else []
 
 
 if __name__ == "__main__":
     print(load_stock_data("OGDC", "6M"))
+    print(load_stock_data("OGDC", "1Y", "weekly"))
@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Mapping
+
+import pandas as pd
+
+# Stateful counterparts of the kernels in tools.ta_kernels. Each state is seeded
+# once from history and then advanced one bar at a time; every update is O(1)
+# except CCI, whose mean absolute deviation needs a pass over its window.
+# Values are NaN until an indicator's warmup is complete, exactly like the
+# batch kernels, and agree with them to floating-point rounding.
+
+NAN = float("nan")
+Bar = Mapping[str, float]
+
+
+class _Window:
+    """Fixed-length window keeping a running mean and sum of squared deviations."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.values: deque[float] = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.length
+
+    def push(self, value: float) -> None:
+        if math.isnan(value):
+            self.values.clear()
+            self.mean = self.m2 = 0.0
+            return
+        if self.full:
+            old = self.values.popleft()
+            self.values.append(value)
+            old_mean = self.mean
+            self.mean += (value - old) / self.length
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+            self.m2 = max(self.m2, 0.0)
+            return
+        self.values.append(value)
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self.m2 += delta * (value - self.mean)
+
+    def average(self) -> float:
+        return self.mean if self.full else NAN
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(self.m2 / (self.length - ddof)) if self.full else NAN
+
+
+class _Extreme:
+    """Rolling max (or min) over the last `length` pushes via a monotonic deque."""
+
+    def __init__(self, length: int, largest: bool) -> None:
+        self.length = length
+        self.largest = largest
+        self.count = 0
+        self.candidates: deque[tuple[int, float]] = deque()
+
+    def push(self, value: float) -> float:
+        index = self.count
+        self.count += 1
+        while self.candidates and (
+            self.candidates[-1][1] <= value if self.largest else self.candidates[-1][1] >= value
+        ):
+            self.candidates.pop()
+        self.candidates.append((index, value))
+        if self.candidates[0][0] <= index - self.length:
+            self.candidates.popleft()
+        return self.candidates[0][1] if self.count >= self.length else NAN
+
+
+class _EWM:
+    """pandas-style ewm(alpha).mean() over a stream, starting at the first non-NaN value.
+
+    A NaN after the start repeats the last value, as the batch kernel
+    forward-fills its input.
+    """
+
+    def __init__(self, alpha: float, min_periods: int = 0, adjust: bool = True) -> None:
+        self.alpha = alpha
+        self.decay = 1.0 - alpha
+        self.min_periods = min_periods
+        self.adjust = adjust
+        self.count = 0
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.last = NAN
+
+    def push(self, value: float) -> float:
+        if math.isnan(value):
+            if self.count == 0:
+                return NAN
+            value = self.last
+        self.last = value
+        if self.adjust:
+            self.numerator = value + self.decay * self.numerator
+            self.denominator = 1.0 + self.decay * self.denominator
+        elif self.count == 0:
+            self.numerator, self.denominator = value, 1.0
+        else:
+            self.numerator = self.alpha * value + self.decay * self.numerator
+        self.count += 1
+        if self.count < max(self.min_periods, 1):
+            return NAN
+        return self.numerator / self.denominator if self.adjust else self.numerator
+
+
+def _rma(length: int) -> _EWM:
+    return _EWM(1.0 / length, adjust=False)
+
+
+class _PresmaEMA:
+    """EMA seeded with the SMA of its first `length` values."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed: list[float] = []
+        self.value = NAN
+
+    def push(self, value: float) -> float:
+        if math.isnan(value) and not self.seed:
+            return NAN
+        if len(self.seed) < self.length:
+            self.seed.append(value)
+            if len(self.seed) == self.length:
+                self.value = sum(self.seed) / self.length
+            return self.value
+        self.value = self.alpha * value + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class IndicatorState(ABC):
+    """Base class: seed from a frame, then call update() with each new bar."""
+
+    value: Any = NAN
+
+    @abstractmethod
+    def update(self, bar: Bar) -> Any:
+        """Advance by one bar and return the new value."""
+
+    def seed(self, df: pd.DataFrame) -> Any:
+        columns = ["Open", "High", "Low", "Close", "Volume"]
+        for values in df[columns].to_numpy(dtype="float64"):
+            self.update(dict(zip(columns, values)))
+        return self.value
+
+
+class SMAState(IndicatorState):
+    def __init__(self, period: int = 50) -> None:
+        self.window = _Window(period)
+
+    def update(self, bar: Bar) -> float:
+        self.window.push(bar["Close"])
+        self.value = self.window.average()
+        return self.value
+
+
+class EMAState(IndicatorState):
+    def __init__(self, period: int = 20) -> None:
+        self.ema = _PresmaEMA(period)
+
+    def update(self, bar: Bar) -> float:
+        self.value = self.ema.push(bar["Close"])
+        return self.value
+
+
+class RSIState(IndicatorState):
+    def __init__(self, period: int = 14) -> None:
+        self.gains = _rma(period)
+        self.losses = _rma(period)
+        self.previous = NAN
+
+    def update(self, bar: Bar) -> float:
+        change = bar["Close"] - self.previous
+        self.previous = bar["Close"]
+        gain = self.gains.push(max(change, 0.0) if not math.isnan(change) else NAN)
+        loss = self.losses.push(max(-change, 0.0) if not math.isnan(change) else NAN)
+        total = gain + loss
+        self.value = 100.0 * gain / total if total else NAN
+        return self.value
+
+
+class MACDState(IndicatorState):
+    """Value is (macd, histogram, signal), matching the MACD/MACDh/MACDs columns."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self.fast = _PresmaEMA(fast)
+        self.slow = _PresmaEMA(slow)
+        self.signal = _PresmaEMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, bar: Bar) -> tuple[float, float, float]:
+        line = self.fast.push(bar["Close"]) - self.slow.push(bar["Close"])
+        signal = self.signal.push(line)
+        self.value = (line, line - signal, signal)
+        return self.value
+
+
+class BollingerState(IndicatorState):
+    """Value is (lower, mid, upper)."""
+
+    def __init__(self, period: int = 20, std: float = 2.0) -> None:
+        self.window = _Window(period)
+        self.width = std
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, bar: Bar) -> tuple[float, float, float]:
+        self.window.push(bar["Close"])
+        mid = self.window.average()
+        width = self.width * self.window.std(ddof=1)
+        self.value = (mid - width, mid, mid + width)
+        return self.value
+
+
+class ATRState(IndicatorState):
+    """Wilder ATR seeded with the mean of the first `period` true ranges.
+
+    With prenan the first bar has no true range (ADX's ATR); otherwise it is
+    the bar's high-low range.
+    """
+
+    def __init__(self, period: int = 14, prenan: bool = False) -> None:
+        self.period = period
+        self.prenan = prenan
+        self.average = _rma(period)
+        self.head: list[float] = []
+        self.previous_close = NAN
+        self.true_range = NAN
+
+    def update(self, bar: Bar) -> float:
+        prev = self.previous_close
+        if math.isnan(prev):
+            self.true_range = NAN if self.prenan or self.head else bar["High"] - bar["Low"]
+        else:
+            self.true_range = max(bar["High"] - bar["Low"], abs(bar["High"] - prev), abs(bar["Low"] - prev))
+        self.previous_close = bar["Close"]
+        if len(self.head) < self.period:
+            self.head.append(self.true_range)
+            if len(self.head) < self.period:
+                return self.value
+            valid = [value for value in self.head if not math.isnan(value)]
+            self.value = self.average.push(sum(valid) / len(valid) if valid else NAN)
+            return self.value
+        self.value = self.average.push(self.true_range)
+        return self.value
+
+
+class ADXState(IndicatorState):
+    """Value is (ADX, +DI, -DI)."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.atr = ATRState(period, prenan=True)
+        self.positive = _rma(period)
+        self.negative = _rma(period)
+        self.adx = _rma(period)
+        self.previous: tuple[float, float] | None = None
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, bar: Bar) -> tuple[float, float, float]:
+        atr = self.atr.update(bar)
+        if self.previous is None:
+            pos = neg = NAN
+        else:
+            up = bar["High"] - self.previous[0]
+            down = self.previous[1] - bar["Low"]
+            pos = up if up > down and up > 0 else 0.0
+            neg = down if down > up and down > 0 else 0.0
+        self.previous = (bar["High"], bar["Low"])
+        k = 100.0 / atr if atr else NAN
+        plus_di = k * self.positive.push(pos)
+        minus_di = k * self.negative.push(neg)
+        total = plus_di + minus_di
+        dx = 100.0 * abs(plus_di - minus_di) / total if total else NAN
+        self.value = (self.adx.push(dx), plus_di, minus_di)
+        return self.value
+
+
+class VWAPState(IndicatorState):
+    """Cumulative VWAP within an anchor period.
+
+    Bars may carry a "session" key; accumulation resets whenever it changes.
+    Without one every bar is its own period, as with daily bars anchored to "D".
+    """
+
+    def __init__(self) -> None:
+        self.session: Any = object()
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, bar: Bar) -> float:
+        session = bar.get("session", object())
+        if session != self.session:
+            self.session = session
+            self.price_volume = self.volume = 0.0
+        typical = (bar["High"] + bar["Low"] + bar["Close"]) / 3.0
+        self.price_volume += typical * bar["Volume"]
+        self.volume += bar["Volume"]
+        self.value = self.price_volume / self.volume if self.volume else NAN
+        return self.value
+
+
+class StochasticState(IndicatorState):
+    """Value is (%K, %D)."""
+
+    def __init__(self, k: int = 14, d: int = 3, smooth_k: int = 3) -> None:
+        self.highest = _Extreme(k, largest=True)
+        self.lowest = _Extreme(k, largest=False)
+        self.smooth = _Window(smooth_k)
+        self.signal = _Window(d)
+        self.value = (NAN, NAN)
+
+    def update(self, bar: Bar) -> tuple[float, float]:
+        highest = self.highest.push(bar["High"])
+        lowest = self.lowest.push(bar["Low"])
+        span = highest - lowest
+        # A flat range has no %K; the NaN empties both windows, as it does the
+        # batch kernel's moving averages.
+        raw = 100.0 * (bar["Close"] - lowest) / span if span else NAN
+        self.smooth.push(raw)
+        stoch_k = self.smooth.average()
+        self.signal.push(stoch_k)
+        self.value = (stoch_k, self.signal.average())
+        return self.value
+
+
+class OBVState(IndicatorState):
+    """Running total from the second bar; the first has no previous close to sign it."""
+
+    def __init__(self) -> None:
+        self.previous = NAN
+        self.total = 0.0
+
+    def update(self, bar: Bar) -> float:
+        if bar["Close"] > self.previous:
+            self.total += bar["Volume"]
+        elif bar["Close"] < self.previous:
+            self.total -= bar["Volume"]
+        self.value = NAN if math.isnan(self.previous) else self.total
+        self.previous = bar["Close"]
+        return self.value
+
+
+class WilliamsRState(IndicatorState):
+    def __init__(self, period: int = 14) -> None:
+        self.highest = _Extreme(period, largest=True)
+        self.lowest = _Extreme(period, largest=False)
+
+    def update(self, bar: Bar) -> float:
+        highest = self.highest.push(bar["High"])
+        lowest = self.lowest.push(bar["Low"])
+        span = highest - lowest
+        self.value = 100.0 * ((bar["Close"] - lowest) / span - 1.0) if span else NAN
+        return self.value
+
+
+class CCIState(IndicatorState):
+    def __init__(self, period: int = 20, constant: float = 0.015) -> None:
+        self.window = _Window(period)
+        self.constant = constant
+
+    def update(self, bar: Bar) -> float:
+        typical = (bar["High"] + bar["Low"] + bar["Close"]) / 3.0
+        self.window.push(typical)
+        mean = self.window.average()
+        if math.isnan(mean):
+            self.value = NAN
+            return self.value
+        mad = sum(abs(v - mean) for v in self.window.values) / self.window.length
+        self.value = (typical - mean) / (self.constant * mad) if mad else NAN
+        return self.value
+
+
+STREAM_STATES: dict[str, Callable[[dict], IndicatorState]] = {
+    "RSI": lambda params: RSIState(params.get("period", 14)),
+    "SMA": lambda params: SMAState(params.get("period", 50)),
+    "EMA": lambda params: EMAState(params.get("period", 20)),
+    "MACD": lambda params: MACDState(params.get("fast", 12), params.get("slow", 26), params.get("signal", 9)),
+    "BOLLINGER": lambda params: BollingerState(params.get("period", 20), params.get("std", 2)),
+    "ATR": lambda params: ATRState(params.get("period", 14)),
+    "VWAP": lambda params: VWAPState(),
+    "STOCHASTIC": lambda params: StochasticState(params.get("k", 14), params.get("d", 3)),
+    "OBV": lambda params: OBVState(),
+    "ADX": lambda params: ADXState(params.get("period", 14)),
+    "WILLIAMS_R": lambda params: WilliamsRState(params.get("period", 14)),
+    "CCI": lambda params: CCIState(params.get("period", 20)),
+}
+
+
+def make_state(indicator: str, params: dict | None = None) -> IndicatorState:
+    indicator_key = indicator.upper()
+    if indicator_key not in STREAM_STATES:
+        raise ValueError(f"Unsupported indicator: {indicator}")
+    return STREAM_STATES[indicator_key](params or {})
+
+
+class IndicatorStream:
+    """A set of indicator states advanced together, one bar at a time."""
+
+    def __init__(self, specs: list[dict | str]) -> None:
+        self.states: dict[str, IndicatorState] = {}
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {"indicator": spec}
+            params = spec.get("params") or {}
+            label = spec.get("label") or _label(spec["indicator"], params)
+            self.states[label] = make_state(spec["indicator"], params)
+
+    def seed(self, df: pd.DataFrame) -> dict[str, Any]:
+        for state in self.states.values():
+            state.seed(df)
+        return self.values()
+
+    def update(self, bar: Bar) -> dict[str, Any]:
+        for state in self.states.values():
+            state.update(bar)
+        return self.values()
+
+    def values(self) -> dict[str, Any]:
+        return {label: state.value for label, state in self.states.items()}
+
+
+def _label(indicator: str, params: dict) -> str:
+    suffix = "_".join(str(params[key]) for key in sorted(params))
+    return f"{indicator.upper()}_{suffix}" if suffix else indicator.upper()
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from tools.data_tools import load_dataframe
+    from tools.indicator_tools import INDICATOR_FUNCTIONS
+
+    # Seed on all but the last 20 bars, stream those in, and compare every
+    # streamed value with a batch recomputation over the same history.
+    history = load_dataframe("OGDC", "1Y")
+    worst = 0.0
+    for indicator in STREAM_STATES:
+        state = make_state(indicator)
+        state.seed(history.iloc[:-20])
+        batch = INDICATOR_FUNCTIONS[indicator](history, {})
+        batch_values = batch.to_numpy().reshape(len(history), -1)
+        for offset, (_, row) in enumerate(history.iloc[-20:].iterrows()):
+            streamed = np.atleast_1d(np.asarray(state.update(row.to_dict()), dtype="float64"))
+            expected = batch_values[len(history) - 20 + offset]
+            worst = max(worst, float(np.nanmax(np.abs(streamed - expected))))
+        print(f"{indicator:<12}{np.atleast_1d(state.value)}")
+    print(f"max |stream - batch| = {worst:.3e}")
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import json
+import math
+import os
 from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 
-from tools.data_tools import load_dataframe
+from tools import ta_kernels as kernels
+from tools.data_tools import PERIOD_DAYS, data_version, load_dataframe, load_window, normalize_timeframe
+from utils.cache import LRUCache
 
 
 def _trend_label(current: float, previous: float) -> str:
@@ -106,56 +111,233 @@ def interpret_cci(value: float) -> str:
     return f"CCI = {value:.1f} — Neutral."
 
 
-INDICATOR_FUNCTIONS: dict[str, Callable[[pd.DataFrame, dict], Any]] = {
-    "RSI": lambda df, params: ta.rsi(df["Close"], length=params.get("period", 14)),
-    "SMA": lambda df, params: ta.sma(df["Close"], length=params.get("period", 50)),
-    "EMA": lambda df, params: ta.ema(df["Close"], length=params.get("period", 20)),
-    "MACD": lambda df, params: ta.macd(
-        df["Close"],
-        fast=params.get("fast", 12),
-        slow=params.get("slow", 26),
-        signal=params.get("signal", 9),
-    ),
-    "BOLLINGER": lambda df, params: ta.bbands(
-        df["Close"],
-        length=params.get("period", 20),
-        std=params.get("std", 2),
-    ),
-    "ATR": lambda df, params: ta.atr(
-        df["High"], df["Low"], df["Close"], length=params.get("period", 14)
-    ),
-    "VWAP": lambda df, params: ta.vwap(
-        df["High"], df["Low"], df["Close"], df["Volume"]
-    ),
-    "STOCHASTIC": lambda df, params: ta.stoch(
-        df["High"],
-        df["Low"],
-        df["Close"],
-        k=params.get("k", 14),
-        d=params.get("d", 3),
-    ),
-    "OBV": lambda df, params: ta.obv(df["Close"], df["Volume"]),
-    "ADX": lambda df, params: ta.adx(
-        df["High"], df["Low"], df["Close"], length=params.get("period", 14)
-    ),
-    "WILLIAMS_R": lambda df, params: ta.willr(
-        df["High"], df["Low"], df["Close"], length=params.get("period", 14)
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class IndicatorContext:
+    """Computes indicators over one frame, sharing intermediate series between them.
+
+    MACD reuses the EMAs and Bollinger the SMA and rolling deviation, so a
+    batch of related indicators does each piece of work once. ADX seeds its
+    ATR without the first bar's range, as pandas_ta does, so it keeps its own.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self.open = df["Open"].to_numpy(dtype="float64")
+        self.high = df["High"].to_numpy(dtype="float64")
+        self.low = df["Low"].to_numpy(dtype="float64")
+        self.close = df["Close"].to_numpy(dtype="float64")
+        self.volume = df["Volume"].to_numpy(dtype="float64")
+        self._memo: dict[tuple, Any] = {}
+
+    def _cached(self, key: tuple, build: Callable[[], Any]) -> Any:
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def series(self, values: np.ndarray, name: str) -> pd.Series:
+        return pd.Series(values, index=self.df.index, name=name)
+
+    def frame(self, columns: dict[str, np.ndarray]) -> pd.DataFrame:
+        return pd.DataFrame(columns, index=self.df.index)
+
+    def sma(self, length: int) -> np.ndarray:
+        return self._cached(("sma", length), lambda: kernels.sma(self.close, length))
+
+    def ema(self, length: int) -> np.ndarray:
+        return self._cached(("ema", length), lambda: kernels.ema(self.close, length))
+
+    def stdev(self, length: int) -> np.ndarray:
+        return self._cached(("stdev", length), lambda: kernels.rolling_std(self.close, length, ddof=1))
+
+    def atr(self, length: int, prenan: bool = False) -> np.ndarray:
+        return self._cached(
+            ("atr", length, prenan), lambda: kernels.atr(self.high, self.low, self.close, length, prenan=prenan)
+        )
+
+    def compute(self, indicator_key: str, params: dict) -> pd.Series | pd.DataFrame:
+        builder = _BUILDERS[indicator_key]
+        return self._cached(("spec", indicator_key, _params_key(params)), lambda: builder(self, params))
+
+
+def _macd(ctx: IndicatorContext, params: dict) -> pd.DataFrame:
+    line = ctx.ema(params.get("fast", 12)) - ctx.ema(params.get("slow", 26))
+    signal = kernels.ema(line, params.get("signal", 9))
+    return ctx.frame({"MACD": line, "MACDh": line - signal, "MACDs": signal})
+
+
+def _bollinger(ctx: IndicatorContext, params: dict) -> pd.DataFrame:
+    length = params.get("period", 20)
+    mid = ctx.sma(length)
+    width = params.get("std", 2) * ctx.stdev(length)
+    return ctx.frame({"BBL": mid - width, "BBM": mid, "BBU": mid + width})
+
+
+def _stochastic(ctx: IndicatorContext, params: dict) -> pd.DataFrame:
+    k, d = kernels.stoch(ctx.high, ctx.low, ctx.close, k=params.get("k", 14), d=params.get("d", 3))
+    return ctx.frame({"STOCHk": k, "STOCHd": d})
+
+
+def _adx(ctx: IndicatorContext, params: dict) -> pd.DataFrame:
+    length = params.get("period", 14)
+    atr = ctx.atr(length, prenan=True)
+    adx, plus_di, minus_di = kernels.adx(ctx.high, ctx.low, ctx.close, length, atr_values=atr)
+    return ctx.frame({"ADX": adx, "DMP": plus_di, "DMN": minus_di})
+
+
+_BUILDERS: dict[str, Callable[[IndicatorContext, dict], Any]] = {
+    "RSI": lambda ctx, params: ctx.series(kernels.rsi(ctx.close, params.get("period", 14)), "RSI"),
+    "SMA": lambda ctx, params: ctx.series(ctx.sma(params.get("period", 50)), "SMA"),
+    "EMA": lambda ctx, params: ctx.series(ctx.ema(params.get("period", 20)), "EMA"),
+    "MACD": _macd,
+    "BOLLINGER": _bollinger,
+    "ATR": lambda ctx, params: ctx.series(ctx.atr(params.get("period", 14)), "ATR"),
+    "VWAP": lambda ctx, params: ctx.series(kernels.vwap(ctx.high, ctx.low, ctx.close, ctx.volume), "VWAP"),
+    "STOCHASTIC": _stochastic,
+    "OBV": lambda ctx, params: ctx.series(kernels.obv(ctx.close, ctx.volume), "OBV"),
+    "ADX": _adx,
+    "WILLIAMS_R": lambda ctx, params: ctx.series(
+        kernels.willr(ctx.high, ctx.low, ctx.close, params.get("period", 14)), "WILLR"
     ),
-    "CCI": lambda df, params: ta.cci(
-        df["High"], df["Low"], df["Close"], length=params.get("period", 20)
+    "CCI": lambda ctx, params: ctx.series(
+        kernels.cci(ctx.high, ctx.low, ctx.close, params.get("period", 20)), "CCI"
     ),
 }
 
 
-def calculate_indicator(ticker: str, indicator: str, params: dict | None = None) -> dict:
-    params = params or {}
+INDICATOR_FUNCTIONS: dict[str, Callable[[pd.DataFrame, dict], Any]] = {
+    key: (lambda df, params, key=key: IndicatorContext(df).compute(key, params)) for key in _BUILDERS
+}
+
+DEFAULT_PARAMS: dict[str, dict[str, Any]] = {
+    "RSI": {"period": 14},
+    "SMA": {"period": 50},
+    "EMA": {"period": 20},
+    "MACD": {"fast": 12, "slow": 26, "signal": 9},
+    "BOLLINGER": {"period": 20, "std": 2},
+    "ATR": {"period": 14},
+    "VWAP": {},
+    "STOCHASTIC": {"k": 14, "d": 3},
+    "OBV": {},
+    "ADX": {"period": 14},
+    "WILLIAMS_R": {"period": 14},
+    "CCI": {"period": 20},
+}
+
+
+def normalize_params(indicator_key: str, params: dict | None) -> dict[str, Any]:
+    """Fill in defaults and drop keys the indicator ignores, so equivalent requests share a key."""
+    normalized = dict(DEFAULT_PARAMS[indicator_key])
+    for name, value in (params or {}).items():
+        if name not in normalized:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer():
+            value = int(value)
+        normalized[name] = value
+    return normalized
+
+
+def _result_nbytes(result: Any) -> int:
+    return int(result.memory_usage(index=True, deep=False).sum()) if isinstance(result, pd.DataFrame) else int(
+        result.memory_usage(index=True, deep=False)
+    )
+
+
+_INDICATOR_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("INDICATOR_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    sizeof=_result_nbytes,
+)
+
+
+# Recursive smoothers (EMA, Wilder RMA) never fully forget their start, so
+# they get extra bars until truncated history carries less than this weight.
+SETTLE_TOLERANCE = 1e-4
+
+
+def _settle(alpha: float) -> int:
+    return int(math.ceil(math.log(SETTLE_TOLERANCE) / math.log(1.0 - alpha)))
+
+
+def indicator_warmup(indicator: str, params: dict | None = None) -> int:
+    """Bars of history an indicator needs before the first bar it should report on."""
     indicator_key = indicator.upper()
-    if indicator_key not in INDICATOR_FUNCTIONS:
+    if indicator_key not in DEFAULT_PARAMS:
         raise ValueError(f"Unsupported indicator: {indicator}")
+    p = normalize_params(indicator_key, params)
+    if indicator_key in ("SMA", "BOLLINGER", "WILLIAMS_R", "CCI"):
+        return p["period"] - 1
+    if indicator_key == "EMA":
+        return p["period"] - 1 + _settle(2.0 / (p["period"] + 1))
+    if indicator_key in ("RSI", "ATR"):
+        return p["period"] + _settle(1.0 / p["period"])
+    if indicator_key == "MACD":
+        slowest = max(p["fast"], p["slow"])
+        return slowest - 1 + p["signal"] - 1 + _settle(2.0 / (slowest + 1))
+    if indicator_key == "STOCHASTIC":
+        return p["k"] - 1 + 2 + p["d"] - 1
+    if indicator_key == "ADX":
+        return 2 * p["period"] - 1 + 2 * _settle(1.0 / p["period"])
+    # VWAP is anchored per bar and OBV is a running total from any start.
+    return 0
+
+
+def _cache_key(ticker: str, period: str, indicator_key: str, params: dict, timeframe: str = "daily") -> tuple:
+    # The window is keyed by its length in days, which is what load_window slices
+    # on; the warmup follows from the indicator and params.
+    return (data_version(ticker), PERIOD_DAYS.get(period, 180), timeframe, indicator_key, _params_key(params))
+
+
+def _load_context(
+    ticker: str, period: str, warmup: int, timeframe: str = "daily"
+) -> tuple[IndicatorContext, int]:
+    """A context over `period` plus `warmup` earlier bars, and the row where `period` starts."""
+    df, offset = load_window(ticker, period, warmup, timeframe)
+    return IndicatorContext(df), offset
+
+
+def _compute_windowed(
+    context: tuple[IndicatorContext, int], indicator_key: str, params: dict
+) -> pd.Series | pd.DataFrame:
+    """Compute over the context's warmup and period bars and return only the bars inside `period`."""
+    ctx, offset = context
+    return ctx.compute(indicator_key, params).iloc[offset:]
+
+
+def indicator_values(
+    ticker: str, indicator: str, params: dict | None = None, period: str = "6M", timeframe: str = "daily"
+) -> pd.Series | pd.DataFrame:
+    """Return an indicator's series over `period`, memoized on the data file version.
+
+    The indicator is computed with the warmup it needs loaded ahead of the
+    window, so long lookbacks like SMA 200 are valid from the window's start
+    when enough history exists. The result is shared with other callers (the
+    agent tool and both chart paths); treat it as read-only.
+    """
+    indicator_key = indicator.upper()
+    if indicator_key not in _BUILDERS:
+        raise ValueError(f"Unsupported indicator: {indicator}")
+    timeframe = normalize_timeframe(timeframe)
+    normalized = normalize_params(indicator_key, params)
+    key = _cache_key(ticker, period, indicator_key, normalized, timeframe)
+    result = _INDICATOR_CACHE.get(key)
+    if result is None:
+        context = _load_context(ticker, period, indicator_warmup(indicator_key, normalized), timeframe)
+        result = _compute_windowed(context, indicator_key, normalized)
+        _INDICATOR_CACHE.put(key, result)
+    return result
+
+
+def indicator_cache_stats() -> dict[str, Any]:
+    return _INDICATOR_CACHE.stats()
 
-    df = load_dataframe(ticker, params.get("period", "6M"))
-    result = INDICATOR_FUNCTIONS[indicator_key](df, params)
 
+def clear_indicator_cache() -> None:
+    _INDICATOR_CACHE.clear()
+
+
+def _summarize(indicator: str, indicator_key: str, params: dict, result: Any, df: pd.DataFrame) -> dict:
     if isinstance(result, pd.DataFrame):
         series = result.iloc[:, 0]
     else:
@@ -215,5 +397,79 @@ def calculate_indicator(ticker: str, indicator: str, params: dict | None = None)
     }
 
 
+def calculate_indicator(ticker: str, indicator: str, params: dict | None = None, timeframe: str = "daily") -> dict:
+    params = params or {}
+    indicator_key = indicator.upper()
+    if indicator_key not in INDICATOR_FUNCTIONS:
+        raise ValueError(f"Unsupported indicator: {indicator}")
+
+    period = params.get("period", "6M")
+    result = indicator_values(ticker, indicator_key, params, period, timeframe)
+    return _summarize(indicator, indicator_key, params, result, load_dataframe(ticker, period, timeframe))
+
+
+def calculate_indicators(
+    ticker: str, indicators: list[dict | str], period: str = "6M", timeframe: str = "daily"
+) -> dict:
+    """Calculate several indicators over one window, sharing intermediate series.
+
+    Each spec is either an indicator name or {"indicator": name, "params": {...}}.
+    A failing spec reports its error without aborting the rest of the batch.
+    Uncached indicators share one IndicatorContext loaded with the largest
+    warmup any of them needs; recursive smoothers then start further back than
+    on the single-call path, which changes them by less than SETTLE_TOLERANCE.
+    """
+    timeframe = normalize_timeframe(timeframe)
+    df = load_dataframe(ticker, period, timeframe)
+
+    # (name, indicator key, params as given, normalized params or the error, cached result)
+    specs: list[tuple[str, str, dict, Any, Any]] = []
+    for spec in indicators:
+        if isinstance(spec, str):
+            spec = {"indicator": spec}
+        name = str(spec.get("indicator", ""))
+        params = spec.get("params") or {}
+        indicator_key = name.upper()
+        try:
+            if indicator_key not in _BUILDERS:
+                raise ValueError(f"Unsupported indicator: {name}")
+            normalized = normalize_params(indicator_key, params)
+            cached = _INDICATOR_CACHE.get(_cache_key(ticker, period, indicator_key, normalized, timeframe))
+            specs.append((name, indicator_key, params, normalized, cached))
+        except Exception as exc:
+            specs.append((name, indicator_key, params, exc, None))
+
+    warmups = [
+        indicator_warmup(indicator_key, normalized)
+        for _, indicator_key, _, normalized, cached in specs
+        if cached is None and not isinstance(normalized, Exception)
+    ]
+    context = _load_context(ticker, period, max(warmups), timeframe) if warmups else None
+
+    results = []
+    for name, indicator_key, params, normalized, result in specs:
+        try:
+            if isinstance(normalized, Exception):
+                raise normalized
+            if result is None:
+                result = _compute_windowed(context, indicator_key, normalized)
+                _INDICATOR_CACHE.put(_cache_key(ticker, period, indicator_key, normalized, timeframe), result)
+            results.append(_summarize(name, indicator_key, params, result, df))
+        except Exception as exc:
+            results.append({"indicator": indicator_key, "params": params, "error": str(exc)})
+
+    computed = [r for r in results if "error" not in r]
+    return {
+        "ticker": ticker,
+        "period": period,
+        "timeframe": timeframe,
+        "results": results,
+        "summary": " ".join(r["interpretation"] for r in computed) or "No indicators could be calculated.",
+    }
+
+
 if __name__ == "__main__":
     print(calculate_indicator("OGDC", "RSI", {"period": 14}))
+    print(calculate_indicators("OGDC", ["RSI", "MACD", {"indicator": "SMA", "params": {"period": 9}}, "BOLLINGER"]))
+    print(calculate_indicator("OGDC", "SMA", {"period": 200}))
+    print(indicator_cache_stats())
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import os
 from typing import Any
 
-from tools.data_tools import load_dataframe
+import numpy as np
+import pandas as pd
+
+from tools.data_tools import PERIOD_DAYS, data_version, load_dataframe, normalize_timeframe
+from utils.cache import LRUCache
+
+
+PROFILE_BINS = 50
+VALUE_AREA_SHARE = 0.70
+MAX_VOLUME_NODES = 5
 
 
 def _pivot_levels(high: float, low: float, close: float) -> dict[str, float]:
@@ -32,9 +42,156 @@ def _fibonacci_levels(high: float, low: float) -> dict[str, float]:
     }
 
 
-def find_support_resistance(ticker: str, method: str = "both") -> dict[str, Any]:
-    df = load_dataframe(ticker, "6M")
+def volume_at_price(
+    high: pd.Series | np.ndarray, low: pd.Series | np.ndarray, volume: pd.Series | np.ndarray, bins: int = PROFILE_BINS
+) -> tuple[np.ndarray, np.ndarray]:
+    """Histogram of traded volume over price as (bin edges, volume per bin).
+
+    Each bar's volume is spread evenly across the bins its High-Low range
+    touches. That is a range update per bar, done in O(bars + bins) by
+    bincounting +share at the first bin and -share past the last one, then
+    taking a cumulative sum.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    valid = ~(np.isnan(high) | np.isnan(low) | np.isnan(volume))
+    high, low, volume = high[valid], low[valid], volume[valid]
+    if high.size == 0:
+        raise ValueError("No bars with price and volume to build a profile from")
+
+    bottom, top = float(low.min()), float(high.max())
+    width = (top - bottom) / bins or 1.0
+    first = np.clip(((low - bottom) / width).astype(np.intp), 0, bins - 1)
+    last = np.clip(((high - bottom) / width).astype(np.intp), 0, bins - 1)
+    share = volume / (last - first + 1)
+    delta = np.bincount(first, weights=share, minlength=bins + 1) - np.bincount(
+        last + 1, weights=share, minlength=bins + 1
+    )
+    histogram = np.maximum(np.cumsum(delta)[:bins], 0.0)
+    edges = bottom + width * np.arange(bins + 1)
+    return edges, histogram
+
+
+def _value_area(histogram: np.ndarray, poc: int, share: float) -> tuple[int, int]:
+    # Grow outwards from the point of control, taking the heavier neighbour each
+    # step, until the range holds `share` of all volume.
+    target = share * histogram.sum()
+    lo = hi = poc
+    total = histogram[poc]
+    last = len(histogram) - 1
+    while total < target and (lo > 0 or hi < last):
+        below = histogram[lo - 1] if lo > 0 else -1.0
+        above = histogram[hi + 1] if hi < last else -1.0
+        if above >= below:
+            hi += 1
+            total += histogram[hi]
+        else:
+            lo -= 1
+            total += histogram[lo]
+    return lo, hi
+
+
+def _volume_nodes(histogram: np.ndarray, high: bool) -> np.ndarray:
+    """Bins that are local peaks (or troughs) of the profile, heaviest (or lightest) first."""
+    padded = np.pad(histogram, 1, constant_values=-np.inf if high else np.inf)
+    left, mid, right = padded[:-2], padded[1:-1], padded[2:]
+    mean = histogram.mean()
+    if high:
+        mask = (mid > left) & (mid >= right) & (mid > mean)
+        order = np.argsort(-histogram[mask], kind="stable")
+    else:
+        mask = (mid < left) & (mid <= right) & (mid < mean)
+        mask[[0, -1]] = False  # the profile's tails are thin by construction
+        order = np.argsort(histogram[mask], kind="stable")
+    return np.flatnonzero(mask)[order][:MAX_VOLUME_NODES]
+
+
+def _profile_nbytes(profile: dict[str, Any]) -> int:
+    return int(profile["edges"].nbytes + profile["histogram"].nbytes) + 1024
+
+
+_PROFILE_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("PROFILE_CACHE_MAX_MB", "8")) * 1024 * 1024),
+    sizeof=_profile_nbytes,
+)
+
+
+def volume_profile(ticker: str, period: str = "6M", bins: int = PROFILE_BINS) -> dict[str, Any]:
+    """Point of control, value area and volume nodes for a ticker's trailing `period`.
+
+    Profiles are cached per data version, period and bin count; the returned
+    dict is shared, so callers must not mutate it.
+    """
+    key = (data_version(ticker), PERIOD_DAYS.get(period, 180), bins)
+    profile = _PROFILE_CACHE.get(key)
+    if profile is not None:
+        return profile
+
+    df = load_dataframe(ticker, period)
+    edges, histogram = volume_at_price(df["High"], df["Low"], df["Volume"], bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    poc = int(np.argmax(histogram))
+    va_low, va_high = _value_area(histogram, poc, VALUE_AREA_SHARE)
+    edges.setflags(write=False)
+    histogram.setflags(write=False)
+    profile = {
+        "poc": round(float(centers[poc]), 2),
+        "value_area_high": round(float(edges[va_high + 1]), 2),
+        "value_area_low": round(float(edges[va_low]), 2),
+        "high_volume_nodes": [round(float(centers[i]), 2) for i in _volume_nodes(histogram, True)],
+        "low_volume_nodes": [round(float(centers[i]), 2) for i in _volume_nodes(histogram, False)],
+        "bin_size": round(float(edges[1] - edges[0]), 4),
+        "edges": edges,
+        "histogram": histogram,
+    }
+    _PROFILE_CACHE.put(key, profile)
+    return profile
+
+
+def profile_cache_stats() -> dict[str, Any]:
+    return _PROFILE_CACHE.stats()
+
+
+def _volume_profile_levels(ticker: str, price: float) -> dict[str, Any]:
+    profile = volume_profile(ticker, "6M")
+    levels = {profile["poc"], profile["value_area_high"], profile["value_area_low"], *profile["high_volume_nodes"]}
+    support = sorted(level for level in levels if level < price)
+    resistance = sorted(level for level in levels if level > price)
+    if support and resistance:
+        summary = f"Nearest support at {support[-1]:.2f}, nearest resistance at {resistance[0]:.2f}."
+    elif support:
+        summary = f"Price is above every high-volume level; nearest support at {support[-1]:.2f}."
+    elif resistance:
+        summary = f"Price is below every high-volume level; nearest resistance at {resistance[0]:.2f}."
+    else:
+        # Short or flat histories can put every level at the current price.
+        summary = f"Price is at the volume point of control ({profile['poc']:.2f}); no levels above or below it."
+    position = (
+        "inside"
+        if profile["value_area_low"] <= price <= profile["value_area_high"]
+        else "above" if price > profile["value_area_high"] else "below"
+    )
+    return {
+        "method": "volume_profile",
+        "current_price": round(price, 2),
+        "key_support": support[-2:],
+        "key_resistance": resistance[:2],
+        "summary": f"{summary} Price is {position} the value area.",
+        "volume_profile": {k: v for k, v in profile.items() if k not in ("edges", "histogram")},
+    }
+
+
+def find_support_resistance(ticker: str, method: str = "both", timeframe: str = "daily") -> dict[str, Any]:
+    """Pivots come from the last bar of `timeframe`, so "weekly" gives weekly pivots.
+
+    The volume profile always bins daily bars, which resolve where volume traded
+    more finely than coarser bars spanning the same six months.
+    """
+    df = load_dataframe(ticker, "6M", timeframe)
     last_row = df.iloc[-1]
+    if method == "volume_profile":
+        return _volume_profile_levels(ticker, float(last_row["Close"]))
     period_high = float(df["High"].max())
     period_low = float(df["Low"].min())
 
@@ -51,6 +208,7 @@ def find_support_resistance(ticker: str, method: str = "both") -> dict[str, Any]
 
     result = {
         "method": method,
+        "timeframe": normalize_timeframe(timeframe),
         "current_price": round(float(last_row["Close"]), 2),
         "key_support": [round(v, 2) for v in key_support[:2]],
         "key_resistance": [round(v, 2) for v in key_resistance[-2:]],
@@ -67,3 +225,5 @@ def find_support_resistance(ticker: str, method: str = "both") -> dict[str, Any]
 
 if __name__ == "__main__":
     print(find_support_resistance("OGDC", "both"))
+    print(find_support_resistance("OGDC", "volume_profile"))
+    print(find_support_resistance("OGDC", "pivot", "weekly"))
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from database import (
+    get_pattern_sync_states,
+    init_db,
+    latest_pattern_events,
+    query_pattern_events,
+    save_pattern_events,
+)
+from tools.data_tools import PERIOD_DAYS, data_version, get_registry, load_dataframe, load_full_dataframe
+from tools.pattern_tools import (
+    CANDLE_AVERAGE_BARS,
+    CANDLESTICK_PATTERNS,
+    SIGNAL_STRENGTH,
+    candlestick_names,
+    candlestick_signals,
+    chart_pattern_matrix,
+    detect_double_top_bottom,
+    detect_trend_patterns,
+    double_tops_bottoms,
+    extrema_masks,
+    pattern_entry,
+    pattern_report,
+)
+
+# Keeps the pattern_events table in step with the data files. Each ticker has a
+# high-water mark (its last indexed bar); a sync only scans bars past it, plus
+# EXTREMA_ORDER bars before it because a swing point is only confirmed once
+# that many later bars exist. The detectors themselves only see the bars to
+# scan plus the history they read: CANDLE_LOOKBACK bars for the candlestick
+# averages, and back to the previous swing high and low for double tops and
+# bottoms.
+
+EXTREMA_ORDER = 3
+# Part of each ticker's stored data version; bump it when the detectors change
+# what they emit, so events indexed by the old ones are rebuilt on the next sync.
+DETECTOR_REVISION = 2
+DOUBLE_TOLERANCE = 0.03
+DOUBLE_CONFIDENCE = 0.6
+# The body/range averages cover CANDLE_AVERAGE_BARS bars before a bar, and the
+# three-bar patterns read them two bars back.
+CANDLE_LOOKBACK = CANDLE_AVERAGE_BARS + 2
+# First guess at how far back the previous swing lies; doubled until found.
+SWING_LOOKBACK = 64
+
+
+def _pattern_name(name: str) -> str:
+    return name.replace("_", " ").title()
+
+
+def _double_window(high: np.ndarray, low: np.ndarray, start: int) -> int:
+    """First bar to scan so that pairs ending on or after `start` are found exactly.
+
+    Swings flagged away from a window's first EXTREMA_ORDER bars match the full
+    history, so the window is widened until it holds a swing high and a swing
+    low before `start` -- the first half of any pair that straddles it.
+    """
+    lookback = SWING_LOOKBACK
+    while True:
+        lo = max(0, start - lookback)
+        if lo == 0:
+            return 0
+        is_high, _ = extrema_masks(high[lo:start], EXTREMA_ORDER)
+        _, is_low = extrema_masks(low[lo:start], EXTREMA_ORDER)
+        if is_high.any() and is_low.any():
+            return lo
+        lookback *= 2
+
+
+def pattern_events(ticker: str, start: int = 0) -> list[dict[str, Any]]:
+    """Candlestick and double top/bottom events dated on or after bar `start`."""
+    df = load_full_dataframe(ticker)
+    dates = df.index.strftime("%Y-%m-%d")
+    events: list[dict[str, Any]] = []
+
+    lo = max(0, start - CANDLE_LOOKBACK)
+    window = df.iloc[lo:]
+    signals = candlestick_signals(window["Open"], window["High"], window["Low"], window["Close"])[start - lo :]
+    rows, cols = np.nonzero(signals)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        signal = int(signals[row, col])
+        events.append(
+            {
+                "date": dates[start + row],
+                "confirmed_date": dates[start + row],
+                "pattern": _pattern_name(CANDLESTICK_PATTERNS[col]),
+                "pattern_type": "candlestick",
+                "implication": "BULLISH" if signal > 0 else "BEARISH",
+                "confidence": min(abs(signal) / SIGNAL_STRENGTH, 1.0),
+            }
+        )
+
+    high = df["High"].to_numpy(dtype="float64")
+    low = df["Low"].to_numpy(dtype="float64")
+    lo = _double_window(high, low, start)
+    for kind, first, second in double_tops_bottoms(high[lo:], low[lo:], EXTREMA_ORDER, DOUBLE_TOLERANCE):
+        first, second = lo + first, lo + second
+        if second < start:
+            continue
+        events.append(
+            {
+                "date": dates[second],
+                "start_date": dates[first],
+                # The second swing is only known once EXTREMA_ORDER later bars exist.
+                "confirmed_date": dates[second + EXTREMA_ORDER],
+                "pattern": "Double Top" if kind == "top" else "Double Bottom",
+                "pattern_type": "chart",
+                "implication": "BEARISH" if kind == "top" else "BULLISH",
+                "confidence": DOUBLE_CONFIDENCE,
+            }
+        )
+    return events
+
+
+def _version_key(ticker: str) -> str:
+    path, mtime_ns, size = data_version(ticker)
+    return f"{DETECTOR_REVISION}:{path}:{mtime_ns}:{size}"
+
+
+async def sync_pattern_index(tickers: list[str] | None = None) -> dict[str, int]:
+    """Index new bars for each ticker whose data changed; returns events written per ticker.
+
+    Appended bars (the ingest path) are scanned incrementally. If the stored
+    high-water mark is no longer in the file, the history was rewritten, and if
+    it was indexed under another DETECTOR_REVISION the stored events are stale;
+    either way the ticker is rebuilt from scratch.
+    """
+    tickers = tickers or get_registry().tickers_with_data()
+    states = await get_pattern_sync_states()
+    written: dict[str, int] = {}
+    for ticker in tickers:
+        try:
+            version = _version_key(ticker)
+        except FileNotFoundError:
+            continue
+        state = states.get(ticker)
+        if state and state[1] == version:
+            continue
+
+        df = load_full_dataframe(ticker)
+        if df.empty:
+            continue
+        start, replace = 0, True
+        if state and state[1].startswith(f"{DETECTOR_REVISION}:"):
+            mark = pd.Timestamp(state[0])
+            position = int(df.index.searchsorted(mark, side="left"))
+            if position < len(df) and df.index[position] == mark:
+                start, replace = max(0, position + 1 - EXTREMA_ORDER), False
+
+        events = pattern_events(ticker, start)
+        await save_pattern_events(
+            ticker, events, df.index[-1].strftime("%Y-%m-%d"), version, replace=replace
+        )
+        written[ticker] = len(events)
+    return written
+
+
+def _resolve_tickers(tickers: list[str] | None, sector: str | None) -> list[str] | None:
+    if not sector:
+        return [t.upper() for t in tickers] if tickers else None
+    registry = get_registry()
+    members = [
+        ticker
+        for ticker in registry.tickers_with_data()
+        if (info := registry.get(ticker)) and info.sector.lower() == sector.lower()
+    ]
+    if tickers:
+        wanted = {t.upper() for t in tickers}
+        members = [t for t in members if t in wanted]
+    return members
+
+
+def _since(tickers: list[str] | None, period: str | None) -> str | None:
+    if not period:
+        return None
+    ends = []
+    for ticker in tickers if tickers is not None else get_registry().tickers_with_data():
+        try:
+            df = load_full_dataframe(ticker)
+        except FileNotFoundError:
+            continue
+        if not df.empty:
+            ends.append(df.index[-1])
+    if not ends:
+        return None
+    return (max(ends) - pd.Timedelta(days=PERIOD_DAYS.get(period, 365))).strftime("%Y-%m-%d")
+
+
+async def find_pattern_events(
+    pattern: str | None = None,
+    tickers: list[str] | None = None,
+    sector: str | None = None,
+    implication: str | None = None,
+    period: str | None = "1Y",
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """e.g. find_pattern_events("double_bottom", sector="Energy", period="1Y")."""
+    selected = _resolve_tickers(tickers, sector)
+    if selected == []:
+        return []
+    await sync_pattern_index(selected)
+    return await query_pattern_events(
+        tickers=selected,
+        pattern=_pattern_name(pattern) if pattern else None,
+        implication=implication,
+        since=_since(selected, period),
+        limit=limit,
+    )
+
+
+async def latest_patterns(
+    pattern: str | None = None, tickers: list[str] | None = None, sector: str | None = None
+) -> list[dict[str, Any]]:
+    """The most recent pattern event(s) per ticker."""
+    selected = _resolve_tickers(tickers, sector)
+    if selected == []:
+        return []
+    await sync_pattern_index(selected)
+    return await latest_pattern_events(selected, _pattern_name(pattern) if pattern else None)
+
+
+def _signal(event: dict[str, Any]) -> float:
+    sign = 1.0 if event["implication"] == "BULLISH" else -1.0
+    return sign * event["confidence"] * SIGNAL_STRENGTH
+
+
+def _pattern_key(event: dict[str, Any]) -> str:
+    return event["pattern"].lower().replace(" ", "_")
+
+
+async def find_candlestick_patterns(
+    ticker: str, patterns: list[str] | None = None, period: str = "1Y", limit: int = 50
+) -> dict[str, Any]:
+    """pattern_tools.find_candlestick_patterns answered from the index instead of a rescan."""
+    names = candlestick_names(patterns)
+    ticker = ticker.upper()
+    window = load_dataframe(ticker, period)
+    await sync_pattern_index([ticker])
+    stored = await query_pattern_events(
+        tickers=[ticker], since=window.index[0].strftime("%Y-%m-%d"), limit=None, pattern_type="candlestick"
+    )
+    position = {name: i for i, name in enumerate(names)}
+    events = [e for e in stored if _pattern_key(e) in position]
+    events.sort(key=lambda e: (pd.Timestamp(e["date"]), -position[_pattern_key(e)]), reverse=True)
+    counts = {name: 0 for name in names}
+    for event in events:
+        counts[_pattern_key(event)] += 1
+    return {
+        "ticker": ticker,
+        "period": period,
+        "counts": counts,
+        "occurrences": [
+            pattern_entry(_pattern_key(e), pd.Timestamp(e["date"]), _signal(e)) for e in events[:limit]
+        ],
+        "summary": f"{sum(counts.values())} candlestick signal(s) over {period}.",
+    }
+
+
+async def detect_patterns(ticker: str, pattern_type: str = "both") -> dict[str, Any]:
+    """pattern_tools.detect_patterns with the last bar's candlesticks read from the index.
+
+    Double tops/bottoms here judge only the latest two swings of the 6M window,
+    which the index does not record, so they and the (unindexed) triangles,
+    channels and flags still come from the frame and the cached chart matrix.
+    """
+    ticker = ticker.upper()
+    df = load_dataframe(ticker, "6M")
+    candlesticks: list[dict[str, Any]] = []
+    if pattern_type in ("candlestick", "both"):
+        await sync_pattern_index([ticker])
+        last = df.index[-1].strftime("%Y-%m-%d")
+        stored = await query_pattern_events(tickers=[ticker], since=last, limit=None, pattern_type="candlestick")
+        order = {name: i for i, name in enumerate(CANDLESTICK_PATTERNS)}
+        stored = sorted(stored, key=lambda e: order[_pattern_key(e)])
+        candlesticks = [pattern_entry(_pattern_key(e), df.index[-1], _signal(e)) for e in stored]
+
+    charts: list[dict[str, Any]] = []
+    if pattern_type in ("chart", "both"):
+        charts.extend(detect_double_top_bottom(df))
+        charts.extend(detect_trend_patterns(chart_pattern_matrix(ticker).loc[: df.index[-1]]))
+    return pattern_report(pattern_type, candlesticks, charts)
+
+
+async def _main() -> None:
+    await init_db()
+    written = await sync_pattern_index()
+    for ticker, count in written.items():
+        print(f"{ticker}: {count} pattern event(s) indexed")
+    if not written:
+        print("Pattern index is up to date.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
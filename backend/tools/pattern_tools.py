@@ -1,25 +1,147 @@
 from __future__ import annotations
 
+import os
 from typing import Any
 
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
 
-from tools.data_tools import load_dataframe
+from tools import ta_kernels as kernels
+from tools.data_tools import data_version, get_registry, load_dataframe, load_full_dataframe
+from utils.cache import LRUCache
+
+
+CANDLESTICK_PATTERNS = (
+    "doji",
+    "hammer",
+    "inverted_hammer",
+    "engulfing",
+    "morning_star",
+    "evening_star",
+    "three_white_soldiers",
+    "three_black_crows",
+    "harami",
+)
+
+# Signals follow the TA-Lib convention: +100 bullish, -100 bearish, 0 none.
+# Doji is directionless and reports +100 like pandas_ta's cdl_doji.
+SIGNAL_STRENGTH = 100
+CANDLE_AVERAGE_BARS = 10
+
+
+def _lag(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[0]:
+        out[periods:] = x[:-periods]
+    return out
+
+
+def candlestick_signals(open_: Any, high: Any, low: Any, close: Any) -> np.ndarray:
+    """Evaluate every pattern in CANDLESTICK_PATTERNS on every bar in one pass.
+
+    Returns an int8 (bars x patterns) matrix. Body and range sizes are judged
+    against their average over the previous CANDLE_AVERAGE_BARS bars; no
+    pattern signals before those averages exist.
+    """
+    o, h, l, c = (np.asarray(v, dtype="float64") for v in (open_, high, low, close))
+    body = np.abs(c - o)
+    spread = h - l
+    top = np.maximum(o, c)
+    bottom = np.minimum(o, c)
+    upper_shadow = h - top
+    lower_shadow = bottom - l
+    bullish = c > o
+    bearish = c < o
+    avg_body = _lag(kernels.sma(body, CANDLE_AVERAGE_BARS), 1)
+    avg_spread = _lag(kernels.sma(spread, CANDLE_AVERAGE_BARS), 1)
+    long_body = body > avg_body
+    short_body = body < 0.5 * avg_body
+
+    o1, c1, top1, bottom1, body1 = (_lag(x, 1) for x in (o, c, top, bottom, body))
+    o2, c2, top2, body2 = (_lag(x, 2) for x in (o, c, top, body))
+    bullish1, bearish1 = c1 > o1, c1 < o1
+    bullish2, bearish2 = c2 > o2, c2 < o2
+    long_body1 = _lag(long_body.astype(float), 1) == 1
+    long_body2 = _lag(long_body.astype(float), 2) == 1
+    short_body1 = _lag(short_body.astype(float), 1) == 1
+    upper_shadow1, upper_shadow2 = _lag(upper_shadow, 1), _lag(upper_shadow, 2)
+    lower_shadow1, lower_shadow2 = _lag(lower_shadow, 1), _lag(lower_shadow, 2)
+
+    with np.errstate(invalid="ignore"):
+        doji = body <= 0.1 * avg_spread
+        hammer = (
+            (body > 0) & ~long_body & (lower_shadow >= 2 * body) & (upper_shadow <= 0.1 * spread) & (bottom <= bottom1)
+        )
+        inverted_hammer = (
+            (body > 0) & ~long_body & (upper_shadow >= 2 * body) & (lower_shadow <= 0.1 * spread) & bearish1
+            & (top <= c1)
+        )
+        bull_engulf = bearish1 & bullish & (o <= c1) & (c >= o1) & ((o < c1) | (c > o1))
+        bear_engulf = bullish1 & bearish & (o >= c1) & (c <= o1) & ((o > c1) | (c < o1))
+        inside = (top < top1) & (bottom > bottom1) & long_body1 & ~long_body
+        bull_harami = inside & bearish1
+        bear_harami = inside & bullish1
+        morning_star = (
+            bearish2 & long_body2 & short_body1 & (top1 < c2) & bullish & (c > (o2 + c2) / 2)
+        )
+        evening_star = (
+            bullish2 & long_body2 & short_body1 & (bottom1 > c2) & bearish & (c < (o2 + c2) / 2)
+        )
+        soldiers = (
+            bullish & bullish1 & bullish2
+            & (c > c1) & (c1 > c2)
+            & (o > o1) & (o <= c1) & (o1 > o2) & (o1 <= c2)
+            & (upper_shadow < body) & (upper_shadow1 < body1) & (upper_shadow2 < body2)
+        )
+        crows = (
+            bearish & bearish1 & bearish2
+            & (c < c1) & (c1 < c2)
+            & (o < o1) & (o >= c1) & (o1 < o2) & (o1 >= c2)
+            & (lower_shadow < body) & (lower_shadow1 < body1) & (lower_shadow2 < body2)
+        )
+
+    # Without the averages a NaN comparison reads as "not long", which would let
+    # hammers fire on the opening bars; mask every pattern until they exist.
+    ready = ~np.isnan(avg_body) & ~np.isnan(avg_spread)
+    columns = {
+        "doji": doji.astype(np.int8),
+        "hammer": hammer.astype(np.int8),
+        "inverted_hammer": inverted_hammer.astype(np.int8),
+        "engulfing": bull_engulf.astype(np.int8) - bear_engulf.astype(np.int8),
+        "morning_star": morning_star.astype(np.int8),
+        "evening_star": -evening_star.astype(np.int8),
+        "three_white_soldiers": soldiers.astype(np.int8),
+        "three_black_crows": -crows.astype(np.int8),
+        "harami": bull_harami.astype(np.int8) - bear_harami.astype(np.int8),
+    }
+    signals = np.stack([columns[name] for name in CANDLESTICK_PATTERNS], axis=-1) * np.int8(SIGNAL_STRENGTH)
+    return np.where(ready[..., None], signals, np.int8(0))
 
 
-CANDLESTICK_PATTERNS = {
-    "doji": ta.cdl_doji,
-    "hammer": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="hammer"),
-    "inverted_hammer": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="inverted_hammer"),
-    "engulfing": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="engulfing"),
-    "morning_star": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="morningstar"),
-    "evening_star": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="eveningstar"),
-    "three_white_soldiers": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="3whitesoldiers"),
-    "three_black_crows": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="3blackcrows"),
-    "harami": lambda o, h, l, c: ta.cdl_pattern(o, h, l, c, name="harami"),
-}
+_SIGNAL_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("PATTERN_CACHE_MAX_MB", "16")) * 1024 * 1024),
+    sizeof=lambda entry: int(entry[1].memory_usage(index=True, deep=False).sum()),
+)
+
+
+def _cached_matrix(ticker: str, kind: str, build: Any) -> pd.DataFrame:
+    version = data_version(ticker)
+    cached = _SIGNAL_CACHE.get((ticker, kind))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    matrix = build(load_full_dataframe(ticker))
+    _SIGNAL_CACHE.put((ticker, kind), (version, matrix))
+    return matrix
+
+
+def candlestick_matrix(ticker: str) -> pd.DataFrame:
+    """Return the (date x pattern) signal matrix over a ticker's full history, cached per data version."""
+
+    def build(df: pd.DataFrame) -> pd.DataFrame:
+        signals = candlestick_signals(df["Open"], df["High"], df["Low"], df["Close"])
+        return pd.DataFrame(signals, index=df.index, columns=list(CANDLESTICK_PATTERNS))
+
+    return _cached_matrix(ticker, "candlestick", build)
 
 
 def _pattern_description(name: str, signal: float) -> str:
@@ -28,76 +150,173 @@ def _pattern_description(name: str, signal: float) -> str:
     return f"{readable} pattern — {implication} reversal signal."
 
 
-def _detect_candlestick_patterns(df: pd.DataFrame) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
-    recent = df.tail(10)
-
-    for pattern_name, func in CANDLESTICK_PATTERNS.items():
-        try:
-            signal = func(recent["Open"], recent["High"], recent["Low"], recent["Close"])
-            if signal is None:
-                continue
-            last_signal = float(signal.iloc[-1])
-            if last_signal == 0:
-                continue
-            results.append(
-                {
-                    "name": pattern_name.replace("_", " ").title(),
-                    "date": recent.index[-1].strftime("%Y-%m-%d"),
-                    "confidence": min(abs(last_signal) / 100, 1.0),
-                    "implication": "BULLISH" if last_signal > 0 else "BEARISH",
-                    "description": _pattern_description(pattern_name, last_signal),
-                }
-            )
-        except Exception:
-            continue
+def pattern_entry(pattern_name: str, date: pd.Timestamp, signal: float) -> dict[str, Any]:
+    return {
+        "name": pattern_name.replace("_", " ").title(),
+        "date": date.strftime("%Y-%m-%d"),
+        "confidence": min(abs(signal) / SIGNAL_STRENGTH, 1.0),
+        "implication": "BULLISH" if signal > 0 else "BEARISH",
+        "description": _pattern_description(pattern_name, signal),
+    }
 
-    return results
+
+def _detect_candlestick_patterns(signals: pd.DataFrame) -> list[dict[str, Any]]:
+    """Patterns completed on the last bar of `signals`."""
+    if signals.empty:
+        return []
+    last = signals.iloc[-1]
+    return [pattern_entry(name, signals.index[-1], float(last[name])) for name in CANDLESTICK_PATTERNS if last[name]]
+
+
+def candlestick_names(patterns: list[str] | None) -> list[str]:
+    """Validate requested candlestick patterns as CANDLESTICK_PATTERNS keys (all by default)."""
+    names = [p.lower().replace(" ", "_") for p in patterns] if patterns else list(CANDLESTICK_PATTERNS)
+    unknown = [name for name in names if name not in CANDLESTICK_PATTERNS]
+    if unknown:
+        raise ValueError(f"Unsupported candlestick pattern(s): {', '.join(unknown)}")
+    return names
+
+
+def find_candlestick_patterns(
+    ticker: str, patterns: list[str] | None = None, period: str = "1Y", limit: int = 50
+) -> dict[str, Any]:
+    """List historical candlestick occurrences over `period`, newest first."""
+    names = candlestick_names(patterns)
+    window = load_dataframe(ticker, period)
+    signals = candlestick_matrix(ticker).loc[window.index[0] : window.index[-1], names]
+    rows, cols = np.nonzero(signals.to_numpy())
+    order = np.argsort(-rows, kind="stable")
+    occurrences = [
+        pattern_entry(names[col], signals.index[row], float(signals.iat[row, col]))
+        for row, col in zip(rows[order][:limit], cols[order][:limit])
+    ]
+    counts = {name: int(np.count_nonzero(signals[name].to_numpy())) for name in names}
+    return {
+        "ticker": ticker,
+        "period": period,
+        "counts": counts,
+        "occurrences": occurrences,
+        "summary": f"{sum(counts.values())} candlestick signal(s) over {period}.",
+    }
+
+
+RECENT_BARS = 60
+
+
+def extrema_masks(values: Any, order: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    """Flag bars equal to the max / min of the 2*order+1 bars centred on them.
+
+    Works along axis 0, so a (bars x tickers) panel is handled in one pass.
+    The first and last `order` bars have no full window and are never flagged.
+    """
+    x = np.asarray(values, dtype="float64")
+    is_high = np.zeros(x.shape, dtype=bool)
+    is_low = np.zeros(x.shape, dtype=bool)
+    span = 2 * order + 1
+    if order < 1 or x.shape[0] < span:
+        return is_high, is_low
+    # A trailing window ending at i + order is the centred window around i.
+    centred_max = kernels.rolling_max(x, span)[span - 1 :]
+    centred_min = kernels.rolling_min(x, span)[span - 1 :]
+    middle = x[order : x.shape[0] - order]
+    is_high[order : x.shape[0] - order] = middle == centred_max
+    is_low[order : x.shape[0] - order] = middle == centred_min
+    return is_high, is_low
 
 
 def _local_extrema(series: pd.Series, order: int = 3) -> tuple[list[int], list[int]]:
-    highs = []
-    lows = []
-    for i in range(order, len(series) - order):
-        window = series.iloc[i - order : i + order + 1]
-        if series.iloc[i] == window.max():
-            highs.append(i)
-        if series.iloc[i] == window.min():
-            lows.append(i)
-    return highs, lows
-
-
-def _detect_double_top_bottom(df: pd.DataFrame) -> list[dict[str, Any]]:
+    is_high, is_low = extrema_masks(series.to_numpy(), order)
+    return np.flatnonzero(is_high).tolist(), np.flatnonzero(is_low).tolist()
+
+
+def zigzag(high: Any, low: Any, order: int = 3, threshold: float = 0.05) -> list[tuple[int, float, int]]:
+    """Alternating swing pivots as (bar index, price, +1 for a high / -1 for a low).
+
+    Candidates are the local extrema of highs and lows; a pivot is kept only if
+    it reverses at least `threshold` from the previous one, and runs of same-side
+    candidates collapse to the most extreme. Only the candidates are looped over.
+    """
+    high = np.asarray(high, dtype="float64")
+    low = np.asarray(low, dtype="float64")
+    high_idx = np.flatnonzero(extrema_masks(high, order)[0])
+    low_idx = np.flatnonzero(extrema_masks(low, order)[1])
+    idx = np.concatenate([high_idx, low_idx])
+    kinds = np.concatenate([np.ones(len(high_idx), dtype=int), -np.ones(len(low_idx), dtype=int)])
+    prices = np.concatenate([high[high_idx], low[low_idx]])
+    ordering = np.lexsort((kinds, idx))
+
+    pivots: list[tuple[int, float, int]] = []
+    for i, price, kind in zip(idx[ordering].tolist(), prices[ordering].tolist(), kinds[ordering].tolist()):
+        if not pivots:
+            pivots.append((i, price, kind))
+            continue
+        _, last_price, last_kind = pivots[-1]
+        if kind == last_kind:
+            if (price > last_price) if kind > 0 else (price < last_price):
+                pivots[-1] = (i, price, kind)
+        elif last_price and abs(price / last_price - 1.0) >= threshold:
+            pivots.append((i, price, kind))
+    return pivots
+
+
+def double_tops_bottoms(
+    high: Any, low: Any, order: int = 3, tolerance: float = 0.03
+) -> list[tuple[str, int, int]]:
+    """Every pair of consecutive local highs (lows) within `tolerance` of each other.
+
+    Returns ("top" | "bottom", first index, second index), ordered by the second index.
+    """
+    high = np.asarray(high, dtype="float64")
+    low = np.asarray(low, dtype="float64")
+    found: list[tuple[str, int, int]] = []
+    for kind, prices, mask in (
+        ("top", high, extrema_masks(high, order)[0]),
+        ("bottom", low, extrema_masks(low, order)[1]),
+    ):
+        idx = np.flatnonzero(mask)
+        if len(idx) < 2:
+            continue
+        first, second = idx[:-1], idx[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            close_enough = np.abs(prices[first] - prices[second]) / prices[first] <= tolerance
+        found.extend((kind, int(a), int(b)) for a, b in zip(first[close_enough], second[close_enough]))
+    return sorted(found, key=lambda match: match[2])
+
+
+def detect_double_top_bottom(df: pd.DataFrame) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
-    recent = df.tail(60)
-    highs_idx, lows_idx = _local_extrema(recent["High"])
+    # Extrema come from the whole frame so peaks near the window edge are judged
+    # on full neighbourhoods; only pairs inside the recent window are reported.
+    highs_idx, _ = _local_extrema(df["High"])
+    _, lows_idx = _local_extrema(df["Low"])
+    recent_start = len(df) - RECENT_BARS
 
-    if len(highs_idx) >= 2:
+    if len(highs_idx) >= 2 and highs_idx[-2] >= recent_start:
         first, second = highs_idx[-2], highs_idx[-1]
-        p1 = recent["High"].iloc[first]
-        p2 = recent["High"].iloc[second]
+        p1 = df["High"].iloc[first]
+        p2 = df["High"].iloc[second]
         if abs(p1 - p2) / p1 <= 0.03:
             results.append(
                 {
                     "name": "Double Top",
-                    "start_date": recent.index[first].strftime("%Y-%m-%d"),
-                    "end_date": recent.index[second].strftime("%Y-%m-%d"),
+                    "start_date": df.index[first].strftime("%Y-%m-%d"),
+                    "end_date": df.index[second].strftime("%Y-%m-%d"),
                     "confidence": 0.6,
                     "implication": "BEARISH",
                     "description": "Two peaks at similar highs suggest resistance and potential downside.",
                 }
             )
 
-    if len(lows_idx) >= 2:
+    if len(lows_idx) >= 2 and lows_idx[-2] >= recent_start:
         first, second = lows_idx[-2], lows_idx[-1]
-        p1 = recent["Low"].iloc[first]
-        p2 = recent["Low"].iloc[second]
+        p1 = df["Low"].iloc[first]
+        p2 = df["Low"].iloc[second]
         if abs(p1 - p2) / p1 <= 0.03:
             results.append(
                 {
                     "name": "Double Bottom",
-                    "start_date": recent.index[first].strftime("%Y-%m-%d"),
-                    "end_date": recent.index[second].strftime("%Y-%m-%d"),
+                    "start_date": df.index[first].strftime("%Y-%m-%d"),
+                    "end_date": df.index[second].strftime("%Y-%m-%d"),
                     "confidence": 0.6,
                     "implication": "BULLISH",
                     "description": "Two lows at similar levels suggest support and potential upside.",
@@ -107,117 +326,166 @@ def _detect_double_top_bottom(df: pd.DataFrame) -> list[dict[str, Any]]:
     return results
 
 
-def _slope(values: np.ndarray) -> float:
-    x = np.arange(len(values))
-    if len(values) < 2:
-        return 0.0
-    return float(np.polyfit(x, values, 1)[0])
+def scan_double_tops_bottoms(
+    tickers: list[str] | None = None, order: int = 3, tolerance: float = 0.03
+) -> dict[str, list[dict[str, Any]]]:
+    """Find double tops/bottoms across each ticker's full history."""
+    tickers = tickers or get_registry().tickers_with_data()
+    results: dict[str, list[dict[str, Any]]] = {}
+    for ticker in tickers:
+        df = load_full_dataframe(ticker)
+        matches = double_tops_bottoms(df["High"], df["Low"], order, tolerance)
+        results[ticker] = [
+            {
+                "name": "Double Top" if kind == "top" else "Double Bottom",
+                "start_date": df.index[first].strftime("%Y-%m-%d"),
+                "end_date": df.index[second].strftime("%Y-%m-%d"),
+                "implication": "BEARISH" if kind == "top" else "BULLISH",
+            }
+            for kind, first, second in matches
+        ]
+    return results
 
 
-def _detect_triangle(df: pd.DataFrame) -> list[dict[str, Any]]:
-    recent = df.tail(60)
-    highs = recent["High"].to_numpy()
-    lows = recent["Low"].to_numpy()
-    high_slope = _slope(highs)
-    low_slope = _slope(lows)
+TREND_WINDOW = 60
+FLAG_WINDOW = 20
+SLOPE_THRESHOLD = 0.01
+FLAG_RANGE_RATIO = 0.35
+
+# name, base confidence, implication, description
+CHART_PATTERNS: dict[str, tuple[str, float, str, str]] = {
+    "symmetrical_triangle": (
+        "Symmetrical Triangle", 0.55, "NEUTRAL", "Converging highs and lows suggest compression before breakout."
+    ),
+    "ascending_triangle": (
+        "Ascending Triangle", 0.55, "BULLISH", "Flat resistance with rising lows indicates upward pressure."
+    ),
+    "descending_triangle": (
+        "Descending Triangle", 0.55, "BEARISH", "Lower highs with flat support indicate downside pressure."
+    ),
+    "rising_channel": ("Rising Channel", 0.5, "BULLISH", "Parallel rising highs/lows suggest an orderly uptrend."),
+    "falling_channel": (
+        "Falling Channel", 0.5, "BEARISH", "Parallel declining highs/lows suggest an orderly downtrend."
+    ),
+    "flag": ("Flag", 0.45, "NEUTRAL", "Tight consolidation after a sharp move suggests a flag pattern."),
+}
 
-    patterns: list[dict[str, Any]] = []
-    if high_slope < -0.01 and low_slope > 0.01:
-        patterns.append(
-            {
-                "name": "Symmetrical Triangle",
-                "start_date": recent.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.55,
-                "implication": "NEUTRAL",
-                "description": "Converging highs and lows suggest compression before breakout.",
-            }
-        )
-    elif abs(high_slope) < 0.01 and low_slope > 0.01:
-        patterns.append(
-            {
-                "name": "Ascending Triangle",
-                "start_date": recent.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.55,
-                "implication": "BULLISH",
-                "description": "Flat resistance with rising lows indicates upward pressure.",
-            }
-        )
-    elif high_slope < -0.01 and abs(low_slope) < 0.01:
-        patterns.append(
-            {
-                "name": "Descending Triangle",
-                "start_date": recent.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.55,
-                "implication": "BEARISH",
-                "description": "Lower highs with flat support indicate downside pressure.",
-            }
-        )
 
-    return patterns
+def chart_pattern_signals(
+    high: Any, low: Any, window: int = TREND_WINDOW, flag_window: int = FLAG_WINDOW
+) -> dict[str, np.ndarray]:
+    """Confidence of each chart pattern in a window ending on every bar (0 where absent).
+
+    Trend lines are rolling least-squares fits of the highs and lows; a
+    pattern's base confidence is scaled from 50% to 100% by the R² of the
+    sloped line(s) that define it. A flag compares the latest flag_window bars'
+    range with the flag_window before them, and scores tighter ranges higher.
+    """
+    high = np.asarray(high, dtype="float64")
+    low = np.asarray(low, dtype="float64")
+    high_slope, _, high_r2 = kernels.rolling_linregress(high, window)
+    low_slope, _, low_r2 = kernels.rolling_linregress(low, window)
+
+    with np.errstate(invalid="ignore"):
+        rising_high, falling_high = high_slope > SLOPE_THRESHOLD, high_slope < -SLOPE_THRESHOLD
+        rising_low, falling_low = low_slope > SLOPE_THRESHOLD, low_slope < -SLOPE_THRESHOLD
+        flat_high, flat_low = np.abs(high_slope) < SLOPE_THRESHOLD, np.abs(low_slope) < SLOPE_THRESHOLD
+    both_r2 = (high_r2 + low_r2) / 2
+    shapes = {
+        "symmetrical_triangle": (falling_high & rising_low, both_r2),
+        "ascending_triangle": (flat_high & rising_low, low_r2),
+        "descending_triangle": (falling_high & flat_low, high_r2),
+        "rising_channel": (rising_high & rising_low, both_r2),
+        "falling_channel": (falling_high & falling_low, both_r2),
+    }
+    signals = {
+        key: np.where(mask, CHART_PATTERNS[key][1] * (0.5 + 0.5 * np.nan_to_num(quality)), 0.0)
+        for key, (mask, quality) in shapes.items()
+    }
 
+    recent_range = kernels.rolling_max(high, flag_window) - kernels.rolling_min(low, flag_window)
+    prior_range = _lag(recent_range, flag_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = recent_range / prior_range
+        is_flag = (prior_range > 0) & (ratio < FLAG_RANGE_RATIO)
+    signals["flag"] = np.where(is_flag, CHART_PATTERNS["flag"][1] * (1.0 - 0.5 * ratio / FLAG_RANGE_RATIO), 0.0)
+    return signals
 
-def _detect_channel_wedge_flag(df: pd.DataFrame) -> list[dict[str, Any]]:
-    recent = df.tail(60)
-    high_slope = _slope(recent["High"].to_numpy())
-    low_slope = _slope(recent["Low"].to_numpy())
-    patterns: list[dict[str, Any]] = []
 
-    if high_slope > 0.01 and low_slope > 0.01:
-        patterns.append(
-            {
-                "name": "Rising Channel",
-                "start_date": recent.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.5,
-                "implication": "BULLISH",
-                "description": "Parallel rising highs/lows suggest an orderly uptrend.",
-            }
-        )
-    elif high_slope < -0.01 and low_slope < -0.01:
-        patterns.append(
-            {
-                "name": "Falling Channel",
-                "start_date": recent.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.5,
-                "implication": "BEARISH",
-                "description": "Parallel declining highs/lows suggest an orderly downtrend.",
-            }
-        )
+def chart_pattern_matrix(ticker: str) -> pd.DataFrame:
+    """Return the (date x chart pattern) confidence matrix over a ticker's full history."""
 
-    # Simple flag detection: consolidation after a sharp move
-    last_40 = df.tail(40)
-    prior = last_40.iloc[:20]
-    recent_window = last_40.iloc[20:]
-    prior_range = prior["High"].max() - prior["Low"].min()
-    recent_range = recent_window["High"].max() - recent_window["Low"].min()
-    if prior_range > 0 and recent_range / prior_range < 0.35:
-        patterns.append(
-            {
-                "name": "Flag",
-                "start_date": recent_window.index[0].strftime("%Y-%m-%d"),
-                "end_date": recent_window.index[-1].strftime("%Y-%m-%d"),
-                "confidence": 0.45,
-                "implication": "NEUTRAL",
-                "description": "Tight consolidation after a sharp move suggests a flag pattern.",
-            }
-        )
+    def build(df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(chart_pattern_signals(df["High"], df["Low"]), index=df.index)
 
-    return patterns
+    return _cached_matrix(ticker, "chart", build)
+
+
+def _chart_entry(key: str, dates: pd.DatetimeIndex, position: int, confidence: float) -> dict[str, Any]:
+    name, _, implication, description = CHART_PATTERNS[key]
+    span = FLAG_WINDOW if key == "flag" else TREND_WINDOW
+    return {
+        "name": name,
+        "start_date": dates[max(0, position - span + 1)].strftime("%Y-%m-%d"),
+        "end_date": dates[position].strftime("%Y-%m-%d"),
+        "confidence": round(float(confidence), 3),
+        "implication": implication,
+        "description": description,
+    }
+
+
+def detect_trend_patterns(signals: pd.DataFrame) -> list[dict[str, Any]]:
+    """Triangles, channels and flags whose window ends on the last bar of `signals`."""
+    if signals.empty:
+        return []
+    last = signals.iloc[-1]
+    position = len(signals) - 1
+    return [_chart_entry(key, signals.index, position, last[key]) for key in CHART_PATTERNS if last[key] > 0]
+
+
+def find_chart_patterns(
+    ticker: str, pattern: str | None = None, period: str = "1Y", limit: int = 50
+) -> dict[str, Any]:
+    """List the bars where triangle/channel/flag windows ended over `period`, newest first."""
+    keys = [pattern.lower().replace(" ", "_")] if pattern else list(CHART_PATTERNS)
+    unknown = [key for key in keys if key not in CHART_PATTERNS]
+    if unknown:
+        raise ValueError(f"Unsupported chart pattern: {', '.join(unknown)}")
+
+    matrix = chart_pattern_matrix(ticker)
+    window = load_dataframe(ticker, period)
+    offset = int(matrix.index.searchsorted(window.index[0]))
+    values = matrix[keys].to_numpy()[offset:]
+    rows, cols = np.nonzero(values)
+    order = np.argsort(-rows, kind="stable")[:limit]
+    occurrences = [
+        _chart_entry(keys[cols[i]], matrix.index, offset + rows[i], values[rows[i], cols[i]]) for i in order
+    ]
+    counts = {key: int(np.count_nonzero(values[:, j])) for j, key in enumerate(keys)}
+    return {
+        "ticker": ticker,
+        "period": period,
+        "counts": counts,
+        "occurrences": occurrences,
+        "summary": f"{sum(counts.values())} bar(s) with a chart pattern over {period}.",
+    }
 
 
 def detect_patterns(ticker: str, pattern_type: str = "both") -> dict[str, Any]:
     df = load_dataframe(ticker, "6M")
-    candlesticks = _detect_candlestick_patterns(df) if pattern_type in ("candlestick", "both") else []
+    candlesticks = []
+    if pattern_type in ("candlestick", "both"):
+        candlesticks = _detect_candlestick_patterns(candlestick_matrix(ticker).loc[: df.index[-1]])
     charts: list[dict[str, Any]] = []
     if pattern_type in ("chart", "both"):
-        charts.extend(_detect_double_top_bottom(df))
-        charts.extend(_detect_triangle(df))
-        charts.extend(_detect_channel_wedge_flag(df))
+        charts.extend(detect_double_top_bottom(df))
+        charts.extend(detect_trend_patterns(chart_pattern_matrix(ticker).loc[: df.index[-1]]))
+    return pattern_report(pattern_type, candlesticks, charts)
+
 
+def pattern_report(
+    pattern_type: str, candlesticks: list[dict[str, Any]], charts: list[dict[str, Any]]
+) -> dict[str, Any]:
     summary_parts = []
     if candlesticks:
         summary_parts.append(f"{len(candlesticks)} candlestick pattern(s)")
@@ -237,3 +505,8 @@ def detect_patterns(ticker: str, pattern_type: str = "both") -> dict[str, Any]:
 
 if __name__ == "__main__":
     print(detect_patterns("OGDC", "both"))
+    print(find_candlestick_patterns("OGDC", limit=5))
+    print(find_chart_patterns("OGDC", limit=5))
+    ogdc = load_full_dataframe("OGDC")
+    print(zigzag(ogdc["High"], ogdc["Low"], order=3, threshold=0.05))
+    print({ticker: len(matches) for ticker, matches in scan_double_tops_bottoms().items()})
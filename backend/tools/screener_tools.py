@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import ast
+import os
+import re
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from tools import ta_kernels as kernels
+from tools.data_tools import data_version, get_registry, load_panel, panel_period_start
+from tools.indicator_tools import DEFAULT_PARAMS, indicator_warmup
+from utils.cache import LRUCache
+
+# Screens evaluate a filter expression such as "RSI < 30 and close > SMA200"
+# over every ticker with data (the benchmark index excluded unless asked for).
+# Each variable is computed once for the whole universe as a (dates x tickers)
+# array and cached per data version, so repeated or overlapping screens only
+# pay for variables they have not seen. Indicators run over each ticker's own
+# traded bars, from enough warmup history ahead of the period.
+
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+_VARIABLE_PATTERN = re.compile(r"^([A-Z_]+?)_?(\d+)?$")
+
+# Screener variables that are indicator_tools indicators, for their warmup and
+# default length.
+_WARMUP_INDICATORS = {
+    "SMA": "SMA",
+    "EMA": "EMA",
+    "RSI": "RSI",
+    "ATR": "ATR",
+    "ADX": "ADX",
+    "PLUS_DI": "ADX",
+    "MINUS_DI": "ADX",
+    "WILLR": "WILLIAMS_R",
+    "WILLIAMS_R": "WILLIAMS_R",
+    "CCI": "CCI",
+    "MACD": "MACD",
+    "MACD_HIST": "MACD",
+    "MACD_SIGNAL": "MACD",
+    "BB_LOWER": "BOLLINGER",
+    "BB_MID": "BOLLINGER",
+    "BB_UPPER": "BOLLINGER",
+    "STOCH_K": "STOCHASTIC",
+    "STOCH_D": "STOCHASTIC",
+}
+
+
+def _field(name: str) -> Callable[[dict[str, np.ndarray], int | None], np.ndarray]:
+    return lambda p, n: p[name]
+
+
+def _change_pct(p: dict[str, np.ndarray], n: int | None) -> np.ndarray:
+    periods = n or 1
+    previous = np.full(p["Close"].shape, np.nan)
+    previous[periods:] = p["Close"][:-periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (p["Close"] / previous - 1.0) * 100.0
+
+
+_VARIABLES: dict[str, Callable[[dict[str, np.ndarray], int | None], np.ndarray]] = {
+    "OPEN": _field("Open"),
+    "HIGH": _field("High"),
+    "LOW": _field("Low"),
+    "CLOSE": _field("Close"),
+    "PRICE": _field("Close"),
+    "VOLUME": _field("Volume"),
+    "CHANGE_PCT": _change_pct,
+    "SMA": lambda p, n: kernels.sma(p["Close"], n),
+    "EMA": lambda p, n: kernels.ema(p["Close"], n),
+    "RSI": lambda p, n: kernels.rsi(p["Close"], n),
+    "ATR": lambda p, n: kernels.atr(p["High"], p["Low"], p["Close"], n),
+    "ADX": lambda p, n: kernels.adx(p["High"], p["Low"], p["Close"], n)[0],
+    "PLUS_DI": lambda p, n: kernels.adx(p["High"], p["Low"], p["Close"], n)[1],
+    "MINUS_DI": lambda p, n: kernels.adx(p["High"], p["Low"], p["Close"], n)[2],
+    "WILLR": lambda p, n: kernels.willr(p["High"], p["Low"], p["Close"], n),
+    "WILLIAMS_R": lambda p, n: kernels.willr(p["High"], p["Low"], p["Close"], n),
+    "CCI": lambda p, n: kernels.cci(p["High"], p["Low"], p["Close"], n),
+    "MACD": lambda p, n: kernels.macd(p["Close"])[0],
+    "MACD_HIST": lambda p, n: kernels.macd(p["Close"])[1],
+    "MACD_SIGNAL": lambda p, n: kernels.macd(p["Close"])[2],
+    "BB_LOWER": lambda p, n: kernels.bbands(p["Close"], n)[0],
+    "BB_MID": lambda p, n: kernels.bbands(p["Close"], n)[1],
+    "BB_UPPER": lambda p, n: kernels.bbands(p["Close"], n)[2],
+    "STOCH_K": lambda p, n: kernels.stoch(p["High"], p["Low"], p["Close"])[0],
+    "STOCH_D": lambda p, n: kernels.stoch(p["High"], p["Low"], p["Close"])[1],
+    "OBV": lambda p, n: kernels.obv(p["Close"], p["Volume"]),
+    "VWAP": lambda p, n: kernels.vwap(p["High"], p["Low"], p["Close"], p["Volume"]),
+}
+
+_COMPARISONS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_ARITHMETIC: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+
+def _default_length(base: str) -> int | None:
+    indicator = _WARMUP_INDICATORS.get(base)
+    return DEFAULT_PARAMS[indicator].get("period") if indicator else None
+
+
+def _variable_spec(name: str) -> tuple[str, int | None]:
+    """Split a variable like SMA200, rsi_14 or MACD_SIGNAL into (base, length)."""
+    upper = name.upper()
+    if upper in _VARIABLES:
+        return upper, _default_length(upper)
+    match = _VARIABLE_PATTERN.match(upper)
+    if not match or match.group(1) not in _VARIABLES:
+        raise ValueError(f"Unknown screener variable: {name}")
+    base, length = match.group(1), match.group(2)
+    if length is not None and int(length) <= 0:
+        raise ValueError(f"Invalid length in screener variable: {name}")
+    return base, int(length) if length is not None else _default_length(base)
+
+
+def parse_filter(expression: str) -> ast.Expression:
+    """Parse a filter and reject anything beyond comparisons, arithmetic, and/or/not."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid filter expression: {exc.msg}") from exc
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.Not, ast.USub, ast.Load)):
+            continue
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            continue
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            continue
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            continue
+        if type(node) in _COMPARISONS or type(node) in _ARITHMETIC:
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            continue
+        if isinstance(node, ast.Name):
+            _variable_spec(node.id)
+            continue
+        raise ValueError(f"Unsupported syntax in filter expression: {type(node).__name__}")
+    return tree
+
+
+def filter_variables(expression: str) -> list[str]:
+    """Return the canonical variable names a filter refers to, in order of appearance."""
+    names = [node.id for node in ast.walk(parse_filter(expression)) if isinstance(node, ast.Name)]
+    return list(dict.fromkeys(_canonical(name) for name in names))
+
+
+def _canonical(name: str) -> str:
+    base, length = _variable_spec(name)
+    return f"{base}{length}" if length is not None else base
+
+
+def _evaluate(node: ast.AST, lookup: Callable[[str], np.ndarray]) -> Any:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, lookup)
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        return lookup(_canonical(node.id))
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, lookup)
+        return np.logical_not(operand) if isinstance(node.op, ast.Not) else -operand
+    if isinstance(node, ast.BinOp):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _ARITHMETIC[type(node.op)](_evaluate(node.left, lookup), _evaluate(node.right, lookup))
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = _evaluate(node.values[0], lookup)
+        for value in node.values[1:]:
+            result = combine(result, _evaluate(value, lookup))
+        return result
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, lookup)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, lookup)
+            result = np.logical_and(result, _COMPARISONS[type(op)](left, right))
+            left = right
+        return result
+    raise ValueError(f"Unsupported syntax in filter expression: {type(node).__name__}")
+
+
+def _array_nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return int(sum(_array_nbytes(v) for v in value.values())) + 1024
+    return 1024
+
+
+_SCREENER_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("SCREENER_CACHE_MAX_MB", "32")) * 1024 * 1024),
+    sizeof=_array_nbytes,
+)
+
+
+def _universe(tickers: list[str] | None) -> tuple[list[str], tuple]:
+    if tickers:
+        candidates = tickers
+    else:
+        registry = get_registry()
+        candidates = [t for t in registry.tickers_with_data() if t != registry.index_ticker]
+    available: list[str] = []
+    versions: list[tuple[str, int, int]] = []
+    for ticker in dict.fromkeys(t.upper() for t in candidates):
+        try:
+            versions.append(data_version(ticker))
+        except FileNotFoundError:
+            continue
+        available.append(ticker)
+    return available, tuple(versions)
+
+
+def _warmup(base: str, length: int | None) -> int:
+    if base == "CHANGE_PCT":
+        return length or 1
+    indicator = _WARMUP_INDICATORS.get(base)
+    if indicator is None:
+        return 0
+    return indicator_warmup(indicator, {"period": length} if length is not None else None)
+
+
+def _variable(universe_key: tuple, name: str) -> np.ndarray:
+    """A variable over the period's rows of the universe panel, computed from warmup bars ahead of it."""
+    key = (universe_key, "var", name)
+    cached = _SCREENER_CACHE.get(key)
+    if cached is not None:
+        return cached
+    base, length = _variable_spec(name)
+    available, _, period = universe_key
+    frames = load_panel(list(available), period, fields=PANEL_FIELDS, warmup=_warmup(base, length))
+    start = panel_period_start(frames["Close"].index, period)
+    panel = [frames[field].reindex(columns=list(available)).to_numpy(dtype="float64") for field in PANEL_FIELDS]
+    if base in ("OPEN", "HIGH", "LOW", "CLOSE", "PRICE", "VOLUME"):
+        values = _VARIABLES[base](dict(zip(PANEL_FIELDS, panel)), length)
+    else:
+        # Each ticker's own bars, so a session it missed on the union grid does
+        # not blank every window that spans it.
+        compute = _VARIABLES[base]
+        values = kernels.on_traded_bars(lambda *columns: compute(dict(zip(PANEL_FIELDS, columns)), length), *panel)
+    values = np.ascontiguousarray(np.asarray(values, dtype="float64")[start:])
+    _SCREENER_CACHE.put(key, values)
+    return values
+
+
+def run_screen(
+    expression: str,
+    tickers: list[str] | None = None,
+    period: str = "1Y",
+    sort_by: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Evaluate a filter across the universe on each ticker's latest bar."""
+    started = time.perf_counter()
+    tree = parse_filter(expression)
+    variables = filter_variables(expression)
+    sort_key = _canonical(sort_by) if sort_by else None
+    if sort_key and sort_key not in variables:
+        variables.append(sort_key)
+
+    available, versions = _universe(tickers)
+    universe_key = (tuple(available), versions, period)
+    normalized = ast.dump(tree)
+    result_key = (universe_key, "screen", normalized, sort_key, descending)
+    cached = _SCREENER_CACHE.get(result_key)
+
+    if cached is None:
+        frames = load_panel(available, period, fields=("Close",))
+        dates = frames["Close"].index
+        close = frames["Close"].reindex(columns=available).to_numpy(dtype="float64")
+        matrices = {name: _variable(universe_key, name) for name in variables}
+
+        # Screen each ticker on its own last traded bar, so one stale ticker
+        # does not push the others onto a date they have no data for.
+        traded = ~np.isnan(close)
+        last_row = close.shape[0] - 1 - np.argmax(traded[::-1], axis=0) if close.size else np.zeros(0, dtype=int)
+        has_bars = traded.any(axis=0) if close.size else np.zeros(0, dtype=bool)
+        columns = np.arange(len(available))
+        latest = {name: values[last_row, columns] if values.size else values.reshape(-1) for name, values in matrices.items()}
+        mask = np.asarray(_evaluate(tree, lambda name: latest[name]), dtype=bool)
+        mask = np.broadcast_to(mask, (len(available),)) & has_bars
+
+        matches = []
+        for col in np.flatnonzero(mask):
+            values = {name: _round(latest[name][col]) for name in variables}
+            matches.append(
+                {"ticker": available[col], "date": dates[last_row[col]].strftime("%Y-%m-%d"), "values": values}
+            )
+        if sort_key:
+            present = [m for m in matches if m["values"][sort_key] is not None]
+            missing = [m for m in matches if m["values"][sort_key] is None]
+            matches = sorted(present, key=lambda m: m["values"][sort_key], reverse=descending) + missing
+        cached = {"matches": matches, "universe_size": len(available)}
+        _SCREENER_CACHE.put(result_key, cached)
+
+    registry = get_registry()
+    matches = []
+    for match in cached["matches"][:limit] if limit else cached["matches"]:
+        info = registry.get(match["ticker"])
+        matches.append({**match, "name": info.name if info else match["ticker"], "sector": info.sector if info else ""})
+
+    return {
+        "filter": expression,
+        "period": period,
+        "variables": variables,
+        "universe_size": cached["universe_size"],
+        "match_count": len(cached["matches"]),
+        "matches": matches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _round(value: float) -> float | None:
+    return None if not np.isfinite(value) else round(float(value), 2)
+
+
+def screener_cache_stats() -> dict[str, Any]:
+    return _SCREENER_CACHE.stats()
+
+
+if __name__ == "__main__":
+    import json
+
+    for expression in ("RSI < 30 and close > SMA200", "close > SMA50", "RSI > 50 or CHANGE_PCT5 > 2"):
+        print(json.dumps(run_screen(expression, sort_by="RSI", descending=True), indent=2))
+    print(run_screen("close > SMA50")["elapsed_ms"], "ms (cached)")
+    print(screener_cache_stats())
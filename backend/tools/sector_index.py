@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from tools.data_tools import SECTOR_PREFIX, data_version, get_registry, load_full_dataframe
+from utils.cache import LRUCache
+
+# Synthetic sector indices, addressable as tickers: SECTOR_ENERGY is the
+# equal-weight index of the Energy constituents that have data, and
+# SECTOR_ENERGY_VW weights each constituent by its previous bar's traded value
+# (close x volume). Every bar chains the weighted average of the constituents'
+# bar-over-previous-close ratios onto the prior index close, starting at 100.
+
+VOLUME_WEIGHTED_SUFFIX = "_VW"
+INDEX_BASE = 100.0
+_PRICE_FIELDS = ("Open", "High", "Low", "Close")
+
+
+def _slug(sector: str) -> str:
+    return re.sub(r"[^A-Z0-9]+", "_", sector.upper()).strip("_")
+
+
+def sector_index_ticker(sector: str, weighting: str = "equal") -> str:
+    suffix = VOLUME_WEIGHTED_SUFFIX if weighting == "volume" else ""
+    return f"{SECTOR_PREFIX}{_slug(sector)}{suffix}"
+
+
+def is_sector_index(ticker: str) -> bool:
+    return ticker.upper().startswith(SECTOR_PREFIX)
+
+
+def resolve_sector_index(ticker: str) -> tuple[str, str, tuple[str, ...]]:
+    """Map a synthetic ticker to (sector, weighting, constituents with data)."""
+    name = ticker.upper()[len(SECTOR_PREFIX) :]
+    weighting = "equal"
+    if name.endswith(VOLUME_WEIGHTED_SUFFIX):
+        name, weighting = name[: -len(VOLUME_WEIGHTED_SUFFIX)], "volume"
+    registry = get_registry()
+    sector = next((s for s in registry.sectors if _slug(s) == name), None)
+    if sector is None:
+        raise FileNotFoundError(f"Unknown sector index: {ticker}")
+    members = tuple(t for t in registry.sectors[sector] if registry.has_data(t))
+    if not members:
+        raise FileNotFoundError(f"No constituent data for sector index: {ticker}")
+    return sector, weighting, members
+
+
+def sector_index_version(ticker: str) -> tuple[str, int, int]:
+    """A data_version-style stamp: changes whenever any constituent's file does."""
+    _, _, members = resolve_sector_index(ticker)
+    versions = [data_version(member) for member in members]
+    return (
+        f"{ticker.upper()}[{','.join(members)}]",
+        max(version[1] for version in versions),
+        sum(version[2] for version in versions),
+    )
+
+
+def _average_ratios(frames: dict[str, pd.DataFrame], weighting: str) -> pd.DataFrame:
+    """Weighted mean of each field over the previous close, for every union date after the first."""
+    close = pd.concat({t: f["Close"] for t, f in frames.items()}, axis=1, sort=True)
+    dates = close.index
+    previous = close.ffill().to_numpy(dtype=np.float64)[:-1]
+    volume = (
+        pd.concat({t: f["Volume"] for t, f in frames.items()}, axis=1, sort=True)
+        .reindex(dates)
+        .to_numpy(dtype=np.float64)
+    )
+
+    traded = ~np.isnan(close.to_numpy(dtype=np.float64)[1:]) & (previous > 0)
+    if weighting == "volume":
+        weights = np.nan_to_num(previous * volume[:-1])
+    else:
+        weights = np.ones_like(previous)
+    weights = np.where(traded, weights, 0.0)
+    total = weights.sum(axis=1)
+
+    ratios: dict[str, np.ndarray] = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for field in _PRICE_FIELDS:
+            values = (
+                pd.concat({t: f[field] for t, f in frames.items()}, axis=1, sort=True)
+                .reindex(dates)
+                .to_numpy(dtype=np.float64)[1:]
+            )
+            weighted = np.where(traded, values / previous * weights, 0.0).sum(axis=1)
+            # A date nobody traded (total 0) leaves the index flat.
+            ratios[field] = np.where(total > 0, weighted / total, 1.0)
+    ratios["Volume"] = np.nansum(volume[1:], axis=1)
+    return pd.DataFrame(ratios, index=dates[1:])
+
+
+def _chain(ratios: pd.DataFrame, base: float) -> pd.DataFrame:
+    close = base * np.cumprod(ratios["Close"].to_numpy())
+    previous = np.concatenate([[base], close[:-1]])
+    open_ = previous * ratios["Open"].to_numpy()
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum.reduce([previous * ratios["High"].to_numpy(), open_, close]),
+            "Low": np.minimum.reduce([previous * ratios["Low"].to_numpy(), open_, close]),
+            "Close": close,
+            "Volume": ratios["Volume"].to_numpy(),
+        },
+        index=ratios.index,
+    )
+
+
+def _build(frames: dict[str, pd.DataFrame], weighting: str) -> pd.DataFrame:
+    ratios = _average_ratios(frames, weighting)
+    first_date = min(frame.index[0] for frame in frames.values())
+    first_volume = float(sum(frame["Volume"].iloc[0] for frame in frames.values() if frame.index[0] == first_date))
+    first = pd.DataFrame(
+        {field: [INDEX_BASE] for field in _PRICE_FIELDS} | {"Volume": [first_volume]},
+        index=pd.DatetimeIndex([first_date], name="Date"),
+    )
+    bars = pd.concat([first, _chain(ratios, INDEX_BASE)])
+    bars.index.name = "Date"
+    return bars
+
+
+_SECTOR_INDEX_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("SECTOR_INDEX_CACHE_MAX_MB", "16")) * 1024 * 1024),
+    sizeof=lambda entry: int(entry[1].memory_usage(index=True, deep=False).sum()),
+)
+
+
+def load_sector_index(ticker: str) -> pd.DataFrame:
+    """Full OHLCV history of a synthetic sector index, cached per constituent versions.
+
+    When constituents only gained bars since the cached build, the dates from
+    the earliest constituent's last cached bar on are recomputed (so a revised
+    last bar is picked up too) and chained onto the cached closing level
+    before it. A rewrite in which no constituent grew is rebuilt in full. The
+    frame is shared; copy it before mutating.
+    """
+    _, weighting, members = resolve_sector_index(ticker)
+    version = sector_index_version(ticker)
+    key = ticker.upper()
+    cached = _SECTOR_INDEX_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    frames = {member: load_full_dataframe(member) for member in members}
+    frames = {member: frame for member, frame in frames.items() if not frame.empty}
+    if not frames:
+        raise ValueError(f"No data for {ticker}")
+    marks = {member: (len(frame), frame.index[-1]) for member, frame in frames.items()}
+
+    bars = None
+    if cached is not None:
+        _, previous, previous_marks = cached
+        appended = previous_marks.keys() == marks.keys() and all(
+            rows <= len(frames[member]) and frames[member].index[rows - 1] == last
+            for member, (rows, last) in previous_marks.items()
+        )
+        # Constituents update independently, so cached bars are only final up to
+        # the earliest constituent's last cached date, and that bar itself may
+        # have been revised. Recompute from the date before it, giving each
+        # constituent its last bar on or before that date as the previous close.
+        anchor = min(last for _, last in previous_marks.values())
+        position = int(previous.index.searchsorted(anchor, side="left"))
+        grew = appended and any(len(frames[member]) > rows for member, (rows, _) in previous_marks.items())
+        if grew and position > 0:
+            base = previous.index[position - 1]
+            kept = previous.iloc[:position]
+            tails = {
+                member: frame.iloc[max(int(frame.index.searchsorted(base, side="right")) - 1, 0) :]
+                for member, frame in frames.items()
+            }
+            ratios = _average_ratios(tails, weighting)
+            ratios = ratios[ratios.index > base]
+            bars = pd.concat([kept, _chain(ratios, float(kept["Close"].iloc[-1]))])
+    if bars is None:
+        bars = _build(frames, weighting)
+
+    _SECTOR_INDEX_CACHE.put(key, (version, bars, marks))
+    return bars
+
+
+def sector_index_cache_stats() -> dict[str, Any]:
+    return _SECTOR_INDEX_CACHE.stats()
+
+
+def sector_index_summary(sector: str) -> dict[str, Any]:
+    """Constituents a sector's indices are built from, and the configured ones without data."""
+    registry = get_registry()
+    configured = registry.sectors.get(sector, ())
+    return {
+        "sector": sector,
+        "equal_weight": sector_index_ticker(sector, "equal"),
+        "volume_weight": sector_index_ticker(sector, "volume"),
+        "constituents": [t for t in configured if registry.has_data(t)],
+        "missing": [t for t in configured if not registry.has_data(t)],
+    }
+
+
+if __name__ == "__main__":
+    for sector in get_registry().sectors:
+        summary = sector_index_summary(sector)
+        if summary["constituents"]:
+            print(summary)
+            print(load_sector_index(summary["equal_weight"]).tail(3))
+            print(load_sector_index(summary["volume_weight"]).tail(3))
@@ -1,23 +1,176 @@
 from __future__ import annotations
 
+import os
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from tools.data_tools import load_dataframe
+from tools import ta_kernels as kernels
+from tools.data_tools import data_version, get_registry, load_dataframe, load_full_dataframe
+from utils.cache import LRUCache
+
+VOLUME_WINDOW = 20
+UNUSUAL_ZSCORE = 2.0
+ACCUMULATION_RATIO = 1.5
+SIGNAL_COLUMNS = ("return_pct", "volume_ratio", "volume_zscore", "up_down_ratio", "obv", "obv_slope")
+# Bars before the first recomputed one that a tail recompute needs: a baseline window
+# ending the bar before, plus the OBV regression window.
+_TAIL_BARS = 2 * VOLUME_WINDOW + 1
+
+
+def _prior(values: np.ndarray) -> np.ndarray:
+    out = np.full_like(values, np.nan)
+    out[1:] = values[:-1]
+    return out
+
+
+def volume_signals(close: Any, volume: Any, window: int = VOLUME_WINDOW) -> pd.DataFrame:
+    """Per-bar volume statistics over a whole history, one array pass per column.
+
+    volume_ratio and volume_zscore compare each bar with the `window` bars
+    before it, so a spike does not dilute its own baseline. up_down_ratio is
+    up-bar over down-bar volume across the trailing window, and obv_slope the
+    OBV regression slope per bar as a fraction of average volume.
+    """
+    close_values = np.asarray(close, dtype=np.float64)
+    volume_values = np.asarray(volume, dtype=np.float64)
+    change = np.diff(close_values, prepend=np.nan)
+
+    baseline = _prior(kernels.sma(volume_values, window))
+    spread = _prior(kernels.rolling_std(volume_values, window, ddof=1))
+    up_volume = kernels.rolling_sum(np.where(change > 0, volume_values, 0.0), window)
+    down_volume = kernels.rolling_sum(np.where(change < 0, volume_values, 0.0), window)
+    obv = kernels.obv(close_values, volume_values)
+    slope, _, _ = kernels.rolling_linregress(obv, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns = {
+            "return_pct": change / _prior(close_values) * 100,
+            "volume_ratio": np.where(baseline > 0, volume_values / baseline, np.nan),
+            "volume_zscore": np.where(spread > 0, (volume_values - baseline) / spread, np.nan),
+            "up_down_ratio": np.where(down_volume > 0, up_volume / down_volume, np.nan),
+            "obv": obv,
+            "obv_slope": slope / kernels.sma(volume_values, window),
+        }
+    return pd.DataFrame(columns, index=getattr(close, "index", None))
+
+
+_VOLUME_CACHE = LRUCache(
+    max_bytes=int(float(os.getenv("VOLUME_CACHE_MAX_MB", "16")) * 1024 * 1024),
+    sizeof=lambda entry: int(entry[1].memory_usage(index=True, deep=False).sum()),
+)
+
+
+def volume_signal_frame(ticker: str) -> pd.DataFrame:
+    """volume_signals over a ticker's full history, cached per data version.
+
+    When the file only gained bars, the cached last bar (which may have been
+    revised) and the new ones are recomputed from a short tail of history, as
+    load_resampled re-derives its last bar; OBV is carried on from the cached
+    total. A rewrite that added no bars is recomputed in full. The frame is
+    shared; treat it as read-only.
+    """
+    version = data_version(ticker)
+    key = ticker.upper()
+    cached = _VOLUME_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    df = load_full_dataframe(ticker)
+    signals = None
+    if cached is not None:
+        _, previous, rows, last_date = cached
+        start = rows - 1 - _TAIL_BARS
+        if start > 0 and rows < len(df) and df.index[rows - 1] == last_date:
+            tail = volume_signals(df["Close"].iloc[start:], df["Volume"].iloc[start:])
+            # The tail's OBV is undefined on its first bar; align on the second.
+            tail["obv"] += previous["obv"].iloc[start + 1] - tail["obv"].iloc[1]
+            signals = pd.concat([previous.iloc[: rows - 1], tail.iloc[rows - 1 - start :]])
+    if signals is None:
+        signals = volume_signals(df["Close"], df["Volume"])
+
+    if not df.empty:
+        _VOLUME_CACHE.put(key, (version, signals, len(df), df.index[-1]))
+    return signals
+
+
+def volume_cache_stats() -> dict[str, Any]:
+    return _VOLUME_CACHE.stats()
+
+
+def _activity(up_down_ratio: float, obv_slope: float) -> str:
+    if up_down_ratio >= ACCUMULATION_RATIO and obv_slope > 0:
+        return "accumulation"
+    if up_down_ratio <= 1 / ACCUMULATION_RATIO and obv_slope < 0:
+        return "distribution"
+    return "neutral"
+
+
+def _rounded(value: float, digits: int = 2) -> float | None:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def scan_unusual_volume(
+    tickers: list[str] | None = None, min_zscore: float = UNUSUAL_ZSCORE, limit: int = 20
+) -> dict[str, Any]:
+    """Tickers whose latest bar traded unusually heavy volume, strongest first."""
+    registry = get_registry()
+    universe = [t.upper() for t in tickers] if tickers else registry.tickers_with_data()
+    active = []
+    for ticker in universe:
+        try:
+            signals = volume_signal_frame(ticker)
+        except FileNotFoundError:
+            continue
+        if signals.empty:
+            continue
+        last = signals.iloc[-1]
+        zscore = float(last["volume_zscore"])
+        if np.isnan(zscore) or zscore < min_zscore:
+            continue
+        info = registry.get(ticker)
+        active.append(
+            {
+                "ticker": ticker,
+                "name": info.name if info else ticker,
+                "sector": info.sector if info else "",
+                "date": signals.index[-1].strftime("%Y-%m-%d"),
+                "volume_zscore": round(zscore, 2),
+                "volume_ratio": _rounded(last["volume_ratio"]),
+                "price_change": _rounded(last["return_pct"]),
+                "up_down_ratio": _rounded(last["up_down_ratio"]),
+                "obv_slope": _rounded(last["obv_slope"], 4),
+                "activity": _activity(float(last["up_down_ratio"]), float(last["obv_slope"])),
+            }
+        )
+    active.sort(key=lambda item: item["volume_zscore"], reverse=True)
+    active = active[: max(int(limit), 0)]
+
+    if active:
+        leaders = ", ".join(f"{a['ticker']} ({a['volume_zscore']:.1f}σ, {a['activity']})" for a in active[:5])
+        summary = f"{len(active)} ticker(s) with volume at least {min_zscore:g}σ above their {VOLUME_WINDOW}-bar norm: {leaders}."
+    else:
+        summary = f"No ticker traded volume {min_zscore:g}σ above its {VOLUME_WINDOW}-bar norm on its latest bar."
+    return {
+        "min_zscore": min_zscore,
+        "window": VOLUME_WINDOW,
+        "universe_size": len(universe),
+        "matches": active,
+        "summary": summary,
+    }
 
 
 def analyze_volume(ticker: str, period: str = "1M") -> dict[str, Any]:
     df = load_dataframe(ticker, period)
-    df = df.copy()
-    df["return"] = df["Close"].pct_change() * 100
+    volume = df["Volume"]
+    returns = df["Close"].pct_change() * 100
 
-    avg_volume_20d = float(df["Volume"].tail(20).mean())
-    recent_volume = float(df["Volume"].iloc[-1])
+    avg_volume_20d = float(volume.tail(20).mean())
+    recent_volume = float(volume.iloc[-1])
     volume_ratio = recent_volume / avg_volume_20d if avg_volume_20d else 0.0
 
-    recent_avg = float(df["Volume"].tail(10).mean())
-    prior_avg = float(df["Volume"].tail(20).head(10).mean()) if len(df) >= 20 else recent_avg
+    recent_avg = float(volume.tail(10).mean())
+    prior_avg = float(volume.tail(20).head(10).mean()) if len(df) >= 20 else recent_avg
     if recent_avg > prior_avg * 1.05:
         volume_trend = "increasing"
     elif recent_avg < prior_avg * 0.95:
@@ -25,26 +178,32 @@ def analyze_volume(ticker: str, period: str = "1M") -> dict[str, Any]:
     else:
         volume_trend = "flat"
 
-    up_days = df[df["return"] > 0]["Volume"]
-    down_days = df[df["return"] < 0]["Volume"]
+    up_days = volume[returns > 0]
+    down_days = volume[returns < 0]
     up_avg = float(up_days.mean()) if not up_days.empty else 0.0
     down_avg = float(down_days.mean()) if not down_days.empty else 0.0
     volume_price_divergence = down_avg > up_avg * 1.2 if up_avg else False
 
-    unusual = df[df["Volume"] > avg_volume_20d * 1.5]
+    unusual = (volume > avg_volume_20d * 1.5).to_numpy()
     unusual_days = [
         {
-            "date": idx.strftime("%Y-%m-%d"),
-            "volume": int(row["Volume"]),
-            "ratio": round(row["Volume"] / avg_volume_20d, 2) if avg_volume_20d else 0,
-            "price_change": round(row["return"], 2) if pd.notna(row["return"]) else 0,
+            "date": date,
+            "volume": int(day_volume),
+            "ratio": round(day_volume / avg_volume_20d, 2) if avg_volume_20d else 0,
+            "price_change": round(change, 2) if pd.notna(change) else 0,
         }
-        for idx, row in unusual.iterrows()
+        for date, day_volume, change in zip(
+            df.index[unusual].strftime("%Y-%m-%d"), volume.to_numpy()[unusual], returns.to_numpy()[unusual]
+        )
     ]
 
+    latest = volume_signal_frame(ticker).loc[df.index[-1]]
+    activity = _activity(float(latest["up_down_ratio"]), float(latest["obv_slope"]))
+
     summary = (
         f"Volume {volume_trend} with {volume_ratio:.2f}x recent/avg. "
-        f"Down-day volume {'exceeds' if volume_price_divergence else 'does not exceed'} up-day volume."
+        f"Down-day volume {'exceeds' if volume_price_divergence else 'does not exceed'} up-day volume. "
+        f"{VOLUME_WINDOW}-day up/down volume and OBV slope point to {activity}."
     )
 
     return {
@@ -53,9 +212,13 @@ def analyze_volume(ticker: str, period: str = "1M") -> dict[str, Any]:
         "avg_volume_20d": int(avg_volume_20d),
         "recent_volume": int(recent_volume),
         "volume_ratio": round(volume_ratio, 2),
+        "volume_zscore": _rounded(latest["volume_zscore"]),
         "volume_trend": volume_trend,
         "up_day_avg_volume": int(up_avg),
         "down_day_avg_volume": int(down_avg),
+        "up_down_ratio_20d": _rounded(latest["up_down_ratio"]),
+        "obv_slope": _rounded(latest["obv_slope"], 4),
+        "activity": activity,
         "volume_price_divergence": volume_price_divergence,
         "unusual_volume_days": unusual_days,
         "summary": summary,
@@ -64,3 +227,4 @@ def analyze_volume(ticker: str, period: str = "1M") -> dict[str, Any]:
 
 if __name__ == "__main__":
     print(analyze_volume("OGDC", "1M"))
+    print(scan_unusual_volume(min_zscore=1.0))
@@ -1,52 +1,105 @@
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import re
 
 INPUT_FILE = "raw_ogdc.csv"
 OUTPUT_FILE = "OGDC.csv"
+NUMERIC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+SUFFIX_MULTIPLIERS = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_CHUNKSIZE = 250_000
 
-def parse_number(value):
-    if value is None:
-        return None
-
-    value = str(value).replace(",", "").strip()
+def parse_numbers(values):
+    """Vectorized parse of strings like '1,234.5', '6.12M' or '3B' into floats (NaN if unparseable)."""
+    result = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    # Plain numbers take the C fast path above; only cells with thousands
+    # separators or K/M/B suffixes go through string ops.
+    pending = np.isnan(result) & values.notna().to_numpy()
+    if not pending.any():
+        return result
 
-    if value == "":
-        return None
+    text = values[pending].astype(str).str.replace(",", "", regex=False).str.strip()
+    suffix = text.str[-1:].str.upper().to_numpy()
+    multiplier = np.ones(len(text))
+    for letter, factor in SUFFIX_MULTIPLIERS.items():
+        multiplier[suffix == letter] = factor
+    text = text.where(multiplier == 1, text.str[:-1])
+    result[pending] = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64") * multiplier
+    return result
 
-    multiplier = 1
+def clean_chunk(df):
+    df = df.rename(columns=lambda col: str(col).strip())
+    df = df.loc[:, [col for col in df.columns if col and not col.startswith("Unnamed")]]
+    df["Date"] = pd.to_datetime(df["Date"])
+    for col in NUMERIC_COLUMNS:
+        df[col] = parse_numbers(df[col])
+    return df
 
-    if value.endswith("K"):
-        multiplier = 1_000
-        value = value[:-1]
-    elif value.endswith("M"):
-        multiplier = 1_000_000
-        value = value[:-1]
-    elif value.endswith("B"):
-        multiplier = 1_000_000_000
-        value = value[:-1]
+def clean_frame(df):
+    return clean_chunk(df).sort_values("Date", kind="stable")
 
-    try:
-        return float(value) * multiplier
-    except ValueError:
-        return None
+def _write(df, path, header):
+    df.to_csv(path, index=False, header=header, date_format=DATE_FORMAT)
 
-# Read CSV
-df = pd.read_csv(INPUT_FILE)
+def clean_file(input_file, output_file, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream a raw export through the cleaner in bounded memory and write it sorted by date.
 
-# Rename columns cleanly
-df.columns = [col.strip() for col in df.columns if col.strip() != ""]
+    Each chunk is sorted and spilled to a part file. Raw exports are usually in
+    monotonic (often descending) date order, so the parts cover disjoint date
+    ranges and can be concatenated by start date without a global sort.
+    """
+    started = time.perf_counter()
+    rows = 0
+    columns = None
+    parts = []
+    output_file = Path(output_file)
+    work_dir = Path(tempfile.mkdtemp(prefix="clean_csv_", dir=output_file.resolve().parent))
+    try:
+        for index, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+            chunk = clean_frame(chunk)
+            if chunk.empty:
+                continue
+            columns = columns or list(chunk.columns)
+            part_path = work_dir / f"part_{index:06d}.csv"
+            _write(chunk.reindex(columns=columns), part_path, header=False)
+            parts.append((chunk["Date"].iloc[0], chunk["Date"].iloc[-1], part_path))
+            rows += len(chunk)
 
-# Convert Date
-df["Date"] = pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d")
+        parts.sort(key=lambda part: part[0])
+        tmp_output = output_file.with_name(output_file.name + ".tmp")
+        if all(prev[1] < nxt[0] for prev, nxt in zip(parts, parts[1:])):
+            with open(tmp_output, "wb") as out:
+                out.write((",".join(columns or ["Date"] + NUMERIC_COLUMNS) + "\n").encode("utf-8"))
+                for _, _, part_path in parts:
+                    with open(part_path, "rb") as src:
+                        shutil.copyfileobj(src, out)
+        else:
+            print("⚠️  Chunks overlap in date; falling back to an in-memory sort.")
+            merged = pd.concat(
+                [pd.read_csv(part_path, header=None, names=columns, parse_dates=["Date"]) for _, _, part_path in parts],
+                ignore_index=True,
+            )
+            _write(merged.sort_values("Date", kind="stable"), tmp_output, header=True)
+        tmp_output.replace(output_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
-# Clean numeric columns
-for col in ["Open", "High", "Low", "Close", "Volume"]:
-    df[col] = df[col].apply(parse_number)
+    elapsed = time.perf_counter() - started
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else float("inf")}
 
-# Sort by date (ascending)
-df = df.sort_values("Date")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean a raw PSX price export into MarketLens CSV format.")
+    parser.add_argument("input", nargs="?", default=INPUT_FILE)
+    parser.add_argument("output", nargs="?", default=OUTPUT_FILE)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
 
-# Save cleaned CSV
-df.to_csv(OUTPUT_FILE, index=False)
+    stats = clean_file(args.input, args.output, args.chunksize)
 
-print("✅ CSV cleaned successfully:", OUTPUT_FILE)
+    print("✅ CSV cleaned successfully:", args.output)
+    print(f"   {stats['rows']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
@@ -0,0 +1,139 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from clean_csv import DATE_FORMAT, NUMERIC_COLUMNS, clean_frame
+
+DATA_DIR = Path(__file__).resolve().parent
+DEFAULT_HEADER = ["Date"] + NUMERIC_COLUMNS
+RAW_PREFIX = "raw_"
+
+def ticker_from_filename(path):
+    stem = Path(path).stem
+    if stem.lower().startswith(RAW_PREFIX):
+        stem = stem[len(RAW_PREFIX):]
+    return stem.upper()
+
+def _last_line(path, block_size=4096):
+    # Walk backwards from the end so the high-water mark costs one small read,
+    # however many years of history the file holds.
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
+        buffer = b""
+        position = end
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            fh.seek(position)
+            buffer = fh.read(step) + buffer
+            lines = buffer.rstrip(b"\r\n").splitlines()
+            if len(lines) > 1 or position == 0:
+                return lines[-1].decode("utf-8") if lines else ""
+    return ""
+
+def read_high_water_mark(csv_path):
+    """Return the stored header and the date of the last stored bar (None if empty)."""
+    with open(csv_path, "r", encoding="utf-8") as fh:
+        header = fh.readline().strip().split(",")
+    last = _last_line(csv_path)
+    if not last or last.split(",") == header:
+        return header, None
+    return header, pd.Timestamp(last.split(",")[header.index("Date")])
+
+def _ends_with_newline(path):
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        if fh.tell() == 0:
+            return True
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) == b"\n"
+
+def ingest_file(raw_path, data_dir=DATA_DIR):
+    raw_path = Path(raw_path)
+    ticker = ticker_from_filename(raw_path)
+    csv_path = Path(data_dir) / f"{ticker}.csv"
+
+    bars = clean_frame(pd.read_csv(raw_path))
+    bars = bars.dropna(subset=["Date", "Close"]).drop_duplicates("Date", keep="last")
+
+    if csv_path.exists():
+        header, high_water_mark = read_high_water_mark(csv_path)
+    else:
+        header, high_water_mark = DEFAULT_HEADER, None
+
+    if high_water_mark is not None:
+        bars = bars[bars["Date"] > high_water_mark]
+
+    latest = bars["Date"].iloc[-1] if len(bars) else high_water_mark
+    result = {
+        "ticker": ticker,
+        "appended": int(len(bars)),
+        "high_water_mark": latest.strftime(DATE_FORMAT) if latest is not None else None,
+    }
+    if bars.empty:
+        return result
+
+    new_rows = bars.reindex(columns=header).to_csv(
+        index=False, header=False, lineterminator="\n", date_format=DATE_FORMAT
+    )
+
+    # Existing history is byte-copied rather than re-serialised, and the
+    # replace is atomic so readers never see a half-written file.
+    tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+    if csv_path.exists():
+        shutil.copyfile(csv_path, tmp_path)
+        needs_newline = not _ends_with_newline(tmp_path)
+        with open(tmp_path, "a", encoding="utf-8", newline="") as fh:
+            if needs_newline:
+                fh.write("\n")
+            fh.write(new_rows)
+            fh.flush()
+            os.fsync(fh.fileno())
+    else:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+            fh.write(",".join(header) + "\n")
+            fh.write(new_rows)
+            fh.flush()
+            os.fsync(fh.fileno())
+    os.replace(tmp_path, csv_path)
+    return result
+
+def _ingest_safely(raw_path, data_dir):
+    try:
+        return ingest_file(raw_path, data_dir)
+    except Exception as exc:
+        return {"ticker": ticker_from_filename(raw_path), "appended": 0, "error": str(exc)}
+
+def ingest_directory(raw_dir, data_dir=DATA_DIR, workers=None):
+    raw_files = sorted(Path(raw_dir).glob("*.csv"))
+    if not raw_files:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_ingest_safely, raw_files, [data_dir] * len(raw_files)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new daily bars from raw PSX exports to the ticker CSVs.")
+    parser.add_argument("raw", help="Raw export file, or a directory of raw_<ticker>.csv exports")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if Path(args.raw).is_dir():
+        results = ingest_directory(args.raw, args.data_dir, args.workers)
+    else:
+        results = [_ingest_safely(Path(args.raw), args.data_dir)]
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        if "error" in result:
+            print(f"❌ {result['ticker']}: {result['error']}")
+        else:
+            print(f"✅ {result['ticker']}: +{result['appended']} bars (through {result['high_water_mark']})")
+    print(f"Ingested {sum(r['appended'] for r in results)} bars for {len(results)} tickers in {elapsed:.2f}s")